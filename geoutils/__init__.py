@@ -1,12 +1,18 @@
 """Support shorthand import of our classes into the namespace.
 """
+from geoutils.tokenizer import Tokenizer
 from geoutils.modelbase import ModelBase
 from geoutils.metadata import Metadata
+from geoutils.bboxcache import BBoxCache
 from geoutils.geoimage import GeoImage
+from geoutils.writerpool import WriterPool
+from geoutils.connectionpool import ConnectionPool
 from geoutils.datastore import Datastore
 from geoutils.standard import Standard
 from geoutils.nitf import NITF
 from geoutils.gdelt import Gdelt
+from geoutils.gdeltpipeline import (GdeltPipeline,
+                                    GdeltPipelineError)
 from geoutils.schema import Schema
 from geoutils.config.initconfig import InitConfig
 from geoutils.config.ingestconfig import IngestConfig
@@ -0,0 +1,206 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.BBoxCache` holds the boundary coordinates of
+every image in memory for fast spatial lookups.
+
+"""
+__all__ = ["BBoxCache"]
+
+import time
+import numpy
+
+from geosutils.log import log
+
+
+class BBoxCache(object):
+    """:class:`geoutils.BBoxCache`
+
+    The four ``coord=N`` corner points of each image are stored in a
+    :mod:`numpy` structured array alongside the image's bounding box
+    extents.  The cache is refreshed incrementally from the cells
+    written since the :attr:`watermark`.
+
+    .. attribute:: *rows*
+        list of image row IDs in :attr:`extents` order
+
+    .. attribute:: *extents*
+        :mod:`numpy` structured array of each image's ``coords``
+        (4 lat/long corner points, ``NaN`` if undefined), ``min_lat``,
+        ``min_lon``, ``max_lat`` and ``max_lon``
+
+    .. attribute:: *watermark*
+        latest cell timestamp (milliseconds) loaded into the cache
+        (``None`` if the cache is empty)
+
+    .. attribute:: *refreshed*
+        time (seconds since the epoch) of the last refresh from the
+        datastore (``None`` if the cache has never been refreshed or
+        was invalidated)
+
+    """
+    _dtype = numpy.dtype([('coords', numpy.float64, (4, 2)),
+                          ('min_lat', numpy.float64),
+                          ('min_lon', numpy.float64),
+                          ('max_lat', numpy.float64),
+                          ('max_lon', numpy.float64)])
+
+    def __init__(self):
+        self._rows = []
+        self._index = {}
+        self._extents = numpy.zeros(0, dtype=self._dtype)
+        self._watermark = None
+        self._refreshed = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def extents(self):
+        return self._extents
+
+    @property
+    def watermark(self):
+        return self._watermark
+
+    @property
+    def refreshed(self):
+        return self._refreshed
+
+    @refreshed.setter
+    def refreshed(self, value):
+        self._refreshed = value
+
+    def reset(self):
+        """Empty the cache.
+
+        """
+        self._rows = []
+        self._index = {}
+        self._extents = numpy.zeros(0, dtype=self._dtype)
+        self._watermark = None
+        self._refreshed = None
+
+    def invalidate(self):
+        """Flag the cache for a refresh on next use.  The cached
+        images are kept so the refresh remains incremental.
+
+        """
+        self._refreshed = None
+
+    def expired(self, ttl=None):
+        """Check if the cache needs a refresh.
+
+        **Kwargs:**
+            *ttl*: number of seconds that a refresh remains current.
+            ``None`` never expires
+
+        **Returns:**
+            Boolean ``True`` if the cache has not been refreshed since
+            it was created or invalidated, or the last refresh is older
+            than *ttl*.  Boolean ``False`` otherwise
+
+        """
+        expired = self._refreshed is None
+        if not expired and ttl is not None:
+            expired = time.time() - self._refreshed >= ttl
+
+        return expired
+
+    def update(self, corners):
+        """Load image corner points into the cache.
+
+        **Args:**
+            *corners*: iterable of ``(row_id, corner, latitude,
+            longitude, timestamp)`` tuples where *corner* is the
+            ``coord=N`` index (0 to 3)
+
+        **Returns:**
+            number of images updated
+
+        """
+        corners = list(corners)
+
+        new_rows = []
+        for (row_id, _, _, _, _) in corners:
+            if row_id not in self._index:
+                self._index[row_id] = len(self._rows) + len(new_rows)
+                new_rows.append(row_id)
+
+        if new_rows:
+            added = numpy.zeros(len(new_rows), dtype=self._dtype)
+            added['coords'] = numpy.nan
+            self._extents = numpy.concatenate([self._extents, added])
+            self._rows.extend(new_rows)
+
+        touched = set()
+        for (row_id, corner, latitude, longitude, timestamp) in corners:
+            index = self._index[row_id]
+            self._extents['coords'][index, corner] = (latitude, longitude)
+            touched.add(index)
+            if self._watermark is None or timestamp > self._watermark:
+                self._watermark = timestamp
+
+        if touched:
+            indexes = numpy.array(sorted(touched))
+            coords = self._extents['coords'][indexes]
+            self._extents['min_lat'][indexes] = numpy.nanmin(coords[:, :, 0],
+                                                             axis=1)
+            self._extents['min_lon'][indexes] = numpy.nanmin(coords[:, :, 1],
+                                                             axis=1)
+            self._extents['max_lat'][indexes] = numpy.nanmax(coords[:, :, 0],
+                                                             axis=1)
+            self._extents['max_lon'][indexes] = numpy.nanmax(coords[:, :, 1],
+                                                             axis=1)
+
+        log.debug('BBox cache updated %d images (%d new): watermark %s' %
+                  (len(touched), len(new_rows), self._watermark))
+
+        return len(touched)
+
+    def coords(self):
+        """Corner points of every image in the
+        :meth:`geoutils.model.Metadata.query_coords` structure.
+
+        """
+        coords = {}
+        for row_id, points in zip(self._rows, self._extents['coords']):
+            defined = points[~numpy.isnan(points).any(axis=1)]
+            coords[row_id] = defined.tolist()
+
+        return coords
+
+    def contains_point(self, latitude, longitude):
+        """Images whose bounding box contains the point.
+
+        **Returns:**
+            list of image row IDs
+
+        """
+        extents = self._extents
+        mask = ((extents['min_lat'] <= latitude) &
+                (extents['max_lat'] >= latitude) &
+                (extents['min_lon'] <= longitude) &
+                (extents['max_lon'] >= longitude))
+
+        return self._select(mask)
+
+    def intersects(self, min_lat, min_lon, max_lat, max_lon):
+        """Images whose bounding box intersects the given bounding box.
+
+        **Returns:**
+            list of image row IDs
+
+        """
+        extents = self._extents
+        mask = ((extents['min_lat'] <= max_lat) &
+                (extents['max_lat'] >= min_lat) &
+                (extents['min_lon'] <= max_lon) &
+                (extents['max_lon'] >= min_lon))
+
+        return self._select(mask)
+
+    def _select(self, mask):
+        return [self._rows[i] for i in numpy.flatnonzero(mask)]
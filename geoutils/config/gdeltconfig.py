@@ -23,6 +23,10 @@ class GdeltConfig(Config):
     _inbound_dir = None
     _archive_dir = None
     _thread_sleep = 2.0
+    _parse_workers = 2
+    _write_workers = 2
+    _queue_size = 8
+    _batch_size = 1000
     _spatial_order = ['stripe', 'geohash', 'reverse_time']
     _spatial_stripes = 1
     _stripes = 1
@@ -97,6 +101,38 @@ class GdeltConfig(Config):
     def set_thread_sleep(self, value):
         pass
 
+    @property
+    def parse_workers(self):
+        return self._parse_workers
+
+    @set_scalar
+    def set_parse_workers(self, value):
+        pass
+
+    @property
+    def write_workers(self):
+        return self._write_workers
+
+    @set_scalar
+    def set_write_workers(self, value):
+        pass
+
+    @property
+    def queue_size(self):
+        return self._queue_size
+
+    @set_scalar
+    def set_queue_size(self, value):
+        pass
+
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    @set_scalar
+    def set_batch_size(self, value):
+        pass
+
     @property
     def spatial_order(self):
         return self._spatial_order
@@ -146,6 +182,22 @@ class GdeltConfig(Config):
                    'option': 'thread_sleep',
                    'var': 'thread_sleep',
                    'cast_type': 'float'},
+                  {'section': 'gdelt',
+                   'option': 'parse_workers',
+                   'var': 'parse_workers',
+                   'cast_type': 'int'},
+                  {'section': 'gdelt',
+                   'option': 'write_workers',
+                   'var': 'write_workers',
+                   'cast_type': 'int'},
+                  {'section': 'gdelt',
+                   'option': 'queue_size',
+                   'var': 'queue_size',
+                   'cast_type': 'int'},
+                  {'section': 'gdelt',
+                   'option': 'batch_size',
+                   'var': 'batch_size',
+                   'cast_type': 'int'},
                   {'section': 'spatial',
                    'option': 'order',
                    'var': 'spatial_order',
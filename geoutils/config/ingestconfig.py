@@ -28,9 +28,15 @@ class IngestConfig(Config):
     _archive_dir = None
     _thread_sleep = 2.0
     _shards = 4
+    _thumb_format = 'JPEG'
     _spatial_order = ['stripe', 'geohash', 'reverse_time']
     _spatial_stripes = 1
     _stripes = 1
+    _metasearch_length = 3
+    _metasearch_stop_words = []
+    _metasearch_filters = []
+    _metasearch_include_fields = []
+    _metasearch_exclude_fields = []
 
     def __init__(self, config_file=None):
         """:class:`geoutils.IngestConfig` initialisation.
@@ -142,6 +148,14 @@ class IngestConfig(Config):
     def set_shards(self, value):
         pass
 
+    @property
+    def thumb_format(self):
+        return self._thumb_format
+
+    @set_scalar
+    def set_thumb_format(self, value):
+        pass
+
     @property
     def spatial_order(self):
         return self._spatial_order
@@ -158,6 +172,46 @@ class IngestConfig(Config):
     def set_spatial_stripes(self, value):
         pass
 
+    @property
+    def metasearch_length(self):
+        return self._metasearch_length
+
+    @set_scalar
+    def set_metasearch_length(self, value):
+        pass
+
+    @property
+    def metasearch_stop_words(self):
+        return self._metasearch_stop_words
+
+    @set_list
+    def set_metasearch_stop_words(self, values=None):
+        pass
+
+    @property
+    def metasearch_filters(self):
+        return self._metasearch_filters
+
+    @set_list
+    def set_metasearch_filters(self, values=None):
+        pass
+
+    @property
+    def metasearch_include_fields(self):
+        return self._metasearch_include_fields
+
+    @set_list
+    def set_metasearch_include_fields(self, values=None):
+        pass
+
+    @property
+    def metasearch_exclude_fields(self):
+        return self._metasearch_exclude_fields
+
+    @set_list
+    def set_metasearch_exclude_fields(self, values=None):
+        pass
+
     def parse_config(self):
         """Read config items from the configuration file.
 
@@ -208,6 +262,9 @@ class IngestConfig(Config):
                    'option': 'shards',
                    'var': 'shards',
                    'cast_type': 'int'},
+                  {'section': 'ingest',
+                   'option': 'thumb_format',
+                   'var': 'thumb_format'},
                   {'section': 'spatial',
                    'option': 'order',
                    'var': 'spatial_order',
@@ -215,7 +272,27 @@ class IngestConfig(Config):
                   {'section': 'spatial',
                    'option': 'stripes',
                    'var': 'spatial_stripes',
-                   'cast_type': 'int'}]
+                   'cast_type': 'int'},
+                  {'section': 'metasearch',
+                   'option': 'length',
+                   'var': 'metasearch_length',
+                   'cast_type': 'int'},
+                  {'section': 'metasearch',
+                   'option': 'stop_words',
+                   'var': 'metasearch_stop_words',
+                   'is_list': True},
+                  {'section': 'metasearch',
+                   'option': 'filters',
+                   'var': 'metasearch_filters',
+                   'is_list': True},
+                  {'section': 'metasearch',
+                   'option': 'include_fields',
+                   'var': 'metasearch_include_fields',
+                   'is_list': True},
+                  {'section': 'metasearch',
+                   'option': 'exclude_fields',
+                   'var': 'metasearch_exclude_fields',
+                   'is_list': True}]
 
         for kwarg in kwargs:
             self.parse_scalar_config(**kwarg)
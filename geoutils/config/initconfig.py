@@ -7,7 +7,8 @@ __all__ = ["InitConfig"]
 
 
 from geosutils.config import Config
-from geosutils.setter import set_scalar
+from geosutils.setter import (set_scalar,
+                              set_list)
 
 
 class InitConfig(Config):
@@ -18,6 +19,9 @@ class InitConfig(Config):
     _accumulo_port = 42425
     _accumulo_user = 'root'
     _accumulo_password = str()
+    _shards = 4
+    _spatial_order = ['stripe', 'geohash', 'reverse_time']
+    _spatial_stripes = 1
 
     def __init__(self, config_file=None):
         """:class:`geoutils.InitConfig` initialisation.
@@ -57,6 +61,30 @@ class InitConfig(Config):
     def set_accumulo_password(self, value):
         pass
 
+    @property
+    def shards(self):
+        return self._shards
+
+    @set_scalar
+    def set_shards(self, value):
+        pass
+
+    @property
+    def spatial_order(self):
+        return self._spatial_order
+
+    @set_list
+    def set_spatial_order(self, values=None):
+        pass
+
+    @property
+    def spatial_stripes(self):
+        return self._spatial_stripes
+
+    @set_scalar
+    def set_spatial_stripes(self, value):
+        pass
+
     def parse_config(self):
         """Read config items from the configuration file.
 
@@ -75,7 +103,19 @@ class InitConfig(Config):
                    'var': 'accumulo_user'},
                   {'section': 'accumulo_proxy_server',
                    'option': 'password',
-                   'var': 'accumulo_password'}]
+                   'var': 'accumulo_password'},
+                  {'section': 'ingest',
+                   'option': 'shards',
+                   'var': 'shards',
+                   'cast_type': 'int'},
+                  {'section': 'spatial',
+                   'option': 'order',
+                   'var': 'spatial_order',
+                   'is_list': True},
+                  {'section': 'spatial',
+                   'option': 'stripes',
+                   'var': 'spatial_stripes',
+                   'cast_type': 'int'}]
 
         for kw in kwargs:
             self.parse_scalar_config(**kw)
@@ -74,6 +74,26 @@ class TestGdeltConfig(unittest2.TestCase):
         msg = 'gdelt.thread_sleep not as expected'
         self.assertEqual(received, expected, msg)
 
+        received = self._conf.parse_workers
+        expected = 4
+        msg = 'gdelt.parse_workers not as expected'
+        self.assertEqual(received, expected, msg)
+
+        received = self._conf.write_workers
+        expected = 6
+        msg = 'gdelt.write_workers not as expected'
+        self.assertEqual(received, expected, msg)
+
+        received = self._conf.queue_size
+        expected = 16
+        msg = 'gdelt.queue_size not as expected'
+        self.assertEqual(received, expected, msg)
+
+        received = self._conf.batch_size
+        expected = 500
+        msg = 'gdelt.batch_size not as expected'
+        self.assertEqual(received, expected, msg)
+
         received = self._conf.spatial_order
         expected = ['geohash', 'reverse_time' ,'stripe']
         msg = 'spatial.order not as expected'
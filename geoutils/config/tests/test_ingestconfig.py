@@ -99,6 +99,11 @@ class TestIngestConfig(unittest2.TestCase):
         msg = 'ingest.shards not as expected'
         self.assertEqual(received, expected, msg)
 
+        received = self._conf.thumb_format
+        expected = 'PNG'
+        msg = 'ingest.thumb_format not as expected'
+        self.assertEqual(received, expected, msg)
+
         received = self._conf.spatial_order
         expected = ['geohash', 'reverse_time' ,'stripe']
         msg = 'spatial.order not as expected'
@@ -109,6 +114,31 @@ class TestIngestConfig(unittest2.TestCase):
         msg = 'spatial.stripes not as expected'
         self.assertEqual(received, expected, msg)
 
+        received = self._conf.metasearch_length
+        expected = 4
+        msg = 'metasearch.length not as expected'
+        self.assertEqual(received, expected, msg)
+
+        received = self._conf.metasearch_stop_words
+        expected = ['image', 'file']
+        msg = 'metasearch.stop_words not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._conf.metasearch_filters
+        expected = ['numeric', 'hex']
+        msg = 'metasearch.filters not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._conf.metasearch_include_fields
+        expected = ['NITF_*']
+        msg = 'metasearch.include_fields not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._conf.metasearch_exclude_fields
+        expected = ['NITF_FDT', 'NITF_IDATIM']
+        msg = 'metasearch.exclude_fields not as expected'
+        self.assertListEqual(received, expected, msg)
+
     def tearDown(self):
         self._conf = None
         del self._conf
@@ -0,0 +1,152 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.ConnectionPool` holds idle Accumulo proxy
+connections for reuse by concurrent scans.
+
+"""
+__all__ = ["ConnectionPool"]
+
+import threading
+import time
+
+from geoutils.writerpool import WRITER_ERRORS
+from geosutils.log import log
+
+
+class ConnectionPool(object):
+    """:class:`geoutils.ConnectionPool`
+
+    The Thrift client behind a connection is not thread safe, so each
+    thread of a concurrent scan borrows its own connection with
+    :meth:`acquire` and hands it back with :meth:`release`.  Released
+    connections are kept open for the next borrower rather than
+    reconnecting to the Accumulo proxy on every query.
+
+    The Accumulo proxy (or a firewall in between) may drop a
+    connection while it sits idle, so a connection that has been idle
+    for at least :attr:`validate_after` seconds is checked with a
+    cheap round trip before it is handed out.  Stale connections are
+    closed and replaced.
+
+    .. attribute:: *factory*
+        callable that opens a new, independent Accumulo connection
+        (for example, :meth:`geoutils.Datastore.open_connection`)
+
+    .. attribute:: *max_idle*
+        maximum number of idle connections held in the pool (default
+        4).  Connections released beyond this are closed
+
+    .. attribute:: *validate_after*
+        idle time (in seconds) after which a connection is checked
+        before it is handed out by :meth:`acquire` (default 10).  A
+        value of 0 checks every reused connection
+
+    """
+    _factory = None
+    _max_idle = 4
+    _validate_after = 10
+
+    def __init__(self, factory=None):
+        self._factory = factory
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @property
+    def factory(self):
+        return self._factory
+
+    @factory.setter
+    def factory(self, value):
+        self._factory = value
+
+    @property
+    def max_idle(self):
+        return self._max_idle
+
+    @max_idle.setter
+    def max_idle(self, value):
+        self._max_idle = value
+
+    @property
+    def validate_after(self):
+        return self._validate_after
+
+    @validate_after.setter
+    def validate_after(self, value):
+        self._validate_after = value
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def acquire(self):
+        """Borrow a connection from the pool.  Idle connections that
+        fail validation are closed and a new connection is opened by
+        :attr:`factory` if none of the idle connections are usable.
+
+        **Returns:**
+            a :class:`pyaccumulo.Accumulo` object
+
+        """
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                (connection, released) = self._idle.pop()
+
+            if (time.time() - released < self.validate_after or
+                    self._validate(connection)):
+                return connection
+
+            self._close(connection)
+
+        return self.factory()
+
+    def release(self, connection, discard=False):
+        """Return a borrowed *connection* to the pool.
+
+        **Kwargs:**
+            *discard*: close the connection instead (for example, when
+            a scan over it failed and its state is unknown)
+
+        """
+        with self._lock:
+            if not discard and len(self._idle) < self.max_idle:
+                self._idle.append((connection, time.time()))
+                connection = None
+
+        if connection is not None:
+            self._close(connection)
+
+    def close(self):
+        """Close all idle connections.
+        """
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+
+        for connection, _ in idle:
+            self._close(connection)
+
+    @staticmethod
+    def _validate(connection):
+        """Check that the idle *connection* still reaches the Accumulo
+        proxy.
+
+        **Returns:**
+            boolean ``True`` if the connection is usable.  ``False``
+            otherwise
+
+        """
+        try:
+            connection.list_tables()
+            return True
+        except WRITER_ERRORS as err:
+            log.warn('Discarding stale pooled connection: %s' % err)
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except WRITER_ERRORS as err:
+            log.debug('Connection close error: %s' % err)
@@ -17,8 +17,6 @@ import daemoniser
 from geosutils.files import (get_directory_files,
                              move_file)
 from geosutils.log import log
-from geosutils.utils import get_reverse_timestamp
-from geoutils.auditer import audit
 
 
 class GdeltDaemon(daemoniser.Daemon):
@@ -138,16 +136,16 @@ class GdeltDaemon(daemoniser.Daemon):
                 if not skip_sleep:
                     time.sleep(self.conf.thread_sleep)
 
+        # Flush and close the pooled writers before the process exits.
+        self.accumulo.close()
+
     def accumulo_connect(self):
         """Create a connection to the Accumulo datastore defined
         within the environment's setting.py file.
 
         """
         datastore = geoutils.Datastore()
-        datastore.host = self.conf.accumulo_host
-        datastore.port = self.conf.accumulo_port
-        datastore.user = self.conf.accumulo_user
-        datastore.password = self.conf.accumulo_password
+        datastore.configure(self.conf)
 
         datastore.connect()
 
@@ -163,8 +161,10 @@ class GdeltDaemon(daemoniser.Daemon):
             *dry*: if ``True`` only simulate, do not execute
 
         **Returns:**
-            Boolean ``True`` on successful record creation.  Boolean
-            ``False`` otherwise
+            Boolean ``True`` if records were processed and none failed
+            across all members of the GDELT zip (see
+            :meth:`ingest_status`).  Boolean ``False`` otherwise, or if
+            the pipeline aborted on any member
 
         """
         status = False
@@ -172,30 +172,35 @@ class GdeltDaemon(daemoniser.Daemon):
         # First, move the file into a "processing" state.
         proc_file = filename + '.proc'
         if move_file(filename, proc_file):
+            pipeline = geoutils.GdeltPipeline(self.accumulo_connect, dry=dry)
+            pipeline.parse_workers = self.conf.parse_workers
+            pipeline.write_workers = self.conf.write_workers
+            pipeline.queue_size = self.conf.queue_size
+            pipeline.chunk_size = self.conf.batch_size
+            spatial = geoutils.index.Spatial(self.conf.spatial_stripes,
+                                             self.conf.spatial_order)
+            pipeline.spatial = spatial
+
+            totals = {}
+            aborted = False
             gdelt_zip = zipfile.ZipFile(proc_file, 'r')
             for zip_filename in gdelt_zip.namelist():
                 log.debug('Processing GDELT file "%s"' % zip_filename)
 
                 file_h = gdelt_zip.open(zip_filename, 'r')
-                for line in file_h:
-                    audit.data = {'gdelt_daemon|start': str(time.time())}
-                    gdelt = geoutils.Gdelt(line.strip())
-                    gdelt_schema = gdelt()
-                    log.debug('GDELT schema: %s' % gdelt_schema)
-                    gdelt_row_id = gdelt_schema['row_id']
-
-                    status = self.accumulo.ingest(gdelt_schema, dry=dry)
-                    if status:
-                        audit.data = {'gdelt_daemon|finish': str(time.time())}
-                        audit.data = {'gdelt_daemon|row_id': gdelt_row_id}
-                        audit.source_id = ('%s_gdelt_daemon' %
-                                           get_reverse_timestamp())
-                        self.accumulo.ingest(audit(), dry=dry)
-                    audit.reset()
-
-                    # Only perform a single iteration in dry mode.
-                    if dry:
-                        break
+                try:
+                    counters = pipeline(file_h)
+                except geoutils.GdeltPipelineError as err:
+                    log.error('GDELT file "%s" ingest aborted: %s' %
+                              (zip_filename, err))
+                    counters = err.counters
+                    aborted = True
+                log.info('GDELT file "%s" ingest counters: %s' %
+                         (zip_filename, counters))
+                for key, value in counters.iteritems():
+                    totals[key] = totals.get(key, 0) + value
+
+            status = not aborted and self.ingest_status(totals)
 
             # In dry mode we need to restore the file.
             if dry:
@@ -203,6 +208,28 @@ class GdeltDaemon(daemoniser.Daemon):
 
         return status
 
+    @staticmethod
+    def ingest_status(counters):
+        """Reduce the GDELT pipeline *counters* to an ingest status.
+
+        A file with any failed (rejected) records is reported as a
+        failure even if other records were ingested.  Skipped records
+        (events that are not geocoded) are expected in GDELT exports
+        and do not fail the file.
+
+        **Args:**
+            *counters*: dictionary of ingest counters as returned by
+            :meth:`geoutils.GdeltPipeline.__call__`
+
+        **Returns:**
+            Boolean ``True`` if at least one record was ingested or
+            skipped and no records failed.  Boolean ``False`` otherwise
+
+        """
+        processed = counters.get('ingested', 0) + counters.get('skipped', 0)
+
+        return processed > 0 and counters.get('failed', 0) == 0
+
     def source_file(self):
         """Checks inbound directory (defined by the
         :attr:`geoutils.GdeltConfig.inbound_dir` config option) for valid
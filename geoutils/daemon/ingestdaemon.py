@@ -135,16 +135,16 @@ class IngestDaemon(daemoniser.Daemon):
                 if not skip_sleep:
                     time.sleep(self.conf.thread_sleep)
 
+        # Flush and close the pooled writers before the process exits.
+        self.accumulo.close()
+
     def accumulo_connect(self):
         """Create a connection to the Accumulo datastore defined
         within the environment's setting.py file.
 
         """
         datastore = geoutils.Datastore()
-        datastore.host = self.conf.accumulo_host
-        datastore.port = self.conf.accumulo_port
-        datastore.user = self.conf.accumulo_user
-        datastore.password = self.conf.accumulo_password
+        datastore.configure(self.conf)
 
         datastore.connect()
 
@@ -172,6 +172,9 @@ class IngestDaemon(daemoniser.Daemon):
             audit.data = {'ingest_daemon|start': str(time.time())}
             nitf = geoutils.NITF(source_filename=filename + '.proc')
             nitf.meta_shards = self.conf.shards
+            nitf.thumb_format = self.conf.thumb_format
+            nitf.spatial = self.accumulo.spatial
+            nitf.tokenizer = self.accumulo.tokenizer
             nitf.image_model.hdfs_namenode = self.conf.namenode_host
             nitf.image_model.hdfs_namenode_port = self.conf.namenode_port
             nitf.image_model.hdfs_namenode_user = self.conf.namenode_user
@@ -188,6 +191,11 @@ class IngestDaemon(daemoniser.Daemon):
                 self.accumulo.ingest(audit(), dry=dry)
             audit.reset()
 
+            # Pooled writes are only durable once flushed.
+            if self.accumulo.flush():
+                log.error('NITF file "%s" flush failed' % filename)
+                status = False
+
             # In dry mode we need to restore the file.
             if dry:
                 move_file(proc_file, filename)
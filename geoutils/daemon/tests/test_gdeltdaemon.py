@@ -45,6 +45,20 @@ class TestGdeltDaemon(unittest2.TestCase):
         msg = 'Object is not a geoutils.GdeltDaemon'
         self.assertIsInstance(self._gdeltd, geoutils.GdeltDaemon, msg)
 
+    def test_ingest_status(self):
+        """Reduce the pipeline counters to an ingest status.
+        """
+        counters = [{'ingested': 99, 'failed': 0},
+                    {'ingested': 99, 'failed': 1},
+                    {'ingested': 99, 'failed': 0, 'skipped': 1},
+                    {'ingested': 0, 'failed': 0, 'skipped': 1},
+                    {'ingested': 0, 'failed': 0},
+                    {}]
+        received = [geoutils.GdeltDaemon.ingest_status(c) for c in counters]
+        expected = [True, False, True, True, False, False]
+        msg = 'GDELT ingest status error'
+        self.assertListEqual(received, expected, msg)
+
     def test_start_dry_run(self):
         """GdeltDaemon dry run.
         """
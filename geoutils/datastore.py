@@ -4,11 +4,16 @@
 """
 __all__ = ["Datastore"]
 
+import collections
+import time
 import pyaccumulo
 from thrift.transport.TTransport import TTransportException
 from pyaccumulo.proxy.AccumuloProxy import AccumuloSecurityException
 
+import geoutils.index
 import geoutils.model
+from geoutils.writerpool import WriterPool
+from geoutils.connectionpool import ConnectionPool
 from geosutils.log import log
 
 
@@ -49,6 +54,44 @@ class Datastore(object):
     .. attribute:: *base*
         an object instance of a :class:`geoutils.model.Base`
 
+    .. attribute:: *writer_pool*
+        a :class:`geoutils.WriterPool` object that holds a long-lived
+        batch writer for each table written to during ingest
+
+    .. attribute:: *connection_pool*
+        a :class:`geoutils.ConnectionPool` object that holds the
+        additional connections opened by
+        :meth:`geoutils.Datastore.open_connection` for concurrent
+        scans, so that they are reused across queries
+
+    .. attribute:: *spatial*
+        :class:`geoutils.index.Spatial` object that describes the
+        spatial index row key layout.  Set on the
+        :attr:`geoutils.Datastore.meta` and
+        :attr:`geoutils.Datastore.gdelt` models so that their queries
+        scan every stripe written by ingest (see
+        :meth:`geoutils.Datastore.configure`)
+
+    .. attribute:: *tokenizer*
+        :class:`geoutils.Tokenizer` object that splits metadata values
+        into the ``meta_search`` document terms.  Set on the
+        :attr:`geoutils.Datastore.meta_search` model so that queries
+        are split into terms in the same way as ingest (see
+        :meth:`geoutils.Datastore.configure`)
+
+    .. attribute:: *table_cache_ttl*
+        number of seconds before the cache of datastore table names
+        is reloaded from the proxy (default ``None``, never expire).
+        The cache is loaded on :meth:`geoutils.Datastore.connect` and
+        kept current by :meth:`geoutils.Datastore.init_table` and
+        :meth:`geoutils.Datastore.delete_table`
+
+    .. attribute:: *table_cache_miss_interval*
+        minimum number of seconds between reloads of the table cache
+        that are triggered by a table missing from the cache (default
+        30).  Picks up tables created by another process (for example,
+        ``geoinit`` run after the ingest daemon started)
+
     """
     _connection = None
     _host = 'localhost'
@@ -61,6 +104,17 @@ class Datastore(object):
     _thumb = geoutils.model.Thumb(None)
     _audit = geoutils.model.Audit(None)
     _gdelt = geoutils.model.Gdelt(None)
+    _spatial = geoutils.index.Spatial()
+    _tokenizer = geoutils.Tokenizer()
+    _table_cache = None
+    _table_cache_time = None
+    _table_cache_ttl = None
+    _table_cache_miss_interval = 30
+
+    def __init__(self):
+        self._writer_pool = WriterPool()
+        self._connection_pool = ConnectionPool(self.open_connection)
+        self._pending_tables = set()
 
     @property
     def connection(self):
@@ -126,6 +180,49 @@ class Datastore(object):
     def gdelt(self):
         return self._gdelt
 
+    @property
+    def writer_pool(self):
+        return self._writer_pool
+
+    @property
+    def connection_pool(self):
+        return self._connection_pool
+
+    @property
+    def spatial(self):
+        return self._spatial
+
+    @spatial.setter
+    def spatial(self, value):
+        self._spatial = value
+        self.meta.spatial = value
+        self.gdelt.spatial = value
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, value):
+        self._tokenizer = value
+        self.meta_search.tokenizer = value
+
+    @property
+    def table_cache_ttl(self):
+        return self._table_cache_ttl
+
+    @table_cache_ttl.setter
+    def table_cache_ttl(self, value):
+        self._table_cache_ttl = value
+
+    @property
+    def table_cache_miss_interval(self):
+        return self._table_cache_miss_interval
+
+    @table_cache_miss_interval.setter
+    def table_cache_miss_interval(self, value):
+        self._table_cache_miss_interval = value
+
     def __del__(self):
         self.close()
 
@@ -140,6 +237,39 @@ class Datastore(object):
 
         return writer
 
+    def configure(self, conf):
+        """Apply the Accumulo proxy connection details and the spatial
+        index layout from *conf*.
+
+        Query processes should be configured from the same
+        configuration file as the ingest daemons.  Otherwise, the
+        spatial queries only scan the default single stripe and
+        metasearch queries are not split into the same terms as
+        ingest.
+
+        **Args:**
+            *conf*: a configuration object that provides the
+            ``accumulo_*`` and ``spatial_*`` settings (for example,
+            :class:`geoutils.InitConfig`).  The ``metasearch_*``
+            tokenizer settings are also applied if *conf* provides
+            them (as does :class:`geoutils.IngestConfig`)
+
+        """
+        self.host = conf.accumulo_host
+        self.port = conf.accumulo_port
+        self.user = conf.accumulo_user
+        self.password = conf.accumulo_password
+        self.spatial = geoutils.index.Spatial(conf.spatial_stripes,
+                                              conf.spatial_order)
+
+        if hasattr(conf, 'metasearch_length'):
+            self.tokenizer = geoutils.Tokenizer(
+                length=conf.metasearch_length,
+                stop_words=conf.metasearch_stop_words,
+                filters=conf.metasearch_filters,
+                include_fields=conf.metasearch_include_fields,
+                exclude_fields=conf.metasearch_exclude_fields)
+
     def connect(self):
         """Connect to the Accumulo datastore via a proxy client.
 
@@ -157,29 +287,56 @@ class Datastore(object):
         log.debug('Attempting connection to Accumulo proxy ...')
         log.debug('Connection args: "%s:%s@%s:%s"' %
                   (self.user, '********', self.host, self.port))
+        self.connection_pool.close()
         try:
             self.connection = pyaccumulo.Accumulo(host=self.host,
                                                   port=int(self.port),
                                                   user=self.user,
                                                   password=self.password)
             self.meta.connection = self.connection
+            self.meta.connection_pool = self.connection_pool
             self.meta_search.connection = self.connection
             self.image.connection = self.connection
             self.thumb.connection = self.connection
             self.audit.connection = self.connection
             self.gdelt.connection = self.connection
+            self.writer_pool.connection = self.connection
+            self.refresh_table_cache()
         except (TTransportException,
                 AccumuloSecurityException) as err:
             log.error('Connection error: "%s"' % err)
 
         return self.connection
 
-    def init_table(self, name):
+    def open_connection(self):
+        """Open a new Accumulo proxy connection with the same
+        credentials as :attr:`geoutils.Datastore.connection`.
+
+        The Thrift client of a connection is not thread safe, so each
+        thread of a concurrent scan requires its own connection.  The
+        caller is responsible for closing the new connection (or for
+        returning it to the :attr:`geoutils.Datastore.connection_pool`).
+
+        **Returns:**
+            a :class:`pyaccumulo.Accumulo` object
+
+        """
+        log.debug('Opening additional connection to Accumulo proxy ...')
+
+        return pyaccumulo.Accumulo(host=self.host,
+                                   port=int(self.port),
+                                   user=self.user,
+                                   password=self.password)
+
+    def init_table(self, name, splits=None):
         """Initialise the datastore table.
 
         **Kwargs:**
             *name*: name of the table to create
 
+            *splits*: optional list of split points to pre-split the
+            new table into tablets
+
         """
         status = False
         log.info('Initialising the image library table: "%s" ...' % name)
@@ -190,7 +347,13 @@ class Datastore(object):
             else:
                 # Finally, create the table.
                 self.connection.create_table(name)
+                if self._table_cache is not None:
+                    self._table_cache.add(name)
+                self._table_written(name)
                 status = True
+
+                if splits:
+                    status = self.add_splits(name, splits)
         else:
             log.error('Connection state not detected. Table not created')
 
@@ -199,6 +362,35 @@ class Datastore(object):
 
         return status
 
+    def add_splits(self, name, splits):
+        """Add the *splits* points to table *name*.
+
+        **Args:**
+            *name*: name of the table to split
+
+            *splits*: list of split point strings
+
+        **Returns:**
+            Boolean ``True`` if the splits were added.  Boolean
+            ``False`` otherwise
+
+        """
+        status = False
+        log.info('Adding %d splits to table "%s" ...' % (len(splits), name))
+
+        if self.connection is not None:
+            try:
+                self.connection.client.addSplits(self.connection.login,
+                                                 name,
+                                                 set(splits))
+                status = True
+            except TTransportException as err:
+                log.error('Table "%s" split error: %s' % (name, err))
+        else:
+            log.error('Connection state not detected. Splits not added')
+
+        return status
+
     def delete_table(self, name):
         """Remove an existing datastore table.
 
@@ -215,7 +407,11 @@ class Datastore(object):
 
         if self.connection is not None:
             if self.exists_table(name):
+                self.writer_pool.close(name)
                 self.connection.delete_table(name)
+                if self._table_cache is not None:
+                    self._table_cache.discard(name)
+                self._table_written(name)
                 status = True
             else:
                 log.error('Image table "%s" does not exist!' % name)
@@ -240,6 +436,12 @@ class Datastore(object):
         if self.connection is not None:
             if self.connection.table_exists(name):
                 status = True
+
+            if self._table_cache is not None:
+                if status:
+                    self._table_cache.add(name)
+                else:
+                    self._table_cache.discard(name)
         else:
             log.error('Connection not detected: table state undefined ')
 
@@ -248,12 +450,135 @@ class Datastore(object):
 
         return status
 
+    def exists_table_cached(self, name):
+        """Check if table *name* exists in the datastore against the
+        table cache.
+
+        Unlike :meth:`geoutils.Datastore.exists_table`, no proxy call
+        is made unless the cache is empty or has expired as per
+        :attr:`geoutils.Datastore.table_cache_ttl`.  A table missing
+        from the cache reloads it at most once every
+        :attr:`geoutils.Datastore.table_cache_miss_interval` seconds.
+
+        **Args:**
+            *name*: name of the table to check
+
+        **Returns:**
+            Boolean ``True`` if the table exists.  Boolean ``False``
+            otherwise
+
+        """
+        if (self._table_cache is None or
+           (self.table_cache_ttl is not None and
+           time.time() - self._table_cache_time >= self.table_cache_ttl)):
+            self.refresh_table_cache()
+        elif (name not in self._table_cache and
+              time.time() - self._table_cache_time >=
+              self.table_cache_miss_interval):
+            log.debug('Table "%s" not cached: reloading' % name)
+            self.refresh_table_cache()
+
+        return self._table_cache is not None and name in self._table_cache
+
+    def refresh_table_cache(self):
+        """Load the datastore table names into the table cache.
+
+        **Returns:**
+            Python ``set`` of table names or ``None`` if the connection
+            state is not detected
+
+        """
+        self._table_cache = None
+
+        if self.connection is not None:
+            self._table_cache = set(self.connection.list_tables())
+            self._table_cache_time = time.time()
+            log.debug('Table cache loaded: %s' % sorted(self._table_cache))
+        else:
+            log.error('Connection not detected: table cache not loaded')
+
+        return self._table_cache
+
+    def invalidate_table_cache(self):
+        """Clear the table cache.  The cache will be reloaded on the
+        next :meth:`geoutils.Datastore.exists_table_cached` call.
+
+        """
+        log.debug('Invalidating table cache')
+        self._table_cache = None
+
+    def flush(self):
+        """Flush all buffered mutations in the
+        :attr:`geoutils.Datastore.writer_pool`.
+
+        **Returns:**
+            dictionary of table/error message pairs for each table
+            that failed to flush.  An empty dictionary denotes success
+
+        """
+        errors = self.writer_pool.flush()
+        self._flushed()
+
+        return errors
+
+    def _table_written(self, table, pending=False):
+        """Invalidate the in-process query caches that are built from
+        *table*.  A write to the :attr:`geoutils.Datastore.meta_search`
+        table bumps its generation so that cached posting lists are
+        dropped.  A write
+        to the :attr:`geoutils.Datastore.meta` table invalidates its
+        boundary box cache.
+
+        Buffered writes (*pending* is ``True``) only become visible
+        once the writer pool is flushed, so the caches are invalidated
+        again on the next :meth:`flush` (see :meth:`_flushed`).
+
+        """
+        if table == self.meta_search.name:
+            self.meta_search.bump_generation()
+        elif table == self.meta.name:
+            self.meta.invalidate_bbox_cache()
+        else:
+            return
+
+        if pending:
+            self._pending_tables.add(table)
+
+    def _flushed(self):
+        """Invalidate the caches of the tables written to since the
+        last flush.  Once per flush of the
+        :attr:`geoutils.Datastore.meta_search` table, a new shared write
+        generation token is written through the
+        :attr:`geoutils.Datastore.writer_pool` so that query processes
+        also drop their cached posting lists.
+
+        """
+        pending = self._pending_tables
+        self._pending_tables = set()
+        for table in pending:
+            self._table_written(table)
+
+        table = self.meta_search.name
+        if table in pending:
+            mutation = self.meta_search.generation_mutation()
+            if (not self.writer_pool.add_mutation(table, mutation) or
+                    self.writer_pool.flush(table)):
+                log.warn('Table "%s" write generation not shared' % table)
+
     def close(self):
         """Attempt to close the :attr:`geoutils.Datastore.connection`
         state.
 
+        Pooled batch writers are flushed and closed and the pooled
+        scan connections are closed before the connection is closed.
+
         """
         if self.connection is not None:
+            self.writer_pool.flush()
+            self._flushed()
+            self.writer_pool.close()
+            self.connection_pool.close()
+            self.invalidate_table_cache()
             log.info('Closing proxy client connection ...')
             self.connection.close()
             log.info('Proxy client connection closed')
@@ -267,6 +592,12 @@ class Datastore(object):
         **Kwargs:**
             *dry*: if ``True`` only simulate, do not execute
 
+        Mutations are buffered in the
+        :attr:`geoutils.Datastore.writer_pool` and are only guaranteed
+        to be written once the pool is flushed (see
+        :meth:`geoutils.Datastore.flush` and
+        :meth:`geoutils.Datastore.close`).
+
         **Returns:**
             Boolean ``True`` on successful record creation.  Boolean
             ``False`` otherwise
@@ -275,60 +606,167 @@ class Datastore(object):
         log.info('Ingesting data ...')
         ingest_status = False
 
-        row_id = data.get('row_id')
-        shard_id = data.get('shard_id')
-        if row_id is None:
-            log.error('Ingest error: no "row_id" defined')
-        else:
-            for table, value in data.get('tables').iteritems():
-                log.info('Processing ingest for table: "%s"' % table)
-                if not self.exists_table(table):
-                    log.info('Ingest skipped')
-                    continue
-
-                if value.get('cf') is None:
-                    log.warn('Column family undefined: writer skipped')
-                    continue
-
-                writer = self._create_writer(table)
-                if writer is None:
+        for table, mutation in self._build_mutations(data):
+            if not dry:
+                if not self.writer_pool.add_mutation(table, mutation):
                     break
+                self._table_written(table, pending=True)
+            else:
+                log.info('Dry pass: mutation skipped')
+
+            ingest_status = True
+
+        log.info('Data ingestion complete')
+
+        return ingest_status
+
+    def ingest_many(self, iterable, batch_size=1000, dry=False):
+        """Write a stream of records to the Accumulo datastore.
 
-                # Check if we can override the row_id.
-                ingest_row_id = row_id
-                if value.get('row_id') is not None:
-                    ingest_row_id = value.get('row_id')
-                    log.info('Overriding row_id with "%s"' %
-                             ingest_row_id)
+        Mutations are grouped by table and row across up to
+        *batch_size* records and sent to each table's pooled writer
+        in a single call.  The :attr:`geoutils.Datastore.writer_pool`
+        is flushed at the end of each batch so that each record's
+        status reflects the outcome of the write.
 
-                log.info('Creating mutation for Row ID: "%s"' %
-                         ingest_row_id)
-                mutation = pyaccumulo.Mutation(ingest_row_id)
+        .. note::
+
+            Each record is converted into mutations as soon as it is
+            consumed from *iterable*.  This means that generators that
+            re-use the same underlying dictionary (for example, the
+            :meth:`geoutils.Gdelt.__call__` schema) are safe to use.
 
-                family_qualifiers = value.get('cf').get('cq')
-                self._ingest_family_qualifiers(family_qualifiers,
-                                               mutation)
+        **Args:**
+            *iterable*: iterable of dictionary objects of the data to
+            ingest (as per :meth:`geoutils.Datastore.ingest`)
+
+        **Kwargs:**
+            *batch_size*: number of records to group into a single
+            write to each table
+
+            *dry*: if ``True`` only simulate, do not execute
+
+        **Returns:**
+            dictionary structure of the per-record status (in *iterable*
+            order) and aggregate counters in the form::
 
-                family_values = value.get('cf').get('val')
-                self._ingest_family_values(family_values, mutation)
+                {'records': [('i_3001a', True), ...],
+                 'counters': {'records': 1,
+                              'ingested': 1,
+                              'failed': 0,
+                              'skipped': 0,
+                              'mutations': 4,
+                              'batches': 1}}
 
-                if not dry:
-                    writer.add_mutation(mutation)
+            Records without a ``row_id`` (for example, GDELT events
+            that are not geocoded) cannot be written.  They are counted
+            as ``skipped`` rather than ``failed``.
+
+        """
+        log.info('Ingesting data stream (batch size %d) ...' % batch_size)
+
+        results = {'records': [],
+                   'counters': {'records': 0,
+                                'ingested': 0,
+                                'failed': 0,
+                                'skipped': 0,
+                                'mutations': 0,
+                                'batches': 0}}
+
+        batch = {}
+        pending = []
+        for data in iterable:
+            tables = set()
+            for table, mutation in self._build_mutations(data):
+                rows = batch.setdefault(table, collections.OrderedDict())
+                if mutation.row in rows:
+                    rows[mutation.row].updates.extend(mutation.updates)
                 else:
-                    log.info('Dry pass: mutation skipped')
+                    rows[mutation.row] = mutation
+                tables.add(table)
 
-                # TODO: this exception is too general.  We need to
-                # make this more granular once we better understand
-                # the reason why the write close fails from time to time.
-                try:
-                    writer.close()
-                    ingest_status = True
-                except Exception as err:
-                    log.error('Writer close: %s' % err)
+            pending.append((data.get('row_id'), tables))
 
-        log.info('Data ingestion complete')
+            if len(pending) >= batch_size:
+                self._ingest_batch(batch, pending, results, dry)
+                batch = {}
+                pending = []
 
-        return ingest_status
+        if pending:
+            self._ingest_batch(batch, pending, results, dry)
+
+        log.info('Data stream ingestion complete: %s' % results['counters'])
+
+        return results
+
+    def _ingest_batch(self, batch, pending, results, dry=False):
+        failed_tables = set()
+        for table, rows in batch.iteritems():
+            log.debug('Batch write of %d rows to table "%s"' %
+                      (len(rows), table))
+            results['counters']['mutations'] += len(rows)
+            if not dry:
+                if not self.writer_pool.add_mutations(table, rows.values()):
+                    failed_tables.add(table)
+                self._table_written(table, pending=True)
+            else:
+                log.info('Dry pass: mutations skipped')
+
+        if not dry:
+            failed_tables.update(self.flush().keys())
+
+        for row_id, tables in pending:
+            status = bool(tables) and not tables & failed_tables
+            results['records'].append((row_id, status))
+            results['counters']['records'] += 1
+            if status:
+                results['counters']['ingested'] += 1
+            elif row_id is None:
+                results['counters']['skipped'] += 1
+            else:
+                results['counters']['failed'] += 1
+
+        results['counters']['batches'] += 1
+
+    def _build_mutations(self, data):
+        """Generator of ``(table, mutation)`` pairs for the record
+        *data*.
+
+        Tables that do not exist in the datastore or that have no
+        column family defined are skipped.
+
+        """
+        row_id = data.get('row_id')
+        if row_id is None:
+            log.error('Ingest error: no "row_id" defined')
+            return
+
+        for table, value in data.get('tables').iteritems():
+            log.info('Processing ingest for table: "%s"' % table)
+            if not self.exists_table_cached(table):
+                log.info('Ingest skipped')
+                continue
+
+            if value.get('cf') is None:
+                log.warn('Column family undefined: writer skipped')
+                continue
+
+            # Check if we can override the row_id.
+            ingest_row_id = row_id
+            if value.get('row_id') is not None:
+                ingest_row_id = value.get('row_id')
+                log.info('Overriding row_id with "%s"' % ingest_row_id)
+
+            log.info('Creating mutation for Row ID: "%s"' % ingest_row_id)
+            mutation = pyaccumulo.Mutation(ingest_row_id)
+
+            family_qualifiers = value.get('cf').get('cq')
+            self._ingest_family_qualifiers(family_qualifiers, mutation)
+
+            family_values = value.get('cf').get('val')
+            self._ingest_family_values(family_values, mutation)
+
+            yield (table, mutation)
 
     def _ingest_family_qualifiers(self, family_qualifiers, mutation):
         if family_qualifiers is not None:
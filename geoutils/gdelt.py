@@ -8,6 +8,8 @@ ingests and geospatial queries.
 """
 __all__ = ["Gdelt"]
 
+import numpy
+
 import geoutils
 
 from geosutils.log import log
@@ -32,6 +34,18 @@ class Gdelt(object):
     _date_added = None
     _source_url = None
 
+    # Columns (in order) of the trailing DATA MANAGEMENT FIELDS block
+    # (index 49 onwards) as extracted by extract_gdelt_columns.
+    _geo_columns = ['type',
+                    'fullname',
+                    'country_code',
+                    'adm1_code',
+                    'latitude',
+                    'longitude',
+                    'feature_id',
+                    'date_added',
+                    'source_url']
+
     def __init__(self, data=None):
         """Accept a line of *data* from a GDELT source file and extract
         all relevant values.
@@ -40,16 +54,21 @@ class Gdelt(object):
         if data is not None:
             self.extract_gdelt(data)
 
-    def __call__(self):
+    def __call__(self, spatial=None):
         """The object instance callable is a quick handle to the
         GDELT event ingest schema object.
 
+        **Kwargs:**
+            *spatial*: :class:`geoutils.index.Spatial` object that
+            generates the spatial index row key.  Defaults to a single
+            stripe
+
         **Returns:**
             a dictionary structure that can be fed into a
             :class:`geoutils.Datastore` ingest
 
         """
-        schema = geoutils.Schema()
+        schema = geoutils.Schema(spatial=spatial)
 
         schema.build_gdelt_spatial_index('gdelt_spatial_index', self)
 
@@ -178,3 +197,101 @@ class Gdelt(object):
 
         if len(event_columns) == 58:
                 self.source_url = event_columns[57]
+
+    @staticmethod
+    def extract_gdelt_columns(lines):
+        """Batch version of :meth:`geoutils.Gdelt.extract_gdelt` that
+        extracts the GDELT data from *lines* into columns.
+
+        Lines of the same width are joined and split once so that each
+        column is a strided slice of the one field list.  Only the
+        GlobalEventID and Day columns (index 0 and 1) and the trailing
+        geography and data management columns (index 49 to 57) are
+        kept.  Lines that are neither the current (58 column) nor the
+        pre April 2013 (57 column) width are skipped.
+
+        **Args:**
+            *lines*: iterable of GDELT export lines.  Typically, a file
+            handle to an uncompressed ``*.export.CSV`` file
+
+        **Returns:**
+            dictionary of columns keyed by the
+            :class:`geoutils.Gdelt` attribute names.  ``event_id`` is a
+            :mod:`numpy` ``int64`` array, ``latitude`` and ``longitude``
+            are :mod:`numpy` ``float64`` arrays (``NaN`` if undefined)
+            and the remaining columns are :mod:`numpy` fixed width
+            string arrays.  For example::
+
+                {'event_id': array([324845984, ...]),
+                 'event_day': array(['20041126', ...], dtype='|S8'),
+                 ...
+                 'latitude': array([38.8951, ...]),
+                 'longitude': array([-77.0364, ...]),
+                 ...}
+
+        """
+        lines = [line.rstrip('\r\n') for line in lines]
+        widths = numpy.array([line.count('\t') + 1 for line in lines],
+                             dtype=numpy.intp)
+
+        names = ['event_id', 'event_day'] + Gdelt._geo_columns
+        texts = dict((name, numpy.empty(len(lines), dtype=object))
+                     for name in names)
+        for text in texts.values():
+            text.fill('')
+
+        for width in (58, 57):
+            indexes = numpy.flatnonzero(widths == width)
+            if not len(indexes):
+                continue
+
+            fields = '\t'.join([lines[i] for i in indexes]).split('\t')
+            positions = [0, 1] + range(49, width)
+            for name, position in zip(names, positions):
+                texts[name][indexes] = fields[position::width]
+
+        valid = numpy.flatnonzero((widths == 58) | (widths == 57))
+        if len(valid) < len(lines):
+            log.error('Skipped %d malformed GDELT lines' %
+                      (len(lines) - len(valid)))
+
+        columns = {}
+        for name in names:
+            columns[name] = texts[name][valid].astype('S')
+            if not columns[name].itemsize:
+                columns[name] = columns[name].astype('S1')
+
+        columns['event_id'] = columns['event_id'].astype(numpy.int64)
+        for name in ['latitude', 'longitude']:
+            column = columns[name].astype('S%d' %
+                                          max(columns[name].itemsize, 3))
+            column[column == ''] = 'nan'
+            columns[name] = column.astype(numpy.float64)
+
+        log.debug('Extracted %d GDELT rows into columns' % len(valid))
+
+        return columns
+
+    @staticmethod
+    def schemas(lines, spatial=None):
+        """Batch counterpart of the :class:`geoutils.Gdelt` callable
+        that builds the GDELT event ingest schema of each of *lines*.
+
+        **Args:**
+            *lines*: iterable of GDELT export lines
+
+        **Kwargs:**
+            *spatial*: :class:`geoutils.index.Spatial` object that
+            generates the spatial index row key.  Defaults to a single
+            stripe
+
+        **Returns:**
+            list of independent dictionary structures that can be fed
+            into a :class:`geoutils.Datastore` ingest
+
+        """
+        columns = Gdelt.extract_gdelt_columns(lines)
+        schema = geoutils.Schema(spatial=spatial)
+
+        return schema.build_gdelt_spatial_indexes('gdelt_spatial_index',
+                                                  columns)
@@ -0,0 +1,381 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.GdeltPipeline` streams a GDELT export file into
+the Accumulo datastore through a series of parallel stages.
+
+"""
+__all__ = ["GdeltPipeline",
+           "GdeltPipelineError"]
+
+import time
+from multiprocessing import (Event,
+                             Process,
+                             Queue)
+from Queue import (Empty,
+                   Full)
+
+import geoutils
+import geoutils.index
+from geosutils.log import log
+from geosutils.utils import get_reverse_timestamp
+from geoutils.auditer import audit
+
+
+class GdeltPipelineError(Exception):
+    """Raised when a :class:`geoutils.GdeltPipeline` stage fails and
+    the pipeline is aborted.
+
+    .. attribute:: *counters*
+        the aggregate ingest counters of the write workers that
+        reported before the abort
+
+    """
+    def __init__(self, message, counters=None):
+        super(GdeltPipelineError, self).__init__(message)
+        self.counters = counters or {}
+
+
+class GdeltPipeline(object):
+    """:class:`geoutils.GdeltPipeline`
+
+    The pipeline is made up of the following stages that are connected
+    by bounded queues:
+
+    * *read*: the GDELT export file handle (typically a zip member) is
+      decompressed and read in chunks of :attr:`chunk_size` lines in the
+      calling process
+    * *parse*: :attr:`parse_workers` processes split each chunk into
+      columns (:meth:`geoutils.Gdelt.extract_gdelt_columns`) and build
+      the GDELT spatial index schema (including the geohash and row key)
+      of each event
+    * *write*: :attr:`write_workers` processes each hold their own
+      :class:`geoutils.Datastore` connection and ingest each chunk in
+      a single :meth:`geoutils.Datastore.ingest_many` batch
+
+    Each queue holds at most :attr:`queue_size` chunks.  A full queue
+    blocks the upstream stage so memory use is bounded regardless of the
+    size of the export file.
+
+    If any stage fails (or a worker process dies) a shared abort event
+    is set.  All queue operations wait at most :attr:`poll_interval`
+    seconds before checking the abort event and worker liveness, so the
+    remaining stages wind down instead of blocking on a queue that is
+    no longer drained.  The failure is raised to the caller as a
+    :class:`geoutils.gdeltpipeline.GdeltPipelineError`.
+
+    .. attribute:: *datastore_factory*
+        callable that returns a connected :class:`geoutils.Datastore`.
+        Called once by each write worker
+
+    .. attribute:: *dry*
+        if ``True`` only the first line is processed and the ingest is
+        simulated
+
+    .. attribute:: *spatial*
+        :class:`geoutils.index.Spatial` object that generates the
+        GDELT spatial index row keys
+
+    """
+    _spatial = geoutils.index.Spatial()
+    _parse_workers = 2
+    _write_workers = 2
+    _queue_size = 8
+    _chunk_size = 1000
+    _poll_interval = 1.0
+
+    def __init__(self, datastore_factory, dry=False):
+        self.datastore_factory = datastore_factory
+        self.dry = dry
+
+    def __call__(self, file_h):
+        """Stream the GDELT export *file_h* through the pipeline.
+
+        **Args:**
+            *file_h*: file-like object of the GDELT export file
+
+        **Returns:**
+            dictionary of the aggregate ingest counters across all write
+            workers (as per :meth:`geoutils.Datastore.ingest_many`)
+
+        **Raises:**
+            :class:`geoutils.gdeltpipeline.GdeltPipelineError` if a
+            stage failed
+
+        """
+        parse_queue = Queue(self.queue_size)
+        write_queue = Queue(self.queue_size)
+        result_queue = Queue()
+        abort = Event()
+
+        parsers = [Process(target=self._parse,
+                           args=(parse_queue,
+                                 write_queue,
+                                 result_queue,
+                                 abort))
+                   for _ in range(self.parse_workers)]
+        writers = [Process(target=self._write,
+                           args=(write_queue, result_queue, abort))
+                   for _ in range(self.write_workers)]
+        procs = parsers + writers
+        for proc in procs:
+            proc.start()
+
+        self._read(file_h, parse_queue, abort, procs)
+        for _ in parsers:
+            self._put(parse_queue, None, abort, writers)
+        self._join(parsers, abort, writers)
+        for _ in writers:
+            self._put(write_queue, None, abort, writers)
+
+        (counters, errors) = self._collect(result_queue, abort, procs)
+        self._join(procs, abort)
+
+        log.info('GDELT pipeline counters: %s' % counters)
+
+        if errors:
+            raise GdeltPipelineError('; '.join(errors), counters)
+
+        return counters
+
+    @property
+    def spatial(self):
+        return self._spatial
+
+    @spatial.setter
+    def spatial(self, value):
+        self._spatial = value
+
+    @property
+    def parse_workers(self):
+        return self._parse_workers
+
+    @parse_workers.setter
+    def parse_workers(self, value):
+        self._parse_workers = value
+
+    @property
+    def write_workers(self):
+        return self._write_workers
+
+    @write_workers.setter
+    def write_workers(self, value):
+        self._write_workers = value
+
+    @property
+    def queue_size(self):
+        return self._queue_size
+
+    @queue_size.setter
+    def queue_size(self, value):
+        self._queue_size = value
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value):
+        self._chunk_size = value
+
+    @property
+    def poll_interval(self):
+        return self._poll_interval
+
+    @poll_interval.setter
+    def poll_interval(self, value):
+        self._poll_interval = value
+
+    def _put(self, queue, item, abort, procs=None):
+        """Put *item* on *queue*, waiting for space until the pipeline
+        is aborted.  The pipeline is aborted if any of *procs* dies
+        (see :meth:`failed`) while waiting.
+
+        **Returns:**
+            Boolean ``True`` if *item* was queued
+
+        """
+        while not abort.is_set():
+            try:
+                queue.put(item, timeout=self.poll_interval)
+                return True
+            except Full:
+                if self.failed(procs):
+                    abort.set()
+
+        return False
+
+    def _get(self, queue, abort):
+        """Generator of the items on *queue* until the ``None``
+        sentinel is received or the pipeline is aborted.
+
+        """
+        while not abort.is_set():
+            try:
+                item = queue.get(timeout=self.poll_interval)
+            except Empty:
+                continue
+
+            if item is None:
+                break
+
+            yield item
+
+    def _join(self, procs, abort, watch=None):
+        for proc in procs:
+            while proc.is_alive():
+                proc.join(self.poll_interval)
+                if self.failed(watch):
+                    abort.set()
+                if abort.is_set() and proc.is_alive():
+                    log.warn('Terminating GDELT pipeline worker %s' %
+                             proc.pid)
+                    proc.terminate()
+                    proc.join(self.poll_interval)
+
+    @staticmethod
+    def failed(procs):
+        """Check if any of *procs* has died with a non-zero exit code
+        (for example, killed by a signal).
+
+        """
+        dead = [p for p in procs or [] if p.exitcode not in (None, 0)]
+        for proc in dead:
+            log.error('GDELT pipeline worker %s died (exit code %s)' %
+                      (proc.pid, proc.exitcode))
+
+        return bool(dead)
+
+    def _collect(self, result_queue, abort, procs):
+        """Gather the final report of each of the *procs* workers.
+
+        **Returns:**
+            tuple of the aggregate counters and the list of error
+            messages
+
+        """
+        counters = {}
+        errors = []
+
+        pending = len(procs)
+        while pending:
+            try:
+                (worker_counters, error) = result_queue.get(
+                    timeout=self.poll_interval)
+            except Empty:
+                # Allow one more poll for results from workers that
+                # exited before the liveness check.
+                if not [p for p in procs if p.is_alive()]:
+                    try:
+                        (worker_counters, error) = result_queue.get(
+                            timeout=self.poll_interval)
+                    except Empty:
+                        errors.append('%d workers exited without a report' %
+                                      pending)
+                        abort.set()
+                        break
+                else:
+                    continue
+
+            pending -= 1
+            for name, value in worker_counters.iteritems():
+                counters[name] = counters.get(name, 0) + value
+            if error is not None:
+                errors.append(error)
+                abort.set()
+
+        return (counters, errors)
+
+    def _read(self, file_h, parse_queue, abort, procs):
+        chunk = []
+        for line in file_h:
+            chunk.append(line)
+
+            # Only perform a single iteration in dry mode.
+            if self.dry:
+                break
+
+            if len(chunk) >= self.chunk_size:
+                if not self._put(parse_queue, chunk, abort, procs):
+                    return
+                chunk = []
+
+        if chunk:
+            self._put(parse_queue, chunk, abort, procs)
+
+    def _parse(self, parse_queue, write_queue, result_queue, abort):
+        error = None
+        try:
+            for chunk in self._get(parse_queue, abort):
+                schemas = geoutils.Gdelt.schemas(chunk, self.spatial)
+                if not self._put(write_queue, schemas, abort):
+                    break
+        except Exception as err:  # pylint: disable=W0703
+            # Any failure must abort the pipeline, not hang it.
+            log.error('GDELT parse worker error: %s' % err)
+            error = 'parse: %s' % err
+            abort.set()
+        finally:
+            if abort.is_set():
+                write_queue.cancel_join_thread()
+            result_queue.put(({}, error))
+
+    def _write(self, write_queue, result_queue, abort):
+        counters = {}
+        error = None
+        datastore = None
+        try:
+            datastore = self.datastore_factory()
+            if datastore is None or datastore.connection is None:
+                raise IOError('Datastore connection not detected')
+
+            for schemas in self._get(write_queue, abort):
+                start = str(time.time())
+                results = datastore.ingest_many(schemas,
+                                                batch_size=len(schemas),
+                                                dry=self.dry)
+                finish = str(time.time())
+
+                audits = self.audits(results['records'], start, finish)
+                datastore.ingest_many(audits, dry=self.dry)
+
+                for name, value in results['counters'].iteritems():
+                    counters[name] = counters.get(name, 0) + value
+        except Exception as err:  # pylint: disable=W0703
+            # Any failure must abort the pipeline, not hang it.
+            log.error('GDELT write worker error: %s' % err)
+            error = 'write: %s' % err
+            abort.set()
+        finally:
+            if datastore is not None:
+                datastore.close()
+            result_queue.put((counters, error))
+
+    @staticmethod
+    def audits(records, start, finish):
+        """Generator of audit records for each successfully ingested
+        GDELT row.
+
+        **Args:**
+            *records*: list of ``(row_id, status)`` tuples as returned
+            by :meth:`geoutils.Datastore.ingest_many`
+
+            *start*: ingest start time
+
+            *finish*: ingest finish time
+
+        Each audit row key carries the GDELT *row_id* so that rows
+        audited within the same timestamp are not merged.
+
+        """
+        for row_id, status in records:
+            if not status:
+                continue
+
+            audit.data = {'gdelt_daemon|start': start}
+            audit.data = {'gdelt_daemon|finish': finish}
+            audit.data = {'gdelt_daemon|row_id': row_id}
+            audit.source_id = ('%s_%s_gdelt_daemon' %
+                               (get_reverse_timestamp(), row_id))
+
+            yield audit()
+
+            audit.reset()
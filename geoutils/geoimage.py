@@ -6,17 +6,70 @@ and an image.  This class focuses on the image.
 """
 __all__ = ["GeoImage"]
 
+import io
+import math
+import StringIO
 import Image
 import numpy
+from osgeo import gdal
 
 from geosutils.log import log
 
 
+RGB_INTERPRETATIONS = [gdal.GCI_RedBand, gdal.GCI_GreenBand, gdal.GCI_BlueBand]
+
+# The buffer spacing arguments of Dataset.ReadRaster arrived in GDAL 2.0.
+INTERLEAVED_READ = int(gdal.VersionInfo('VERSION_NUM')) >= 2000000
+
+
 class GeoImage(object):
     """:class:`geouitls.Image`
 
+    .. attribute:: *tile_size*
+        minimum edge length (in pixels) of the source window read in
+        each step of a tiled extraction (see
+        :meth:`extract_tiled_image`).  Windows are rounded up to a
+        multiple of the raster block size (default 1024)
+
+    .. attribute:: *percentiles*
+        ``(low, high)`` percentiles of the pixel values that are
+        stretched to 0 and 255 when converting non 8-bit imagery
+        (default ``(2, 98)``)
+
+    .. attribute:: *sample_size*
+        approximate number of pixels sampled per band to calculate the
+        stretch percentiles (default 65536)
+
     """
-    def extract_image(self, dataset, downsample=None):
+    _tile_size = 1024
+    _percentiles = (2, 98)
+    _sample_size = 65536
+
+    @property
+    def tile_size(self):
+        return self._tile_size
+
+    @tile_size.setter
+    def tile_size(self, value):
+        self._tile_size = value
+
+    @property
+    def percentiles(self):
+        return self._percentiles
+
+    @percentiles.setter
+    def percentiles(self, value):
+        self._percentiles = value
+
+    @property
+    def sample_size(self):
+        return self._sample_size
+
+    @sample_size.setter
+    def sample_size(self, value):
+        self._sample_size = value
+
+    def extract_image(self, dataset, downsample=None, tiled=False):
         """Attempts to extract the image from the
         :attr:`geoutils.Standard.dataset` *dataset*
 
@@ -48,6 +101,14 @@ class GeoImage(object):
 
             *downsample*: column size of downsampled image
 
+            *tiled*: if ``True``, read the source in block aligned
+            windows to bound memory use (see
+            :meth:`extract_tiled_image`)
+
+        Imagery with other than 1 or 3 bands, or with other than 8-bit
+        pixels, is always extracted with :meth:`extract_tiled_image`,
+        which selects the bands and stretches the pixels to 8-bit.
+
         **Returns:**
             On success, type ``string`` that contains
             :func:`osgeo.gdal.Dataset.GetRasterBand.XSize` x 4 bytes
@@ -73,8 +134,14 @@ class GeoImage(object):
 
                 log.debug('Raster count: %d' % dataset.RasterCount)
 
+                byte = band.DataType == gdal.GDT_Byte
+
                 result = None
-                if dataset.RasterCount == 1:
+                if tiled or not byte or dataset.RasterCount not in (1, 3):
+                    result = self.extract_tiled_image(dataset,
+                                                      x_size,
+                                                      y_size)
+                elif dataset.RasterCount == 1:
                     result = band.ReadRaster(0, 0,
                                              band.XSize,
                                              band.YSize,
@@ -96,25 +163,273 @@ class GeoImage(object):
                                 x_size,
                                 y_size,
                                 buf_x_size,
-                                buf_y_size):
-        """TODO
+                                buf_y_size,
+                                interleaved=None):
+        """Extract the red, green and blue bands of *dataset* (as per
+        :meth:`select_bands`) as a pixel interleaved (RGBRGB...) image.
+
+        With GDAL 2.0 or later, all bands are read in a single
+        :func:`osgeo.gdal.Dataset.ReadRaster` call that writes the
+        pixels directly in their interleaved positions, so there are
+        no intermediate per-band buffers.  Earlier GDAL releases read
+        each band into its (strided) view of the interleaved buffer.
+
+        **Args:**
+            *dataset*: a :class:`gdal.Dataset` object
+
+            *x_size*, *y_size*: source dimensions to read
+
+            *buf_x_size*, *buf_y_size*: output image dimensions
+
+        **Kwargs:**
+            *interleaved*: if ``False``, read each band separately
+            (defaults to ``True`` for GDAL 2.0 or later)
+
+        **Returns:**
+            type ``string`` of the pixel interleaved 8-bit image data
 
         """
-        image_rect = numpy.ndarray((buf_y_size, buf_x_size, 3), numpy.uint8)
+        bands = self.select_bands(dataset)
+
+        if interleaved is None:
+            interleaved = INTERLEAVED_READ
+
+        if interleaved:
+            return dataset.ReadRaster(0, 0,
+                                      x_size,
+                                      y_size,
+                                      buf_x_size,
+                                      buf_y_size,
+                                      band_list=bands,
+                                      buf_pixel_space=3,
+                                      buf_line_space=3 * buf_x_size,
+                                      buf_band_space=1)
+
+        image_rect = numpy.empty((buf_y_size, buf_x_size, len(bands)),
+                                 numpy.uint8)
+        for i, band_no in enumerate(bands):
+            band = dataset.GetRasterBand(band_no)
+            band.ReadAsArray(0, 0,
+                             x_size,
+                             y_size,
+                             buf_xsize=buf_x_size,
+                             buf_ysize=buf_y_size,
+                             buf_obj=image_rect[:, :, i])
 
-        for i in range(3):
-            band = dataset.GetRasterBand(i + 1)
-            color = band.ReadRaster(0, 0,
-                                    x_size,
-                                    y_size,
-                                    buf_x_size,
-                                    buf_y_size)
+        return image_rect.tostring()
 
-            arr = numpy.fromstring(color, numpy.uint8)
-            image_rect[:, :, i] = arr.reshape([buf_y_size, buf_x_size])
+    def extract_tiled_image(self,
+                            dataset,
+                            buf_x_size,
+                            buf_y_size,
+                            overviews=True):
+        """Downsample all bands of *dataset* into a *buf_x_size* x
+        *buf_y_size* image, one block aligned window at a time.
+
+        Any number of bands and pixel data type is supported.  The
+        bands are chosen by :meth:`select_bands` and pixels other than
+        8-bit are converted with :meth:`stretch`.
+
+        If the source carries reduced resolution overviews, the
+        smallest overview that is still at least the output size is
+        read instead of the full resolution band (see
+        :meth:`select_overview`).
+
+        Each window spans a whole number of raster blocks (as per
+        :func:`osgeo.gdal.Band.GetBlockSize`) and at least
+        :attr:`tile_size` pixels along each edge.  GDAL reduces each
+        window directly into its share of the output buffer, so peak
+        memory is bounded by the window and output sizes regardless of
+        the size of the source image.
+
+        **Args:**
+            *dataset*: a :class:`gdal.Dataset` object
+
+            *buf_x_size*: column size of the output image
+
+            *buf_y_size*: row size of the output image
+
+        **Kwargs:**
+            *overviews*: if ``False``, always read the full resolution
+            bands
+
+        **Returns:**
+            type ``string`` of the pixel interleaved 8-bit image data
+            (as per :meth:`extract_multiband_image` for multiple bands)
+
+        """
+        bands = [dataset.GetRasterBand(i)
+                 for i in self.select_bands(dataset)]
+
+        if overviews:
+            level = self.select_overview(bands[0], buf_x_size, buf_y_size)
+            if level is not None:
+                bands = [band.GetOverview(level) for band in bands]
+                log.debug('Reading overview %d (%dx%d)' %
+                          (level, bands[0].XSize, bands[0].YSize))
+
+        x_size = bands[0].XSize
+        y_size = bands[0].YSize
+
+        # GDAL converts other pixel types to the buffer type on read.
+        dtype = numpy.uint8
+        if [b for b in bands if b.DataType != gdal.GDT_Byte]:
+            dtype = numpy.float32
+        image_rect = numpy.empty((buf_y_size, buf_x_size, len(bands)),
+                                 dtype)
+
+        windows = list(self.tile_windows(bands[0]))
+        log.debug('Tiled extraction of %d windows' % len(windows))
+
+        for (x_off, y_off, x_win, y_win) in windows:
+            (col_0, col_1) = self.buffer_span(x_off, x_win, x_size, buf_x_size)
+            (row_0, row_1) = self.buffer_span(y_off, y_win, y_size, buf_y_size)
+            if col_1 <= col_0 or row_1 <= row_0:
+                continue
+
+            # Read each window straight into its (strided) view of
+            # the output buffer.
+            for i, band in enumerate(bands):
+                band.ReadAsArray(x_off, y_off,
+                                 x_win,
+                                 y_win,
+                                 buf_xsize=col_1 - col_0,
+                                 buf_ysize=row_1 - row_0,
+                                 buf_obj=image_rect[row_0:row_1,
+                                                    col_0:col_1,
+                                                    i])
+
+        if dtype is not numpy.uint8:
+            image_rect = self.stretch(image_rect,
+                                      self.percentiles,
+                                      self.sample_size)
 
         return image_rect.tostring()
 
+    @staticmethod
+    def select_bands(dataset):
+        """Select the bands of *dataset* to render.
+
+        The red, green and blue bands are selected by their colour
+        interpretation (for example, bands 3, 2 and 1 of a 4-band
+        B, G, R, NIR multispectral image).  Otherwise, 3-band imagery
+        is treated as RGB and all other imagery is rendered as MONO
+        from the first band.
+
+        **Returns:**
+            list of the 1-based band numbers.  Three bands denotes
+            an RGB image
+
+        """
+        interps = {}
+        for i in range(dataset.RasterCount, 0, -1):
+            interp = dataset.GetRasterBand(i).GetColorInterpretation()
+            interps[interp] = i
+
+        if all(i in interps for i in RGB_INTERPRETATIONS):
+            bands = [interps[i] for i in RGB_INTERPRETATIONS]
+        elif dataset.RasterCount == 3:
+            bands = [1, 2, 3]
+        else:
+            bands = [1]
+
+        log.debug('Selected bands: %s' % bands)
+
+        return bands
+
+    @staticmethod
+    def stretch(image_rect, percentiles=(2, 98), sample_size=65536):
+        """Linearly stretch each band of *image_rect* to 8-bit between
+        its low and high *percentiles*.
+
+        The percentiles are calculated from a regularly decimated
+        sample of about *sample_size* pixels per band and the stretch
+        is vectorised across the whole band.
+
+        **Args:**
+            *image_rect*: ``(rows, columns, bands)`` array
+
+        **Returns:**
+            ``(rows, columns, bands)`` array of ``numpy.uint8``
+
+        """
+        (rows, cols) = image_rect.shape[:2]
+        step = max(1, int(math.ceil(math.sqrt(rows * cols /
+                                              float(sample_size)))))
+
+        stretched = numpy.empty(image_rect.shape, numpy.uint8)
+        scaled = numpy.empty((rows, cols), numpy.float32)
+        for i in range(image_rect.shape[2]):
+            band = image_rect[:, :, i]
+            (low, high) = numpy.percentile(band[::step, ::step],
+                                           percentiles)
+            if high <= low:
+                high = low + 1.0
+            log.debug('Band %d stretch: %s-%s' % (i + 1, low, high))
+
+            numpy.subtract(band, low, out=scaled)
+            numpy.multiply(scaled, 255.0 / (high - low), out=scaled)
+            numpy.clip(scaled, 0, 255, out=scaled)
+            stretched[:, :, i] = scaled
+
+        return stretched
+
+    @staticmethod
+    def select_overview(band, buf_x_size, buf_y_size):
+        """Select the smallest overview of *band* that is at least
+        *buf_x_size* x *buf_y_size* pixels.
+
+        **Returns:**
+            the overview index (as per
+            :func:`osgeo.gdal.Band.GetOverview`) or ``None`` if *band*
+            has no suitable overview
+
+        """
+        level = None
+        pixels = None
+        for i in range(band.GetOverviewCount()):
+            overview = band.GetOverview(i)
+            if overview is None:
+                continue
+            if overview.XSize < buf_x_size or overview.YSize < buf_y_size:
+                continue
+
+            if pixels is None or overview.XSize * overview.YSize < pixels:
+                level = i
+                pixels = overview.XSize * overview.YSize
+
+        return level
+
+    def tile_windows(self, band):
+        """Generator of the block aligned ``(x_off, y_off, x_size,
+        y_size)`` source windows that cover *band*.
+
+        """
+        (block_x, block_y) = band.GetBlockSize()
+        step_x = block_x * max(1, -(-self.tile_size // block_x))
+        step_y = block_y * max(1, -(-self.tile_size // block_y))
+
+        for y_off in range(0, band.YSize, step_y):
+            for x_off in range(0, band.XSize, step_x):
+                yield (x_off,
+                       y_off,
+                       min(step_x, band.XSize - x_off),
+                       min(step_y, band.YSize - y_off))
+
+    @staticmethod
+    def buffer_span(offset, size, source_size, buf_size):
+        """Map the source pixel span *offset* to *offset* + *size* onto
+        the ``(start, end)`` span of the output buffer.
+
+        Adjacent source spans map to adjacent buffer spans so the
+        windows of a tiled extraction fill the buffer exactly once.
+
+        """
+        start = offset * buf_size // source_size
+        end = (offset + size) * buf_size // source_size
+
+        return (start, end)
+
     def scale(self, old_scale, new_x_scale=300):
         """Provide the new image dimensions based on a new *new_x_scale*
         value.  Generally used to downsample an original image.
@@ -202,9 +517,84 @@ class GeoImage(object):
 
         """
         def reconstruct():
-            arr = numpy.fromstring(image_stream(), dtype=numpy.uint8)
-            arr = numpy.reshape(arr, dimensions)
+            # A read-only view over the stream: no copy until PIL.
+            arr = numpy.frombuffer(image_stream(), dtype=numpy.uint8)
 
-            return Image.fromarray(arr)
+            return Image.fromarray(arr.reshape(dimensions))
 
         return reconstruct
+
+    @staticmethod
+    def can_encode(img_format):
+        """Check that the :mod:`Image` library has an encoder for
+        *img_format*.  For example, ``WEBP`` is not supported by
+        python-imaging 1.1.6.
+
+        **Returns:**
+            Boolean ``True`` if images can be saved as *img_format*
+
+        """
+        Image.init()
+
+        return img_format in Image.SAVE
+
+    @staticmethod
+    def encode_image(image_stream,
+                     dimensions,
+                     image_type='MONO',
+                     img_format='JPEG',
+                     quality=85):
+        """Compress a raw 1D image stream (as produced by
+        :meth:`extract_image`).
+
+        **Args:**
+            *image_stream*: callable that returns the raw 8-bit image
+            data
+
+            *dimensions*: ``(x_size, y_size)`` of the image
+
+        **Kwargs:**
+            *image_type*: ``MONO`` (default) or ``RGB``
+
+            *img_format*: :mod:`Image` format to encode to, for example
+            ``JPEG`` (default) or ``PNG`` (see :meth:`can_encode`)
+
+            *quality*: lossy compression quality (default 85)
+
+        **Returns:**
+            callable that returns the encoded image ``string``
+
+        """
+        def encode():
+            if image_type == 'RGB':
+                image = GeoImage.reconstruct_mb_image(image_stream,
+                                                      (dimensions[1],
+                                                       dimensions[0],
+                                                       3))()
+            else:
+                image = GeoImage.reconstruct_image(image_stream, dimensions)
+
+            log.debug('Encoding %s image to format "%s"' %
+                      (image_type, img_format))
+            # PIL 1.1.6 only falls back to writing a file object in
+            # memory when it has no fileno() method (unlike io.BytesIO).
+            encoded = StringIO.StringIO()
+            image.save(encoded, img_format, quality=quality)
+
+            return encoded.getvalue()
+
+        return encode
+
+    @staticmethod
+    def decode_image(image_stream):
+        """Open an encoded (for example, JPEG) image stream.
+
+        **Args:**
+            *image_stream*: callable that returns the encoded image
+            ``string``
+
+        **Returns:**
+            A :mod:`Image` image in memory
+
+        """
+        return Image.open(io.BytesIO(image_stream()))
@@ -1 +1,2 @@
 from spatial import Spatial
+from splitplanner import SplitPlanner
@@ -6,16 +6,38 @@ indexing mechanism.
 __all__ = ['Spatial']
 
 import geohash
+import numpy
 
 from geosutils.log import log
-from geosutils.utils import hashcode
+from geosutils.utils import (hashcode,
+                             get_reverse_timestamp)
+
+
+BASE32 = numpy.array(list('0123456789bcdefghjkmnpqrstuvwxyz'), dtype='S1')
+EARTH_RADIUS = 6371008.8
 
 
 class Spatial(object):
     """Spatial Accumulo datastore index.
 
+    .. attribute:: *stripes*
+        number of stripes (typically, the number of Accumulo tablet
+        servers) to distribute the spatial index rows across
+
+    .. attribute:: *order*
+        list of row key components (separated by underscores) that form
+        the spatial index row key.  Supported components are
+        ``stripe``, ``geohash`` and ``reverse_time``
+
     """
     _stripes = 1
+    _order = ['stripe', 'geohash', 'reverse_time']
+
+    def __init__(self, stripes=None, order=None):
+        if stripes is not None:
+            self.stripes = stripes
+        if order is not None:
+            self.order = order
 
     @property
     def stripes(self):
@@ -25,6 +47,14 @@ class Spatial(object):
     def stripes(self, value):
         self._stripes = value
 
+    @property
+    def order(self):
+        return self._order
+
+    @order.setter
+    def order(self, value):
+        self._order = value
+
     def gen_geohash(self,
                     latitude,
                     longitude,
@@ -61,11 +91,261 @@ class Spatial(object):
                                       longitude,
                                       precision=precision)
 
-        log.info('Geohash for lat/long "%s/%s" produced "%s"' %
-                 (latitude, longitude, hash))
+        log.debug('Geohash for lat/long "%s/%s" produced "%s"' %
+                  (latitude, longitude, hash))
 
         return hash
 
+    def gen_geohash_array(self, latitudes, longitudes, precision=12):
+        """Vectorised version of :meth:`geoutils.index.Spatial.gen_geohash`
+        that converts arrays of lat/long points into geohashes.
+
+        **Args:**
+            *latitudes*: array-like of point latitudes
+
+            *longitudes*: array-like of point longitudes
+
+            *precision*: number of characters to use in the geohash
+
+        **Returns:**
+            :mod:`numpy` fixed width string array of geohash values.
+            Points with an undefined (``NaN``) latitude or longitude
+            produce an empty string
+
+        """
+        lats = numpy.asarray(latitudes, dtype=numpy.float64)
+        lons = numpy.asarray(longitudes, dtype=numpy.float64)
+
+        codes = self.gen_geohash_int_array(lats, lons, precision)
+
+        shifts = numpy.arange(5 * (precision - 1), -1, -5).astype(numpy.uint64)
+        indexes = (codes[:, numpy.newaxis] >> shifts) & numpy.uint64(31)
+        chars = numpy.ascontiguousarray(BASE32[indexes.astype(numpy.intp)])
+        hashes = chars.view('S%d' % precision).ravel()
+
+        hashes[numpy.isnan(lats) | numpy.isnan(lons)] = ''
+
+        log.debug('Geohash array of %d points produced' % len(hashes))
+
+        return hashes
+
+    @staticmethod
+    def gen_geohash_int_array(latitudes, longitudes, precision=12):
+        """Convert arrays of lat/long points into integer geohashes.
+
+        The integer geohash holds the ``5 * precision`` interleaved
+        longitude/latitude bits of the base32 geohash (longitude bit
+        first).  This makes for a compact key that sorts in the same
+        order as the base32 geohash.
+
+        As with :func:`geohash.encode`, longitudes wrap around into the
+        ``[-180, 180)`` range so that a longitude of 180 falls in the
+        same cell as -180.  Latitudes are clamped to ``[-90, 90]``.
+
+        **Args:**
+            *latitudes*: array-like of point latitudes
+
+            *longitudes*: array-like of point longitudes
+
+            *precision*: number of base32 characters that the integer
+            geohash represents (12 or less)
+
+        **Returns:**
+            :mod:`numpy` ``uint64`` array of integer geohash values.
+            Values for points with an undefined (``NaN``) latitude or
+            longitude are undefined
+
+        """
+        bits = 5 * precision
+        lon_bits = (bits + 1) // 2
+        lat_bits = bits // 2
+
+        lats = numpy.nan_to_num(numpy.asarray(latitudes, dtype=numpy.float64))
+        lons = numpy.nan_to_num(numpy.asarray(longitudes, dtype=numpy.float64))
+        lons = numpy.mod(lons + 180.0, 360.0) - 180.0
+
+        lat_cells = Spatial._quantise(lats, -90.0, 90.0, lat_bits)
+        lon_cells = Spatial._quantise(lons, -180.0, 180.0, lon_bits)
+
+        codes = numpy.zeros(lats.shape, dtype=numpy.uint64)
+        one = numpy.uint64(1)
+        for bit in range(bits):
+            if bit % 2 == 0:
+                cells = lon_cells
+                shift = numpy.uint64(lon_bits - 1 - bit // 2)
+            else:
+                cells = lat_cells
+                shift = numpy.uint64(lat_bits - 1 - bit // 2)
+            codes = (codes << one) | ((cells >> shift) & one)
+
+        return codes
+
+    def gen_geohash_cover(self,
+                          min_lat,
+                          min_lon,
+                          max_lat,
+                          max_lon,
+                          max_cells=32,
+                          precision=None):
+        """Build the set of geohashes that cover a bounding box.
+
+        Unless *precision* is given, the precision is the highest that
+        covers the box in no more than *max_cells* geohash cells.  Any
+        complete set of 32 sibling cells is then merged into its parent
+        so the cover holds the fewest geohash prefixes possible.
+
+        A box with *min_lon* greater than *max_lon* crosses the
+        antimeridian and is covered as the two boxes either side of it.
+        A box with *min_lat* greater than *max_lat* is rejected with an
+        empty cover.
+
+        **Args:**
+            *min_lat*, *min_lon*, *max_lat*, *max_lon*: bounding box
+            extents
+
+        **Kwargs:**
+            *max_cells*: upper bound on the number of cover cells when
+            choosing the precision
+
+            *precision*: override the adaptive precision
+
+        **Returns:**
+            sorted list of geohash strings.  Empty if the box is
+            inverted
+
+        """
+        if min_lat > max_lat:
+            log.error('Inverted bounding box latitudes %s/%s: no cover' %
+                      (min_lat, max_lat))
+            return []
+
+        if min_lon > max_lon:
+            log.debug('Bounding box crosses the antimeridian: split')
+            boxes = [(min_lat, min_lon, max_lat, 180.0),
+                     (min_lat, -180.0, max_lat, max_lon)]
+        else:
+            boxes = [(min_lat, min_lon, max_lat, max_lon)]
+
+        if precision is None:
+            precision = 1
+            for candidate in range(12, 0, -1):
+                total = 0
+                for bounds in boxes:
+                    (lat_axis, lon_axis) = self._cover_grid(bounds, candidate)
+                    total += lat_axis[1] * lon_axis[1]
+                if total <= max_cells:
+                    precision = candidate
+                    break
+
+        cells = set()
+        for bounds in boxes:
+            centers = []
+            for (first, count, size, axis_min) in self._cover_grid(bounds,
+                                                                   precision):
+                cell_range = numpy.arange(first, first + count)
+                centers.append(axis_min + (cell_range + 0.5) * size)
+
+            (grid_lats, grid_lons) = numpy.meshgrid(*centers)
+            cells.update([str(c) for c in
+                          self.gen_geohash_array(grid_lats.ravel(),
+                                                 grid_lons.ravel(),
+                                                 precision)])
+
+        # Merge complete sibling groups into their parent.
+        for _ in range(precision - 1):
+            parents = {}
+            for cell in cells:
+                parents.setdefault(cell[:-1], []).append(cell)
+
+            merged = set()
+            for parent, children in parents.iteritems():
+                if len(children) == len(BASE32) and len(parent):
+                    merged.add(parent)
+                else:
+                    merged.update(children)
+
+            if merged == cells:
+                break
+            cells = merged
+
+        cover = sorted(cells)
+        log.debug('Geohash cover of %d cells at precision %d: %s' %
+                  (len(cover), precision, cover))
+
+        return cover
+
+    @staticmethod
+    def bbox_contains(bbox, latitude, longitude):
+        """Check if the *latitude*/*longitude* point falls within
+        *bbox*.
+
+        **Args:**
+            *bbox*: ``(min_lat, min_lon, max_lat, max_lon)`` tuple.  A
+            *min_lon* greater than *max_lon* denotes a box that crosses
+            the antimeridian
+
+        **Returns:**
+            Boolean ``True`` if the point is within the box.  Boolean
+            ``False`` otherwise
+
+        """
+        (min_lat, min_lon, max_lat, max_lon) = bbox
+
+        status = min_lat <= latitude <= max_lat
+        if status and min_lon <= max_lon:
+            status = min_lon <= longitude <= max_lon
+        elif status:
+            status = longitude >= min_lon or longitude <= max_lon
+
+        return status
+
+    @staticmethod
+    def _cover_grid(bounds, precision):
+        (min_lat, min_lon, max_lat, max_lon) = bounds
+        lat_bits = 5 * precision // 2
+        lon_bits = (5 * precision + 1) // 2
+
+        return (Spatial._cover_axis(min_lat, max_lat, -90.0, 90.0, lat_bits),
+                Spatial._cover_axis(min_lon, max_lon, -180.0, 180.0, lon_bits))
+
+    @staticmethod
+    def _cover_axis(lower, upper, axis_min, axis_max, bits):
+        size = (axis_max - axis_min) / (1 << bits)
+        first = max(int((lower - axis_min) // size), 0)
+        last = min(int((upper - axis_min) // size), (1 << bits) - 1)
+
+        return (first, max(last - first + 1, 0), size, axis_min)
+
+    def parse_row_key(self, row):
+        """Split the spatial index *row* key into its components.
+
+        **Returns:**
+            dictionary of :attr:`order` component/value pairs.  For
+            example::
+
+                {'stripe': '0000',
+                 'geohash': 'tvu7whrjnc16',
+                 'reverse_time': '09222521218464775807'}
+
+        """
+        return dict(zip(self.order, row.split('_')))
+
+    def row_geohash(self, row):
+        """Extract the geohash component from spatial index *row* key.
+
+        **Returns:**
+            the geohash string or ``None`` if :attr:`order` does not
+            include a geohash component
+
+        """
+        return self.parse_row_key(row).get('geohash')
+
+    @staticmethod
+    def _quantise(values, lower, upper, bits):
+        cells = numpy.floor((values - lower) / (upper - lower) * (1 << bits))
+
+        return numpy.clip(cells, 0, (1 << bits) - 1).astype(numpy.uint64)
+
     def get_stripe_token(self, source):
         code = hashcode(source)
         stripe_token = ((code & 0x0ffffffff) % self.stripes)
@@ -75,3 +355,289 @@ class Spatial(object):
                   (source, stripe_token))
 
         return stripe_token
+
+    @staticmethod
+    def cell_degrees(precision):
+        """Latitude/longitude extent in degrees of a geohash cell at
+        *precision*.
+
+        **Returns:**
+            tuple of ``(latitude_degrees, longitude_degrees)``
+
+        """
+        lat_bits = 5 * precision // 2
+        lon_bits = (5 * precision + 1) // 2
+
+        return (180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits))
+
+    def cell_size(self, latitude, precision):
+        """Smallest dimension in meters of a geohash cell at
+        *precision* and *latitude*.
+
+        """
+        (lat_degrees, lon_degrees) = self.cell_degrees(precision)
+        meters_per_degree = numpy.radians(1.0) * EARTH_RADIUS
+        width = lon_degrees * meters_per_degree * \
+            max(numpy.cos(numpy.radians(latitude)), 1e-6)
+
+        return min(lat_degrees * meters_per_degree, width)
+
+    def radius_precision(self, latitude, meters):
+        """Highest geohash precision whose cells at *latitude* are no
+        smaller than *meters*.  A point's cell and its immediate
+        neighbours then cover a circle of radius *meters*.
+
+        """
+        precision = 1
+        for candidate in range(12, 0, -1):
+            if self.cell_size(latitude, candidate) >= meters:
+                precision = candidate
+                break
+
+        return precision
+
+    def gen_geohash_ring(self, latitude, longitude, precision, ring):
+        """Build the geohash cells that are *ring* cells away from the
+        cell of the *latitude*/*longitude* point.
+
+        Ring 0 is the point's cell, ring 1 its 8 neighbours and so on.
+        Cells wrap around the antimeridian and stop at the poles.
+
+        **Returns:**
+            sorted list of geohash strings
+
+        """
+        (lat_degrees, lon_degrees) = self.cell_degrees(precision)
+        lat_cells = int(round(180.0 / lat_degrees))
+        lon_cells = int(round(360.0 / lon_degrees))
+
+        lat_index = min(int((latitude + 90.0) // lat_degrees), lat_cells - 1)
+        lon_index = min(int((longitude + 180.0) // lon_degrees),
+                        lon_cells - 1)
+
+        offsets = numpy.arange(-ring, ring + 1)
+        (lat_offsets, lon_offsets) = numpy.meshgrid(offsets, offsets)
+        border = numpy.maximum(numpy.abs(lat_offsets),
+                               numpy.abs(lon_offsets)) == ring
+        lat_indexes = lat_index + lat_offsets[border]
+        lon_indexes = (lon_index + lon_offsets[border]) % lon_cells
+
+        valid = (lat_indexes >= 0) & (lat_indexes < lat_cells)
+        lats = -90.0 + (lat_indexes[valid] + 0.5) * lat_degrees
+        lons = -180.0 + (lon_indexes[valid] + 0.5) * lon_degrees
+
+        cells = set([str(c) for c in self.gen_geohash_array(lats,
+                                                           lons,
+                                                           precision)])
+
+        return sorted(cells)
+
+    def stripe_tokens(self):
+        """All stripe tokens that :meth:`get_stripe_token` can produce.
+
+        """
+        return [str(stripe).zfill(4) for stripe in range(self.stripes)]
+
+    def gen_row_ranges(self, geohash, start=None, end=None):
+        """Build the row key ranges that bound all spatial index rows
+        within the *geohash* grid and the *start*/*end* time window.
+
+        Row key components are bound in :attr:`order` until the first
+        component that cannot be bound exactly.  A partial geohash
+        (less than 12 characters) ends the range as a prefix.  The
+        reverse timestamp is bound by the time window.  Rows are
+        filtered against anything that could not be bound by
+        :meth:`match_row`.
+
+        For example, the default ``stripe_geohash_reverse_time`` order
+        produces one prefix range per stripe.  A
+        ``stripe_reverse_time_geohash`` order produces one time window
+        range per stripe.
+
+        **Args:**
+            *geohash*: the geohash grid to search
+
+        **Kwargs:**
+            *start*: earliest time of the window (in any format
+            supported by :func:`geosutils.utils.get_reverse_timestamp`)
+
+            *end*: latest time of the window
+
+        **Returns:**
+            sorted list of ``(start_row, end_row)`` tuples where
+            *end_row* is exclusive.  ``None`` denotes an unbounded
+            start or end of the table
+
+        """
+        (lower, upper) = self.reverse_time_window(start, end)
+
+        ranges = set()
+        for token in self.stripe_tokens():
+            leading = []
+            row_range = None
+            for component in self.order:
+                if component == 'stripe':
+                    leading.append(token)
+                elif component == 'geohash' and len(geohash) >= 12:
+                    leading.append(geohash)
+                elif component == 'geohash':
+                    row_range = prefix_range('_'.join(leading + [geohash]))
+                    break
+                elif component == 'reverse_time':
+                    row_range = time_range('_'.join(leading), lower, upper)
+                    break
+
+            if row_range is None:
+                row_range = prefix_range('_'.join(leading))
+
+            ranges.add(row_range)
+
+        log.debug('Geohash "%s" row ranges: %s' % (geohash, sorted(ranges)))
+
+        return sorted(ranges)
+
+    @staticmethod
+    def reverse_time_window(start=None, end=None):
+        """Convert a *start*/*end* time window into the inclusive
+        ``(lower, upper)`` reverse timestamp bounds.  The latest time
+        has the lowest reverse timestamp.  ``None`` denotes an open
+        ended bound.
+
+        """
+        lower = None
+        if end is not None:
+            lower = get_reverse_timestamp(end)
+
+        upper = None
+        if start is not None:
+            upper = get_reverse_timestamp(start)
+
+        return (lower, upper)
+
+    def match_row(self, row, geohashes, start=None, end=None):
+        """Check if the spatial index *row* key falls within any of the
+        *geohashes* grids and the *start*/*end* time window.
+
+        **Returns:**
+            Boolean ``True`` if *row* matches.  Boolean ``False``
+            otherwise
+
+        """
+        components = self.parse_row_key(row)
+
+        row_geohash = components.get('geohash')
+        status = (row_geohash is not None and
+                  row_geohash.startswith(tuple(geohashes)))
+
+        if status:
+            (lower, upper) = self.reverse_time_window(start, end)
+            timestamp = components.get('reverse_time')
+            if lower is not None and (timestamp is None or timestamp < lower):
+                status = False
+            elif (upper is not None and
+                  (timestamp is None or timestamp > upper)):
+                status = False
+
+        return status
+
+    def gen_row_key(self, source, geohash, timestamp, suffix=None):
+        """Build the spatial index row key from its components in the
+        order defined by :attr:`order`.
+
+        **Args:**
+            *source*: the source identifier used to generate the
+            stripe token
+
+            *geohash*: the point geohash
+
+            *timestamp*: the reverse timestamp
+
+        **Kwargs:**
+            *suffix*: optional value appended to the row key to make it
+            unique (for example, the GDELT GlobalEventID)
+
+        **Returns:**
+            the row key string.  For example::
+
+                0000_tvu7whrjnc16_09222521218464775807
+
+        """
+        components = {'stripe': self.get_stripe_token(source),
+                      'geohash': geohash,
+                      'reverse_time': timestamp}
+
+        tokens = []
+        for component in self.order:
+            if component in components:
+                tokens.append(str(components[component]))
+            else:
+                log.warn('Unsupported spatial order component "%s"' %
+                         component)
+
+        if suffix is not None:
+            tokens.append(str(suffix))
+
+        return '_'.join(tokens)
+
+
+def prefix_range(prefix):
+    """Row range ``(start_row, end_row)`` that covers all rows starting
+    with *prefix*.
+
+    The exclusive end row is *prefix* with its last character
+    incremented.  An empty *prefix* covers the whole table.
+
+    """
+    row_range = (None, None)
+    if prefix:
+        row_range = (prefix, '%s%s' % (prefix[:-1], chr(ord(prefix[-1]) + 1)))
+
+    return row_range
+
+
+def time_range(prefix, lower=None, upper=None):
+    """Row range ``(start_row, end_row)`` of the *prefix* rows whose
+    next component is a reverse timestamp between *lower* and *upper*
+    (inclusive).
+
+    """
+    if lower is None and upper is None:
+        return prefix_range(prefix)
+
+    if prefix:
+        prefix = '%s_' % prefix
+
+    start_row = None
+    if lower is not None:
+        start_row = '%s%s' % (prefix, lower)
+    elif prefix:
+        start_row = prefix
+
+    # Rows may carry a suffix after the timestamp so the exclusive end
+    # row is the next timestamp.
+    end_row = prefix_range(prefix)[1]
+    if upper is not None:
+        end_row = '%s%s' % (prefix, str(int(upper) + 1).zfill(len(upper)))
+
+    return (start_row, end_row)
+
+
+def haversine(latitude, longitude, latitudes, longitudes):
+    """Great circle distance in meters between the *latitude*/
+    *longitude* point and each of the *latitudes*/*longitudes* points.
+
+    **Returns:**
+        :mod:`numpy` ``float64`` array of distances
+
+    """
+    lat = numpy.radians(latitude)
+    lats = numpy.radians(numpy.asarray(latitudes, dtype=numpy.float64))
+    delta_lat = lats - lat
+    delta_lon = numpy.radians(numpy.asarray(longitudes,
+                                            dtype=numpy.float64) - longitude)
+
+    chord = (numpy.sin(delta_lat / 2.0) ** 2 +
+             numpy.cos(lat) * numpy.cos(lats) *
+             numpy.sin(delta_lon / 2.0) ** 2)
+
+    return 2.0 * EARTH_RADIUS * numpy.arcsin(numpy.sqrt(chord))
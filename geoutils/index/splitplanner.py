@@ -0,0 +1,154 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.index.SplitPlanner` calculates the Accumulo
+table split points that align with the row key layout of each table.
+
+"""
+__all__ = ['SplitPlanner']
+
+from geosutils.log import log
+
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+class SplitPlanner(object):
+    """Accumulo table pre-split planner.
+
+    .. attribute:: *stripes*
+        number of spatial index stripes (as per
+        :attr:`geoutils.index.Spatial.stripes`)
+
+    .. attribute:: *order*
+        spatial index row key component order (as per
+        :attr:`geoutils.index.Spatial.order`)
+
+    .. attribute:: *shards*
+        number of ``meta_search`` shards (as per
+        :attr:`geoutils.Standard.meta_shards`)
+
+    .. attribute:: *geohash_splits*
+        number of tablets to spread each spatial index stripe across
+        based on the leading geohash character (default 4)
+
+    """
+    _stripes = 1
+    _order = ['stripe', 'geohash', 'reverse_time']
+    _shards = 4
+    _geohash_splits = 4
+    _tables = {'meta_search': 'shard',
+               'image_spatial_index': 'spatial',
+               'gdelt_spatial_index': 'spatial'}
+
+    def __init__(self, stripes=None, order=None, shards=None):
+        if stripes is not None:
+            self.stripes = stripes
+        if order is not None:
+            self.order = order
+        if shards is not None:
+            self.shards = shards
+
+    @property
+    def stripes(self):
+        return self._stripes
+
+    @stripes.setter
+    def stripes(self, value):
+        self._stripes = value
+
+    @property
+    def order(self):
+        return self._order
+
+    @order.setter
+    def order(self, value):
+        self._order = value
+
+    @property
+    def shards(self):
+        return self._shards
+
+    @shards.setter
+    def shards(self, value):
+        self._shards = value
+
+    @property
+    def geohash_splits(self):
+        return self._geohash_splits
+
+    @geohash_splits.setter
+    def geohash_splits(self, value):
+        self._geohash_splits = value
+
+    def plan(self, table):
+        """Calculate the split points for *table*.
+
+        Tables without a known row key layout (for example,
+        ``meta_library`` which is keyed by the source file name) are
+        not split.
+
+        **Args:**
+            *table*: name of the table
+
+        **Returns:**
+            sorted list of split point strings
+
+        """
+        layout = self._tables.get(table)
+
+        splits = []
+        if layout == 'shard':
+            splits = self.shard_splits()
+        elif layout == 'spatial':
+            splits = self.spatial_splits()
+
+        log.debug('Table "%s" split plan: %s' % (table, splits))
+
+        return splits
+
+    def shard_splits(self):
+        """Split points that place each ``meta_search`` shard row
+        (``s00``, ``s01``, ...) in its own tablet.
+
+        """
+        return ['s%02d' % shard for shard in range(1, self.shards)]
+
+    def spatial_splits(self):
+        """Split points for a spatial index table.
+
+        If the row key leads with the stripe token, each stripe is
+        split further on the leading geohash character.  If the row key
+        leads with the geohash, the geohash alphabet is split across
+        all stripes.  Row keys that lead with the reverse timestamp are
+        not split as all recent writes share the same prefix.
+
+        """
+        leading = None
+        if self.order:
+            leading = self.order[0]
+
+        splits = []
+        if leading == 'stripe':
+            chars = self.geohash_chars(self.geohash_splits)
+            for stripe in range(self.stripes):
+                token = str(stripe).zfill(4)
+                if stripe:
+                    splits.append(token)
+                splits.extend(['%s_%s' % (token, c) for c in chars])
+        elif leading == 'geohash':
+            splits = self.geohash_chars(self.geohash_splits * self.stripes)
+        else:
+            log.warn('Spatial index leading component "%s": no splits' %
+                     leading)
+
+        return sorted(splits)
+
+    @staticmethod
+    def geohash_chars(partitions):
+        """Geohash alphabet characters that divide the alphabet into
+        *partitions* (at most 32) evenly sized ranges.
+
+        """
+        partitions = min(partitions, len(GEOHASH_ALPHABET))
+
+        return [GEOHASH_ALPHABET[i * len(GEOHASH_ALPHABET) // partitions]
+                for i in range(1, partitions)]
@@ -1 +1,2 @@
 from test_spatial import TestSpatial
+from test_splitplanner import TestSplitPlanner
@@ -98,6 +98,48 @@ class TestSpatial(unittest2.TestCase):
         msg = 'Base32 geohash string error: None latitude/longitude'
         self.assertIsNone(received, msg)
 
+    def test_gen_geohash_array(self):
+        """Generate an array of base32 geohash strings.
+        """
+        latitudes = [42.6, -9.46472, float('nan')]
+        longitudes = [-5.6, 147.193, 1.0]
+        received = self._spatial.gen_geohash_array(latitudes, longitudes)
+        expected = ['ezs42e44yx96',
+                    self._spatial.gen_geohash(-9.46472, 147.193),
+                    '']
+        msg = 'Base32 geohash array error'
+        self.assertListEqual(received.tolist(), expected, msg)
+
+    def test_gen_geohash_array_precision(self):
+        """Generate an array of base32 geohash strings: precision.
+        """
+        received = self._spatial.gen_geohash_array([42.6], [-5.6], 5)
+        expected = ['ezs42']
+        msg = 'Base32 geohash array error: precision 5'
+        self.assertListEqual(received.tolist(), expected, msg)
+
+    def test_gen_geohash_array_antimeridian(self):
+        """Generate an array of base32 geohash strings: longitude 180.
+        """
+        received = self._spatial.gen_geohash_array([0.0, 0.0],
+                                                   [180.0, -180.0])
+        expected = ['800000000000', '800000000000']
+        msg = 'Base32 geohash array error: longitude 180 should wrap'
+        self.assertListEqual(received.tolist(), expected, msg)
+
+        received = self._spatial.gen_geohash(0.0, 180.0)
+        expected = '800000000000'
+        msg = 'Base32 geohash array should match the scalar geohash'
+        self.assertEqual(received, expected, msg)
+
+    def test_gen_geohash_int_array(self):
+        """Generate an array of integer geohashes.
+        """
+        received = self._spatial.gen_geohash_int_array([42.6], [-5.6], 5)
+        expected = [14672002]
+        msg = 'Integer geohash array error'
+        self.assertListEqual(received.tolist(), expected, msg)
+
     def test_get_stripe_token(self):
         """Generate a stripe_token.
         """
@@ -132,6 +174,185 @@ class TestSpatial(unittest2.TestCase):
         msg = 'Generated stripe_token (%s) incorrect' % source
         self.assertEqual(expected, received, msg)
 
+    def test_gen_row_key(self):
+        """Generate a spatial index row key.
+        """
+        received = self._spatial.gen_row_key('i_3001a',
+                                             'tvu7whrjnc16',
+                                             '09222521218464775807')
+        expected = '0000_tvu7whrjnc16_09222521218464775807'
+        msg = 'Spatial index row key error'
+        self.assertEqual(received, expected, msg)
+
+    def test_gen_row_key_configured(self):
+        """Generate a spatial index row key: configured stripes/order.
+        """
+        spatial = geoutils.index.Spatial(stripes=100,
+                                         order=['geohash',
+                                                'reverse_time',
+                                                'stripe'])
+        received = spatial.gen_row_key('i_3001a',
+                                       'tvu7whrjnc16',
+                                       '09222521218464775807',
+                                       suffix='324845985')
+        expected = 'tvu7whrjnc16_09222521218464775807_0021_324845985'
+        msg = 'Spatial index row key error: configured stripes/order'
+        self.assertEqual(received, expected, msg)
+
+    def test_gen_row_ranges(self):
+        """Generate the spatial index row ranges of a geohash.
+        """
+        spatial = geoutils.index.Spatial(stripes=3)
+        received = spatial.gen_row_ranges('tvu7w')
+        expected = [('0000_tvu7w', '0000_tvu7x'),
+                    ('0001_tvu7w', '0001_tvu7x'),
+                    ('0002_tvu7w', '0002_tvu7x')]
+        msg = 'Spatial index row ranges error: stripe leading'
+        self.assertListEqual(received, expected, msg)
+
+        spatial.order = ['geohash', 'reverse_time', 'stripe']
+        received = spatial.gen_row_ranges('tvu7w')
+        expected = [('tvu7w', 'tvu7x')]
+        msg = 'Spatial index row ranges error: geohash leading'
+        self.assertListEqual(received, expected, msg)
+
+    def test_gen_row_ranges_time_window(self):
+        """Generate the spatial index row ranges of a time window.
+        """
+        start = '19961217000000'
+        end = '19961218000000'
+        (lower, upper) = self._spatial.reverse_time_window(start, end)
+        msg = 'Later time should have the lower reverse timestamp'
+        self.assertLess(lower, upper, msg)
+
+        # Full precision geohash: time bounded within the geohash.
+        received = self._spatial.gen_row_ranges('tvu7whrjnc16', start, end)
+        expected = [('0000_tvu7whrjnc16_%s' % lower,
+                     '0000_tvu7whrjnc16_%s' %
+                     str(int(upper) + 1).zfill(len(upper)))]
+        msg = 'Spatial index row ranges error: full geohash time window'
+        self.assertListEqual(received, expected, msg)
+
+        # Time before geohash: time bounded within the stripe.
+        spatial = geoutils.index.Spatial(order=['stripe',
+                                                'reverse_time',
+                                                'geohash'])
+        received = spatial.gen_row_ranges('tvu7w', start=start)
+        expected = [('0000_', '0000_%s' %
+                     str(int(upper) + 1).zfill(len(upper)))]
+        msg = 'Spatial index row ranges error: time leading geohash'
+        self.assertListEqual(received, expected, msg)
+
+    def test_match_row(self):
+        """Match a spatial index row key against geohash and time.
+        """
+        row = '0000_tvu7whrjnc16_09222521218464775807'
+
+        received = self._spatial.match_row(row, ['tvu7w', 'tvu7x'])
+        msg = 'Spatial index row should match geohash'
+        self.assertTrue(received, msg)
+
+        received = self._spatial.match_row(row, ['tvu7x'])
+        msg = 'Spatial index row should not match geohash'
+        self.assertFalse(received, msg)
+
+        received = self._spatial.match_row(row,
+                                           ['tvu7w'],
+                                           start='19961217000000',
+                                           end='19961218000000')
+        msg = 'Spatial index row should match time window'
+        self.assertTrue(received, msg)
+
+        received = self._spatial.match_row(row,
+                                           ['tvu7w'],
+                                           start='19961218000000')
+        msg = 'Spatial index row should not match time window'
+        self.assertFalse(received, msg)
+
+    def test_gen_geohash_cover(self):
+        """Generate the geohash cover of a bounding box.
+        """
+        received = self._spatial.gen_geohash_cover(32.0, 84.0, 34.0, 86.0)
+        expected = ['tve', 'tvg', 'tvs', 'tvt', 'tvu',
+                    'tvv', 'ty5', 'tyh', 'tyj']
+        msg = 'Geohash cover error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_gen_geohash_cover_merged(self):
+        """Generate the geohash cover of a bounding box: merged cells.
+        """
+        received = self._spatial.gen_geohash_cover(-90.0,
+                                                   -180.0,
+                                                   90.0,
+                                                   180.0,
+                                                   max_cells=1024)
+        expected = list('0123456789bcdefghjkmnpqrstuvwxyz')
+        msg = 'Geohash cover sibling cells should be merged'
+        self.assertListEqual(received, expected, msg)
+
+    def test_gen_geohash_cover_antimeridian(self):
+        """Generate the geohash cover of a bounding box: antimeridian.
+        """
+        received = self._spatial.gen_geohash_cover(-10.0,
+                                                   170.0,
+                                                   10.0,
+                                                   -170.0)
+        expected = ['2n', '2p', '80', '81', 'ry', 'rz', 'xb', 'xc']
+        msg = 'Geohash cover should span both sides of the antimeridian'
+        self.assertListEqual(received, expected, msg)
+
+    def test_gen_geohash_cover_inverted(self):
+        """Generate the geohash cover of a bounding box: inverted.
+        """
+        received = self._spatial.gen_geohash_cover(10.0, 84.0, -10.0, 86.0)
+        msg = 'Geohash cover of an inverted bounding box should be empty'
+        self.assertListEqual(received, [], msg)
+
+    def test_bbox_contains(self):
+        """Check if a point falls within a bounding box.
+        """
+        bbox = (-10.0, 170.0, 10.0, -170.0)
+        msg = 'Point should be within the antimeridian bounding box'
+        self.assertTrue(self._spatial.bbox_contains(bbox, 0.0, 179.0), msg)
+        self.assertTrue(self._spatial.bbox_contains(bbox, 0.0, -179.0), msg)
+        msg = 'Point should not be within the antimeridian bounding box'
+        self.assertFalse(self._spatial.bbox_contains(bbox, 0.0, 0.0), msg)
+
+        bbox = (32.0, 84.0, 34.0, 86.0)
+        msg = 'Point should be within the bounding box'
+        self.assertTrue(self._spatial.bbox_contains(bbox, 33.0, 85.0), msg)
+
+    def test_gen_geohash_ring(self):
+        """Generate the geohash neighbour rings of a point.
+        """
+        received = self._spatial.gen_geohash_ring(32.98, 85.0, 5, 0)
+        expected = ['tvu7w']
+        msg = 'Geohash ring 0 error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._spatial.gen_geohash_ring(32.98, 85.0, 5, 1)
+        expected = ['tvu7m', 'tvu7q', 'tvu7r', 'tvu7t',
+                    'tvu7v', 'tvu7x', 'tvu7y', 'tvu7z']
+        msg = 'Geohash ring 1 error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_radius_precision(self):
+        """Geohash precision of a search radius.
+        """
+        received = self._spatial.radius_precision(32.98, 1000)
+        expected = 5
+        msg = 'Geohash radius precision error'
+        self.assertEqual(received, expected, msg)
+
+    def test_row_geohash(self):
+        """Extract the geohash from a spatial index row key.
+        """
+        received = self._spatial.row_geohash(
+            '0000_tvu7whrjnc16_09222521218464775807')
+        expected = 'tvu7whrjnc16'
+        msg = 'Spatial index row key geohash error'
+        self.assertEqual(received, expected, msg)
+
     @classmethod
     def tearDownClass(cls):
         """Shutdown the Accumulo mock proxy server (if enabled)
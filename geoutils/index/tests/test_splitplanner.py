@@ -0,0 +1,76 @@
+# pylint: disable=R0904,C0103
+""":class:`geoutils.index.SplitPlanner` tests.
+
+"""
+import unittest2
+
+import geoutils.index
+
+
+class TestSplitPlanner(unittest2.TestCase):
+    """:class:`geoutils.index.SplitPlanner` test cases.
+    """
+    def setUp(self):
+        self._planner = geoutils.index.SplitPlanner()
+
+    def test_init(self):
+        """Initialise a :class:`geoutils.index.SplitPlanner` object.
+        """
+        msg = 'Object is not a geoutils.index.SplitPlanner'
+        self.assertIsInstance(self._planner,
+                              geoutils.index.SplitPlanner,
+                              msg)
+
+    def test_plan_meta_search(self):
+        """Split plan: meta_search shards.
+        """
+        received = self._planner.plan('meta_search')
+        expected = ['s01', 's02', 's03']
+        msg = 'meta_search split plan error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_plan_unsplit_table(self):
+        """Split plan: table without a known row key layout.
+        """
+        received = self._planner.plan('meta_library')
+        msg = 'meta_library split plan should be empty'
+        self.assertListEqual(received, [], msg)
+
+    def test_plan_spatial_stripe_leading(self):
+        """Split plan: spatial index with leading stripe token.
+        """
+        self._planner.stripes = 2
+        self._planner.geohash_splits = 2
+        received = self._planner.plan('gdelt_spatial_index')
+        expected = ['0000_h', '0001', '0001_h']
+        msg = 'Stripe leading spatial split plan error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_plan_spatial_geohash_leading(self):
+        """Split plan: spatial index with leading geohash.
+        """
+        self._planner.order = ['geohash', 'reverse_time', 'stripe']
+        received = self._planner.plan('image_spatial_index')
+        expected = ['8', 'h', 's']
+        msg = 'Geohash leading spatial split plan error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_plan_spatial_time_leading(self):
+        """Split plan: spatial index with leading reverse time.
+        """
+        self._planner.order = ['reverse_time', 'geohash', 'stripe']
+        received = self._planner.plan('image_spatial_index')
+        msg = 'Reverse time leading spatial split plan should be empty'
+        self.assertListEqual(received, [], msg)
+
+    def test_geohash_chars_capped(self):
+        """Split geohash alphabet beyond its length.
+        """
+        received = len(self._planner.geohash_chars(64))
+        expected = 31
+        msg = 'Geohash split characters should be capped'
+        self.assertEqual(received, expected, msg)
+
+    def tearDown(self):
+        self._planner = None
+        del self._planner
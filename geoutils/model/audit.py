@@ -24,7 +24,7 @@ class Audit(geoutils.ModelBase):
         """
         super(Audit, self).__init__(connection, name)
 
-    def query_recent_audit(self, key=None, depth=1):
+    def query_recent_audit(self, key=None, depth=1, resume=None):
         """Query the auditer component from the datastore.
 
         **Kwargs:**
@@ -33,6 +33,8 @@ class Audit(geoutils.ModelBase):
 
             *depth*: limits the number of recent records returns
 
+            *resume*: only return records after the *resume* row_id
+
         **Returns:**
             the most recent audit row_id's as a Python dictionary
             structure
@@ -48,26 +50,52 @@ class Audit(geoutils.ModelBase):
             msg = '%s against key "%s"' % (msg, key)
         log.info('%s ...' % msg)
 
-        audits = {'audits': []}
+        audits = {'audits': list(self.iter_audits(key, resume, depth))}
 
-        if key is not None:
-            results = self.regex_query(self.name, regexs=key)
-        else:
-            results = self.query(self.name)
+        log.info('Query key "%s" complete' % key)
 
-        for result in results:
-            if result.row not in audits['audits']:
-                audits['audits'].append(result.row)
+        return audits
 
-            if len(audits['audits']) >= depth:
-                log.debug('Audit search depth of %d reached' % depth)
-                break
+    def page_audits(self, key=None, resume=None, page_size=100):
+        """Query a page of the audit row_id's, most recent first.
 
-        log.info('Query key "%s" complete' % key)
+        **Kwargs:**
+            *key*: regular expression filter against the record row
 
-        return audits
+            *resume*: resume token of the previous page
+
+            *page_size*: maximum number of row_id's in the page
+
+        **Returns:**
+            Python dictionary structure of the page's row_id's and the
+            resume token of the next page (``None`` on the last page)::
+
+                {'audits': ['09221956437718808093_ingest_daemon', ...],
+                 'resume': '09221956447616086912_ingest_daemon'}
+
+        """
+        (audits, resume) = self.page(self.iter_audits(key, resume),
+                                     page_size)
 
-    def query_audit(self, key=None):
+        return {'audits': audits, 'resume': resume}
+
+    def iter_audits(self, key=None, resume=None, limit=None):
+        """Generator of the audit row_id's, most recent first.
+
+        **Kwargs:**
+            *key*: regular expression filter against the record row
+
+            *resume*: only return records after the *resume* row_id
+
+            *limit*: stop after *limit* row_id's
+
+        """
+        return self.scan_rows(self.name,
+                              row_regex=key,
+                              resume=resume,
+                              limit=limit)
+
+    def query_audit(self, key=None, cols=None):
         """Query the audit component from the datastore.
 
         **Kwargs:**
@@ -75,6 +103,11 @@ class Audit(geoutils.ModelBase):
 
                 09221956447764569211_ingest_daemon
 
+            *cols*: limit the query to the given list of column family
+            identifiers.  For example::
+
+                ['ingest_daemon|start']
+
         **Returns:**
             the audit information of *key* as a Python dictionary
             structure.  Structure is similar to the following"::
@@ -90,14 +123,12 @@ class Audit(geoutils.ModelBase):
             msg = '%s against key "%s"' % (msg, key)
         log.info('%s ...' % msg)
 
-        audits = {}
-        results = self.query(self.name, key)
-
-        for cell in results:
-            if audits.get(cell.row) is None:
-                audits[cell.row] = {}
+        if cols is not None:
+            cols = [[col] for col in cols]
 
-            audits[cell.row][cell.cf] = cell.cq
+        audits = {}
+        for (row, cells) in self.query_rows(self.name, key, cols=cols):
+            audits[row] = dict([(f, q) for (f, q, _) in cells])
 
         log.info('Query key "%s" complete' % key)
 
@@ -5,10 +5,13 @@ table schema.
 """
 __all__ = ["Gdelt"]
 
+import math
 import geohash
-import shapely
+import numpy
 
 import geoutils
+import geoutils.index
+from geoutils.index.spatial import haversine
 from geosutils.log import log
 
 
@@ -17,6 +20,8 @@ class Gdelt(geoutils.ModelBase):
 
     """
     _name = 'gdelt_spatial_index'
+    _spatial = geoutils.index.Spatial()
+    _point_cols = [['Actor1Geo_Lat'], ['Actor1Geo_Long']]
 
     def __init__(self, connection, name=None):
         """:class:`geoutils.model.Gdelt` initialisation.
@@ -27,13 +32,26 @@ class Gdelt(geoutils.ModelBase):
         """
         super(Gdelt, self).__init__(connection, name)
 
-    def query_gdelt(self, key=None):
+    @property
+    def spatial(self):
+        return self._spatial
+
+    @spatial.setter
+    def spatial(self, value):
+        self._spatial = value
+
+    def query_gdelt(self, key=None, cols=None):
         """Query the GDELT component from the datastore.
 
         **Kwargs:**
             *key*: at this time, *key* relates to the GDELT
             Accumulo table row_id.
 
+            *cols*: limit the query to the given list of column family
+            identifiers.  For example::
+
+                ['GlobalEventID']
+
         **Returns:**
             the GDELT component of *key* as a Python dictionary
             structure to the following::
@@ -49,20 +67,23 @@ class Gdelt(geoutils.ModelBase):
             msg = '%s against key "%s"' % (msg, key)
         log.info('%s ...' % msg)
 
-        gdelt = {}
+        if cols is not None:
+            cols = [[col] for col in cols]
 
-        results = self.query(self.name, key)
-        for cell in results:
-            if gdelt.get(cell.row) is None:
-                gdelt[cell.row] = {}
-
-            gdelt[cell.row][cell.cf] = cell.cq
+        gdelt = {}
+        for (row, cells) in self.query_rows(self.name, key, cols=cols):
+            gdelt[row] = dict([(f, q) for (f, q, _) in cells])
 
         log.info('Query key "%s" complete' % key)
 
         return gdelt
 
-    def query_points(self, points, precision=5):
+    def query_points(self,
+                     points,
+                     precision=5,
+                     start=None,
+                     end=None,
+                     limit=None):
         """Scan the GDELT spatial index table that match a given list
         of *points* represented as a latitude/longitude tuple.
 
@@ -76,6 +97,15 @@ class Gdelt(geoutils.ModelBase):
             Accumulo spatial index is 12 (less than 1 meter grid)
             so the value needs to be 12 or less.  Defaults to 5
 
+        **Kwargs:**
+            *start*: only match events added on or after *start* (in
+            any format supported by
+            :func:`geosutils.utils.get_reverse_timestamp`)
+
+            *end*: only match events added on or before *end*
+
+            *limit*: return at most *limit* matching points
+
         **Returns:**
             Dictionary structure representing all matching points
             contained with the search grid.  For of dictionary
@@ -84,21 +114,193 @@ class Gdelt(geoutils.ModelBase):
                 {'center_point_match': ['i_3001a', ...]}
 
         """
-        gdelts = {'center_point_match': []}
+        rows = sorted(self.iter_points(points, precision, start, end, limit))
+
+        return {'center_point_match': rows}
 
+    def iter_points(self,
+                    points,
+                    precision=5,
+                    start=None,
+                    end=None,
+                    limit=None):
+        """Generator variant of :meth:`query_points` that yields each
+        matching GDELT spatial index row ID as it is scanned.
+
+        The geohash of every point and the *start*/*end* time window
+        are converted into row key ranges over each :attr:`spatial`
+        stripe and all ranges are sent in a single batch scan.  As a
+        result, the cost of the query is driven by the number of
+        matches rather than the number of *points*.  Each row ID is
+        only yielded once.
+
+        **Args:**
+            *points*: list iterable objects (list or tuple) representing
+            the latitude and longitude of the point of interest
+
+            *precision*: geohash grid size.  Defaults to 5
+
+        **Kwargs:**
+            *start*: earliest event added time
+
+            *end*: latest event added time
+
+            *limit*: stop after *limit* row IDs
+
+        """
         # Generate the geohashes.
-        hashcodes = []
+        hashcodes = set()
         for point in points:
             (latitude, longitude) = point
 
             hashcode = geohash.encode(latitude, longitude, precision)
             log.debug('Point "%s" geohash is: "%s"' % (point, hashcode))
-            hashcodes.append(hashcode)
+            hashcodes.add(hashcode)
 
-        results = self.regex_row_scan(self.name, hashcodes)
+        results = self.spatial_query(self.name,
+                                     self.spatial,
+                                     sorted(hashcodes),
+                                     start=start,
+                                     end=end)
+
+        return self.iter_rows(results, limit)
+
+    def query_radius(self,
+                     latitude,
+                     longitude,
+                     meters,
+                     limit=None,
+                     start=None,
+                     end=None):
+        """Scan the GDELT spatial index table for events within
+        *meters* of the *latitude*/*longitude* point.
+
+        The geohash precision is chosen so that the point's cell and
+        its neighbour ring cover the search radius.  Candidates are
+        ranked by their haversine distance.
+
+        **Args:**
+            *latitude*: point latitude
+
+            *longitude*: point longitude
+
+            *meters*: search radius
+
+        **Kwargs:**
+            *limit*: return at most *limit* of the nearest events
+
+            *start*: only match events added on or after *start*
+
+            *end*: only match events added on or before *end*
+
+        **Returns:**
+            Dictionary structure of the matching row IDs and distances
+            in meters, nearest first::
+
+                {'center_point_match': [
+                    ('0000_rq2djmn8j2rf_09221955249654775807_324845987',
+                     1234.5), ...]}
+
+        """
+        precision = self.spatial.radius_precision(latitude, meters)
+        cell_size = self.spatial.cell_size(latitude, precision)
+        max_rings = int(math.ceil(meters / cell_size))
+
+        candidates = {}
+        for ring in range(max_rings + 1):
+            cells = self.spatial.gen_geohash_ring(latitude,
+                                                  longitude,
+                                                  precision,
+                                                  ring)
+            self._scan_candidates(cells, candidates, start, end)
+
+        matches = self._rank(latitude, longitude, candidates)
+        matches = [m for m in matches if m[1] <= meters][:limit]
+
+        return {'center_point_match': matches}
+
+    def query_nearest(self,
+                      latitude,
+                      longitude,
+                      count,
+                      precision=5,
+                      max_rings=8,
+                      start=None,
+                      end=None):
+        """Scan the GDELT spatial index table for the *count* events
+        nearest to the *latitude*/*longitude* point.
+
+        Geohash neighbour rings around the point's cell are scanned
+        until the *count* nearest candidates are closer than any cell
+        that is yet to be scanned, or *max_rings* is reached.
+
+        **Args:**
+            *latitude*: point latitude
+
+            *longitude*: point longitude
+
+            *count*: number of nearest events to return
+
+        **Kwargs:**
+            *precision*: geohash grid size of the rings.  Defaults to 5
+
+            *max_rings*: upper bound on the number of neighbour rings
+            to scan.  Defaults to 8
+
+            *start*: only match events added on or after *start*
+
+            *end*: only match events added on or before *end*
+
+        **Returns:**
+            Dictionary structure of the matching row IDs and distances
+            in meters, nearest first (as per :meth:`query_radius`)
+
+        """
+        cell_size = self.spatial.cell_size(latitude, precision)
+
+        candidates = {}
+        matches = []
+        for ring in range(max_rings + 1):
+            cells = self.spatial.gen_geohash_ring(latitude,
+                                                  longitude,
+                                                  precision,
+                                                  ring)
+            self._scan_candidates(cells, candidates, start, end)
+            matches = self._rank(latitude, longitude, candidates)
+
+            # Any cell beyond this ring is at least ring * cell_size away.
+            if len(matches) >= count and matches[count - 1][1] <= \
+               ring * cell_size:
+                break
+
+        return {'center_point_match': matches[:count]}
+
+    def _scan_candidates(self, cells, candidates, start=None, end=None):
+        results = self.spatial_query(self.name,
+                                     self.spatial,
+                                     cells,
+                                     start=start,
+                                     end=end,
+                                     cols=self._point_cols)
 
         for cell in results:
-            if cell.row not in gdelts['center_point_match']:
-                gdelts['center_point_match'].append(cell.row)
+            point = candidates.setdefault(cell.row, [None, None])
+            try:
+                if cell.cf == 'Actor1Geo_Lat':
+                    point[0] = float(cell.cq)
+                elif cell.cf == 'Actor1Geo_Long':
+                    point[1] = float(cell.cq)
+            except ValueError as err:
+                log.warn('GDELT row "%s" point error: %s' % (cell.row, err))
+
+    @staticmethod
+    def _rank(latitude, longitude, candidates):
+        rows = [r for r, p in candidates.iteritems() if None not in p]
+        if not rows:
+            return []
+
+        points = numpy.array([candidates[r] for r in rows])
+        distances = haversine(latitude, longitude, points[:, 0], points[:, 1])
+        order = numpy.argsort(distances, kind='mergesort')
 
-        return gdelts
+        return [(rows[i], float(distances[i])) for i in order]
@@ -6,21 +6,36 @@ table schema.
 __all__ = ["Metadata"]
 
 import json
-import re
+import time
+import threading
 import geohash
-import shapely
 
 import geoutils
+import geoutils.index
+from geoutils.timestampfilter import TimestampFilter
 from geosutils.log import log
 
 
 class Metadata(geoutils.ModelBase):
     """Metadata Accumulo datastore model.
 
+    .. attribute:: *bbox_cache_ttl*
+        number of seconds that a :attr:`bbox_cache` refresh remains
+        current (default 60).  Cached queries within the TTL are
+        answered without a datastore scan.  Writes through a
+        :class:`geoutils.Datastore` in the same process invalidate the
+        cache straight away.  Writes from other processes (for example,
+        the ingest daemons) are only seen once the TTL expires.
+        ``None`` never expires
+
     """
     _name = 'meta_library'
     _spatial_index_name = 'image_spatial_index'
     _coord_cols = [['coord=0'], ['coord=1'], ['coord=2'], ['coord=3']]
+    _spatial = geoutils.index.Spatial()
+    _bbox_caches = {}
+    _bbox_cache_lock = threading.RLock()
+    _bbox_cache_ttl = 60
 
     def __init__(self, connection, name=None):
         """Metadata model initialisation.
@@ -41,6 +56,43 @@ class Metadata(geoutils.ModelBase):
         self._coord_cols = []
         self._coord_cols = value
 
+    @property
+    def spatial(self):
+        return self._spatial
+
+    @spatial.setter
+    def spatial(self, value):
+        self._spatial = value
+
+    @property
+    def bbox_cache(self):
+        """In-process :class:`geoutils.BBoxCache` of the metadata table.
+        The cache is shared by all :class:`geoutils.model.Metadata`
+        objects against the same table.
+
+        """
+        with self._bbox_cache_lock:
+            return self._bbox_caches.setdefault(self.name,
+                                                geoutils.BBoxCache())
+
+    @property
+    def bbox_cache_ttl(self):
+        return self._bbox_cache_ttl
+
+    @bbox_cache_ttl.setter
+    def bbox_cache_ttl(self, value):
+        self._bbox_cache_ttl = value
+
+    def invalidate_bbox_cache(self):
+        """Force a refresh of the :attr:`bbox_cache` on the next cached
+        query.
+
+        """
+        with self._bbox_cache_lock:
+            cache = self._bbox_caches.get(self.name)
+            if cache is not None:
+                cache.invalidate()
+
     @property
     def spatial_index_name(self):
         return self._spatial_index_name
@@ -49,7 +101,7 @@ class Metadata(geoutils.ModelBase):
     def spatial_index_name(self, value):
         self._spatial_index_name = value
 
-    def query_metadata(self, key=None, jsonify=False):
+    def query_metadata(self, key=None, jsonify=False, cols=None):
         """Query the metadata component from the datastore.
 
         **Kwargs:**
@@ -59,6 +111,11 @@ class Metadata(geoutils.ModelBase):
 
             *jsonify*: return as a JSON string
 
+            *cols*: limit the query to the given list of column family
+            identifiers.  For example::
+
+                ['center', 'metadata=NITF_IDATIM']
+
         **Returns:**
             the metadata component of *key* as a Python dictionary
             structure or as a JSON string if *jsonify* argument is set.
@@ -80,21 +137,20 @@ class Metadata(geoutils.ModelBase):
             msg = '%s against key "%s"' % (msg, key)
         log.info('%s ...' % msg)
 
-        metas = {}
-        results = self.query(self.name, key)
+        if cols is not None:
+            cols = [[col] for col in cols]
 
-        pattern = re.compile('metadata=')
-        for cell in results:
-            if metas.get(cell.row) is None:
-                metas[cell.row] = {'metadata': {}}
-
-            # Strip off the leading 'metadata=' token.
-            family = cell.cf
-            (family, subs) = pattern.subn('', family, count=1)
-            if subs == 1:
-                metas[cell.row]['metadata'][family] = cell.cq
-            else:
-                metas[cell.row][family] = cell.cq
+        metas = {}
+        token = 'metadata='
+        for (row, cells) in self.query_rows(self.name, key, cols=cols):
+            meta = {'metadata': {}}
+            for (family, qualifier, _) in cells:
+                # Strip off the leading 'metadata=' token.
+                if family.startswith(token):
+                    meta['metadata'][family[len(token):]] = qualifier
+                else:
+                    meta[family] = qualifier
+            metas[row] = meta
 
         log.info('Query key "%s" complete' % key)
 
@@ -103,7 +159,7 @@ class Metadata(geoutils.ModelBase):
 
         return metas
 
-    def query_coords(self, jsonify=False):
+    def query_coords(self, jsonify=False, cached=False):
         """Scan the metadata table for all family columns
         that match :attr:`geoutils.Datastore.coord_cols`.  Typically
         the family columns are of the form ``coord=?``.
@@ -111,6 +167,9 @@ class Metadata(geoutils.ModelBase):
         **Kwargs:**
             *jsonify*: return as a JSON string
 
+            *cached*: answer from the :attr:`bbox_cache` (refreshed
+            only once expired) rather than a full table scan
+
         **Returns:**
             a list of 4 sets of (lists) of float lat/long values that
             represent the boundary coordinates of the image.  List
@@ -128,17 +187,21 @@ class Metadata(geoutils.ModelBase):
         """
         log.debug('Scanning for image boundary coordinates ...')
 
-        results = self.query(table=self.name,
-                             cols=self.coord_cols)
-
-        coords = {}
-        for cell in results:
-            (lat, lng) = cell.cq.split(',')
-            if coords.get(cell.row) is not None:
-                coords[cell.row].append([float(lat), float(lng)])
-            else:
-                coords[cell.row] = []
-                coords[cell.row].append([float(lat), float(lng)])
+        if cached:
+            with self._bbox_cache_lock:
+                coords = self._current_bbox_cache().coords()
+        else:
+            results = self.query(table=self.name,
+                                 cols=self.coord_cols)
+
+            coords = {}
+            for cell in results:
+                (lat, lng) = cell.cq.split(',')
+                if coords.get(cell.row) is not None:
+                    coords[cell.row].append([float(lat), float(lng)])
+                else:
+                    coords[cell.row] = []
+                    coords[cell.row].append([float(lat), float(lng)])
 
         if jsonify:
             coords = json.dumps(coords)
@@ -147,12 +210,129 @@ class Metadata(geoutils.ModelBase):
 
         return coords
 
-    def query_points(self, point, precision=5):
+    def refresh_bbox_cache(self, full=False):
+        """Load the image boundary coordinates written since the
+        :attr:`bbox_cache` watermark into the cache.
+
+        Only the :attr:`coord_cols` columns of cells with a timestamp
+        at or after the watermark are scanned.
+
+        .. note::
+
+            Images deleted from the metadata table remain in the cache
+            until a *full* refresh
+
+        **Kwargs:**
+            *full*: empty the cache and reload all images
+
+        **Returns:**
+            number of images in the cache
+
+        """
+        with self._bbox_cache_lock:
+            cache = self.bbox_cache
+            if full:
+                cache.reset()
+
+            iterators = []
+            if cache.watermark is not None:
+                iterators.append(TimestampFilter(start=cache.watermark))
+
+            refreshed = time.time()
+            results = self.connection.scan(table=self.name,
+                                           cols=self.coord_cols,
+                                           iterators=iterators)
+            cache.update(self._coord_corners(results))
+            cache.refreshed = refreshed
+
+            log.info('Image boundary coordinates cache holds %d images' %
+                     len(cache))
+
+            return len(cache)
+
+    def _current_bbox_cache(self):
+        """Return the :attr:`bbox_cache`, refreshing it first only if
+        it has expired (see :attr:`bbox_cache_ttl`) or was invalidated.
+        The caller must hold the cache lock.
+
+        """
+        cache = self.bbox_cache
+        if cache.expired(self.bbox_cache_ttl):
+            self.refresh_bbox_cache()
+
+        return cache
+
+    @staticmethod
+    def _coord_corners(cells):
+        for cell in cells:
+            try:
+                corner = int(cell.cf.split('=')[-1])
+                (lat, lng) = cell.cq.split(',')
+                if 0 <= corner < 4:
+                    yield (cell.row, corner, float(lat), float(lng), cell.ts)
+            except ValueError as err:
+                log.warn('Image "%s" coordinate "%s" error: %s' %
+                         (cell.row, cell.cf, err))
+
+    def query_coords_point(self, point):
+        """Images whose boundary coordinates contain *point*.
+
+        Answered from the :attr:`bbox_cache`.  The datastore is only
+        scanned (incrementally) once the cache has expired.
+
+        **Args:**
+            *point*: iterable object (list or tuple) representing
+            the latitude and longitude of the point of interest
+
+        **Returns:**
+            Dictionary structure of the matching images::
+
+                {'images': ['i_3001a', ...]}
+
+        """
+        (latitude, longitude) = point
+
+        with self._bbox_cache_lock:
+            cache = self._current_bbox_cache()
+            images = cache.contains_point(latitude, longitude)
+
+        return {'images': images}
+
+    def query_coords_bbox(self, bbox):
+        """Images whose boundary coordinates intersect *bbox*.
+
+        Answered from the :attr:`bbox_cache`.  The datastore is only
+        scanned (incrementally) once the cache has expired.
+
+        **Args:**
+            *bbox*: iterable object (list or tuple) representing
+            the bottom (latitude), left (longitude), top (latitude)
+            and right (longitude) of the bounding box (as per
+            :meth:`query_bbox_points`)
+
+        **Returns:**
+            Dictionary structure of the matching images::
+
+                {'images': ['i_3001a', ...]}
+
+        """
+        with self._bbox_cache_lock:
+            cache = self._current_bbox_cache()
+            images = cache.intersects(*bbox)
+
+        return {'images': images}
+
+    def query_points(self, point, precision=5, start=None, end=None):
         """Scan the metadata spatial index table that match a given
         *point*.
 
         A precision of 5 equates to a geohash grid size of around 10KM.
 
+        The search is a batch of row key range scans (one for each
+        :attr:`spatial` stripe) so latency is proportional to the
+        number of matches rather than the size of the spatial index
+        (see :meth:`geoutils.ModelBase.spatial_query`).
+
         **Args:**
             *point*: iterable object (list or tuple) representing
             the latitude and longitude of the point of interest
@@ -161,6 +341,13 @@ class Metadata(geoutils.ModelBase):
             Accumulo spatial index is 12 (less than 1 meter grid)
             so the value needs to be 12 or less.  Defaults to 5
 
+        **Kwargs:**
+            *start*: only match images dated on or after *start* (in
+            any format supported by
+            :func:`geosutils.utils.get_reverse_timestamp`)
+
+            *end*: only match images dated on or before *end*
+
         **Returns:**
             Dictionary structure representing all matching points
             contained with the search grid.  For of dictionary
@@ -175,8 +362,11 @@ class Metadata(geoutils.ModelBase):
         hashcode = geohash.encode(latitude, longitude, precision)
         log.debug('Point "%s" geohash is: "%s"' % (point, hashcode))
 
-        results = self.regex_query(self.spatial_index_name,
-                                   '.*_%s.*' % hashcode)
+        results = self.spatial_query(self.spatial_index_name,
+                                     self.spatial,
+                                     [hashcode],
+                                     start=start,
+                                     end=end)
 
         files = {'center_point_match': []}
         for cell in results:
@@ -184,46 +374,98 @@ class Metadata(geoutils.ModelBase):
 
         return files
 
-    def query_bbox_points(self, bbox, precision=4):
+    def query_bbox_points(self,
+                          bbox,
+                          precision=None,
+                          max_cells=32,
+                          start=None,
+                          end=None):
         """Scan the metadata spatial index table that match a given
         *bbox* boundary box range.
 
-        A precision of 4 equates to a geohash grid size of around 500KM.
+        The boundary box is covered by the smallest set of geohash
+        cells (see :meth:`geoutils.index.Spatial.gen_geohash_cover`)
+        which are scanned in a single batch of row key prefix ranges.
+        Each match is then filtered against the boundary box using the
+        image center geohash stored in the spatial index row key.
 
         **Args:**
             *bbox*: iterable object (list or tuple) representing
-            the left (longitude), bottom (latitude), right (longitude)
-            and top (latitude) of the bounding box.
+            the bottom (latitude), left (longitude), top (latitude)
+            and right (longitude) of the bounding box.  A left greater
+            than the right crosses the antimeridian.  An inverted
+            (bottom greater than top) box matches nothing
 
-            *precision*: geohash grid size.  The precision in the
-            Accumulo spatial index is 12 (less than 1 meter grid)
-            so the value needs to be 12 or less.  Defaults to 5
+        **Kwargs:**
+            *precision*: override the adaptive geohash cover precision.
+            The precision in the Accumulo spatial index is 12 (less
+            than 1 meter grid) so the value needs to be 12 or less
+
+            *max_cells*: upper bound on the number of geohash cells
+            used to cover the boundary box.  Defaults to 32
+
+            *start*: only match images dated on or after *start*
+
+            *end*: only match images dated on or before *end*
 
         **Returns:**
             Dictionary structure representing all matching points
-            contained with the search grid.  For of dictionary
+            contained with the boundary box.  For of dictionary
             structure is::
 
                 {'center_point_match': ['i_3001a', ...]}
 
         """
-        box = shapely.geometry.box(*bbox)
-        centroid_point = (box.centroid.x, box.centroid.y)
-        log.info('BBox centroid point (X, Y): %s' % str(centroid_point))
+        bbox = tuple([float(x) for x in bbox])
 
-        return self.query_points(centroid_point, precision)
+        cover = self.spatial.gen_geohash_cover(*bbox,
+                                               max_cells=max_cells,
+                                               precision=precision)
+
+        files = {'center_point_match': []}
+        if not cover:
+            log.warn('BBox %s has no geohash cover: scan skipped' %
+                     str(bbox))
+            return files
+
+        results = self.spatial_query(self.spatial_index_name,
+                                     self.spatial,
+                                     cover,
+                                     start=start,
+                                     end=end)
+
+        for cell in results:
+            hashcode = self.spatial.row_geohash(cell.row)
+            if not hashcode:
+                continue
+
+            (latitude, longitude) = geohash.decode(hashcode)
+            if self.spatial.bbox_contains(bbox, latitude, longitude):
+                files['center_point_match'].append(cell.cq)
+
+        log.info('BBox %s matched %d points' %
+                 (str(bbox), len(files['center_point_match'])))
+
+        return files
 
     def scan_metadata(self, search_terms):
         """Scan components of the metadata from the datastore.
 
         Here, we a simulating a multi-value search scenario typical
-        of a web form query submission.
+        of a web form query submission.  The fields are scanned
+        concurrently where possible (see
+        :meth:`geoutils.ModelBase.batch_regex_scan`).
 
         **Kwargs:**
-            *search_terms*: dictionary structure of key value pairs
-            that represent the family/qualifier identifiers as
-            required by the :meth:`geoutils.ModelBase.regex_scan`
-            parameter list
+            *search_terms*: dictionary structure of family/search term
+            list pairs.  Search terms can be typed predicates from
+            :mod:`geoutils.predicate`.  For example::
+
+                {'metadata=NITF_IREP': [Equals('MONO')],
+                 'x_coord_size': [NumericRange(1000, 1100)],
+                 'metadata=NITF_IDATIM': [DateRange('1996', '1997')]}
+
+            Plain strings are matched as substring regular expressions
 
         **Returns:**
             list of metadata row_id's that match the scans terms.  The
@@ -5,18 +5,73 @@ table schema.
 """
 __all__ = ["Metasearch"]
 
-import json
-import re
+import collections
+import math
+import threading
+import time
+import uuid
+import pyaccumulo
 
 import geoutils
+from geoutils.writerpool import WRITER_ERRORS
 from geosutils.log import log
 
 
 class Metasearch(geoutils.ModelBase):
     """Metasearch Accumulo datastore model.
 
+    Posting lists are held in a least recently used cache (shared by
+    all instances) keyed by the table name and the normalised term set.
+    Each entry is tagged with the table's write generation, which
+    :class:`geoutils.Datastore` bumps whenever it writes to the table
+    (see :meth:`bump_generation`).  Entries from an older generation
+    are discarded on lookup.
+
+    The write generation combines an in-process counter with a token
+    held in the table itself (the :attr:`generation_row` row, which
+    sorts outside the shard rows).  :class:`geoutils.Datastore` writes
+    a new token on each flush of the table (see
+    :meth:`generation_mutation`) and the token is re-read at most every
+    :attr:`generation_interval` seconds, so writes made in another
+    process (for example, a separate ingest daemon) also invalidate
+    the cache.  Writes that bypass :class:`geoutils.Datastore` are
+    not tracked and are only seen once the cached entry is older than
+    :attr:`cache_ttl`.
+
+    .. attribute:: *tokenizer*
+        :class:`geoutils.Tokenizer` object that splits query strings
+        into terms.  Should be the tokenizer used to build the
+        ``meta_search`` document terms at ingest (see
+        :meth:`geoutils.Datastore.configure`)
+
+    .. attribute:: *cache_size*
+        maximum number of term sets held in the posting cache (default
+        256).  ``0`` disables the cache
+
+    .. attribute:: *cache_ttl*
+        maximum age in seconds of a posting cache entry (default 300).
+        ``None`` holds entries until the write generation changes
+
+    .. attribute:: *generation_row*
+        row that holds the shared write generation token
+
+    .. attribute:: *generation_interval*
+        minimum number of seconds between reads of the shared write
+        generation token (default 30).  Between reads, only writes in
+        this process invalidate the cache.  ``0`` reads the token on
+        every query
+
     """
     _name = 'meta_search'
+    _tokenizer = geoutils.Tokenizer()
+    _cache_size = 256
+    _cache_ttl = 300
+    _generation_row = '~generation'
+    _generation_interval = 30
+    _posting_cache = collections.OrderedDict()
+    _generations = {}
+    _shared_tokens = {}
+    _cache_lock = threading.Lock()
 
     def __init__(self, connection, name=None):
         """Metasearch model initialisation.
@@ -27,12 +82,171 @@ class Metasearch(geoutils.ModelBase):
         """
         super(Metasearch, self).__init__(connection, name)
 
-    def query_metadata(self, search_terms):
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, value):
+        self._tokenizer = value
+
+    @property
+    def cache_size(self):
+        return self._cache_size
+
+    @cache_size.setter
+    def cache_size(self, value):
+        self._cache_size = value
+
+    @property
+    def cache_ttl(self):
+        return self._cache_ttl
+
+    @cache_ttl.setter
+    def cache_ttl(self, value):
+        self._cache_ttl = value
+
+    @property
+    def generation_row(self):
+        return self._generation_row
+
+    @property
+    def generation_interval(self):
+        return self._generation_interval
+
+    @generation_interval.setter
+    def generation_interval(self, value):
+        self._generation_interval = value
+
+    @property
+    def generation(self):
+        return (self._generations.get(self.name, 0),
+                self.shared_generation())
+
+    def shared_generation(self):
+        """Read the write generation token from the
+        :attr:`generation_row` of the table.  The token is scanned at
+        most once every :attr:`generation_interval` seconds.
+        Otherwise, the token from the previous scan is returned.
+
+        **Returns:**
+            the token or ``None`` if the table is not connected, has
+            no token or could not be scanned
+
+        """
+        token = None
+
+        if self.connection is not None:
+            now = time.time()
+            with self._cache_lock:
+                shared = self._shared_tokens.get(self.name)
+            if (shared is not None and
+                    now - shared[1] < self.generation_interval):
+                return shared[0]
+
+            scan_range = pyaccumulo.Range(srow=self.generation_row,
+                                          erow=self.generation_row)
+            try:
+                for cell in self.connection.scan(table=self.name,
+                                                 scanrange=scan_range,
+                                                 cols=[['generation']]):
+                    token = cell.val
+            except WRITER_ERRORS as err:
+                log.warn('Table "%s" write generation scan error: %s' %
+                         (self.name, err))
+
+            with self._cache_lock:
+                self._shared_tokens[self.name] = (token, now)
+
+        return token
+
+    def bump_generation(self):
+        """Advance the in-process write generation of the table so
+        that all cached posting lists are invalidated.
+
+        **Returns:**
+            the new write generation counter
+
+        """
+        with self._cache_lock:
+            counter = self._generations.get(self.name, 0) + 1
+            self._generations[self.name] = counter
+
+        log.debug('Table "%s" write generation: %d' % (self.name, counter))
+
+        return counter
+
+    def generation_mutation(self):
+        """Build the mutation that writes a new shared write generation
+        token to the :attr:`generation_row`.  Other processes see the
+        token within :attr:`generation_interval` seconds.
+
+        **Returns:**
+            a :class:`pyaccumulo.Mutation` object
+
+        """
+        mutation = pyaccumulo.Mutation(self.generation_row)
+        mutation.put(cf='generation', val=uuid.uuid4().hex)
+
+        return mutation
+
+    def cache_get(self, key, generation=None):
+        """Return the cached value of *key* for the current write
+        generation, or ``None`` on a cache miss.  Entries older than
+        :attr:`cache_ttl` are also treated as a miss.
+
+        **Kwargs:**
+            *generation*: write generation already read by the caller
+            (saves a scan of the :attr:`generation_row`)
+
+        """
+        cache_key = (self.name, key)
+        if generation is None:
+            generation = self.generation
+        with self._cache_lock:
+            entry = self._posting_cache.pop(cache_key, None)
+            if entry is not None and entry[0] == generation:
+                age = time.time() - entry[1]
+                if self.cache_ttl is not None and age > self.cache_ttl:
+                    entry = None
+                else:
+                    # Re-insert as the most recently used entry.
+                    self._posting_cache[cache_key] = entry
+            else:
+                entry = None
+
+        return entry and entry[2]
+
+    def cache_put(self, key, value, generation):
+        """Cache *value* against *key*.
+
+        *generation* should be read before the scan that produced
+        *value* so that a write during the scan invalidates the entry.
+
+        """
+        if self.cache_size <= 0:
+            return
+
+        with self._cache_lock:
+            self._posting_cache[(self.name, key)] = (generation,
+                                                     time.time(),
+                                                     value)
+            while len(self._posting_cache) > self.cache_size:
+                self._posting_cache.popitem(last=False)
+
+    def query_metadata(self, search_terms, limit=None):
         """Query the metadata component from the datastore.
 
+        *search_terms* are split into terms by :attr:`tokenizer`.
+        Repeated queries for the same term set are served from the
+        posting cache until the table is next written to (or the entry
+        is older than :attr:`cache_ttl`).
+
         **Kwargs:**
             *search_terms*:
 
+            *limit*: return at most *limit* matches
+
         **Returns:**
             the metadata component of *key* as a Python dictionary
             structure
@@ -44,8 +258,169 @@ class Metasearch(geoutils.ModelBase):
                 }
 
         """
-        terms = [term.lower() for term in search_terms if len(term) > 3]
-        results = self.doc_query(self.name, terms)
-        metas = {'metas': list(results)}
+        terms = set()
+        for search_term in search_terms:
+            terms.update(self.tokenizer.tokens(search_term))
+
+        metas = {'metas': self.intersect(terms, limit=limit)}
 
         return metas
+
+    def intersect(self, terms, limit=None):
+        """Fetch the documents that contain all of *terms*.  The
+        posting lists are intersected by the tablet servers (as per
+        :meth:`geoutils.ModelBase.doc_query`) so only the matching
+        documents are returned through the proxy.  Results are served
+        from the posting cache where possible.
+
+        **Kwargs:**
+            *limit*: return at most *limit* matches
+
+        **Returns:**
+            list of the matching document row_id's
+
+        """
+        terms = sorted(terms)
+        key = ('docs', tuple(terms))
+
+        generation = self.generation
+        docs = self.cache_get(key, generation)
+        if docs is None:
+            docs = list(self.doc_query(self.name, terms, limit=limit))
+
+            # A truncated result cannot answer a later, larger limit.
+            if limit is None or len(docs) < limit:
+                self.cache_put(key, docs, generation)
+        else:
+            log.debug('Posting cache hit: %s' % terms)
+
+        return docs[:limit]
+
+    def search(self, query, limit=None):
+        """Boolean, ranked search of the metadata.
+
+        Each *query* term is one of:
+
+        * ``+term``: the document must contain *term*
+        * ``-term``: the document must not contain *term*
+        * ``term``: the document should contain *term*.  If the query
+          has no ``+term`` terms, the document must contain at least
+          one of these terms
+
+        The ``+term`` terms are intersected by the tablet servers (see
+        :meth:`intersect`).  Only the posting lists of the ``term`` and
+        ``-term`` terms are fetched to the client, in a single batch
+        scan over the range of all shard rows.  Each matching document
+        is scored by the sum of the inverse document frequency of the
+        ``term`` terms that it contains, so documents that match more
+        (and rarer) optional terms rank higher.  Every match contains
+        all of the ``+term`` terms, so they do not change the ranking
+        and are not scored.
+
+        **Args:**
+            *query*: query string or list of query terms.  For example::
+
+                '+airfield checks runway -banana'
+
+        **Kwargs:**
+            *limit*: return only the top *limit* documents
+
+        **Returns:**
+            the matching documents and their scores, highest score
+            first::
+
+                {'metas': [('i_3001a', 1.0986), ...]}
+
+        """
+        (must, should, must_not) = self.parse_query(query)
+
+        postings = self.postings(should | must_not)
+
+        if must:
+            docs = set(self.intersect(must))
+        else:
+            docs = set().union(*[postings[t] for t in should])
+        for term in must_not:
+            docs -= postings[term]
+
+        total = len(docs.union(*postings.values()))
+        scores = dict.fromkeys(docs, 0.0)
+        for term in should:
+            if not postings[term]:
+                continue
+            idf = math.log(1.0 + float(total) / len(postings[term]))
+            for doc in postings[term] & docs:
+                scores[doc] = scores.get(doc, 0.0) + idf
+
+        ranked = sorted(scores.iteritems(), key=lambda x: (-x[1], x[0]))
+
+        log.info('Metasearch "%s" matched %d documents' %
+                 (query, len(ranked)))
+
+        return {'metas': ranked[:limit]}
+
+    def postings(self, terms):
+        """Fetch the posting list (documents that contain the term)
+        of each of *terms* across all shards in a single batch scan.
+        Results are served from the posting cache where possible.
+
+        **Returns:**
+            dictionary of term/set of document row_id pairs
+
+        """
+        key = ('postings', tuple(sorted(terms)))
+        generation = self.generation
+        cached = self.cache_get(key, generation)
+        if cached is not None:
+            log.debug('Posting cache hit: %s' % list(key[1]))
+            return dict((t, set(docs)) for t, docs in cached.iteritems())
+
+        postings = dict((term, set()) for term in terms)
+        if not terms:
+            return postings
+
+        # This range aligns with the shard code (as per doc_query) so
+        # every shard is scanned whatever the configured shard count.
+        scan_ranges = [pyaccumulo.Range(srow='s', erow='t')]
+        results = self.connection.batch_scan(table=self.name,
+                                             scanranges=scan_ranges,
+                                             cols=[[t] for t in terms])
+        for cell in results:
+            if cell.cf in postings:
+                postings[cell.cf].add(cell.cq)
+
+        frozen = dict((t, frozenset(d)) for t, d in postings.iteritems())
+        self.cache_put(key, frozen, generation)
+
+        return postings
+
+    def parse_query(self, query):
+        """Split *query* into its required, optional and excluded
+        terms.
+
+        Each query token is split into terms by :attr:`tokenizer` so
+        that the terms match those built at ingest (as per
+        :meth:`geoutils.Schema.build_document_map`).
+
+        **Returns:**
+            tuple of the ``(must, should, must_not)`` term sets
+
+        """
+        if isinstance(query, basestring):
+            query = query.split()
+
+        must = set()
+        should = set()
+        must_not = set()
+        for token in query:
+            terms = should
+            if token[:1] == '+':
+                terms = must
+                token = token[1:]
+            elif token[:1] == '-':
+                terms = must_not
+                token = token[1:]
+
+            terms.update(self.tokenizer.tokens(token))
+
+        return (must, should - must - must_not, must_not)
@@ -121,6 +121,32 @@ class TestModelAudit(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._audit_table_name)
 
+    def test_page_audits(self):
+        """Query the auditer: paged.
+        """
+        self._ds.init_table(self._audit_table_name)
+
+        self._ds.ingest(AUDIT_01)
+        self._ds.ingest(AUDIT_02)
+        self._ds.ingest(AUDIT_03)
+        self._ds.ingest(AUDIT_04)
+
+        received = self._audit.page_audits(page_size=1)
+        expected = {'audits': ['09221956375225656441_dummy'],
+                    'resume': '09221956375225656441_dummy'}
+        msg = 'First audit page error'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._audit.page_audits(resume=received['resume'],
+                                           page_size=1)
+        expected = {'audits': ['09221956437718808093_ingest_daemon'],
+                    'resume': '09221956437718808093_ingest_daemon'}
+        msg = 'Resumed audit page error'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._audit_table_name)
+
     def test_query_audit_no_data(self):
         """Query the audit component from an empty datastore.
         """
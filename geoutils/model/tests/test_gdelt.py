@@ -139,6 +139,49 @@ class TestModelGdelt(unittest2.TestCase):
         self._gdeltd.exit_event.clear()
         self._ds.delete_table(self._gdelt_table_name)
 
+    def test_query_radius(self):
+        """Radius search of the GDELT spatial index table.
+        """
+        self._ds.init_table(self._gdelt_table_name)
+
+        # Load the sample GDELT data.
+        target_file = os.path.join(self._conf.inbound_dir,
+                                   self._gdelt_file)
+        copy_file(os.path.join(self._gdelt_dir, self._gdelt_file),
+                  target_file)
+        self._gdeltd.filename = target_file
+        self._gdeltd.delete = True
+        self._gdeltd._start(self._gdeltd.exit_event)
+
+        received = self._gdelt.query_radius(-9.46, 147.19, 10000)
+        received_rows = [r for r, _ in received['center_point_match']]
+        msg = 'GDELT radius search should match the nearby event'
+        self.assertIn('0000_rq2djmn8j2rf_09221955249654775807_324845987',
+                      received_rows,
+                      msg)
+
+        distances = [d for _, d in received['center_point_match']]
+        msg = 'GDELT radius search results should be ranked by distance'
+        self.assertListEqual(distances, sorted(distances), msg)
+        msg = 'GDELT radius search results should be within the radius'
+        self.assertTrue(all(d <= 10000 for d in distances), msg)
+
+        received = self._gdelt.query_nearest(-9.46, 147.19, 1)
+        expected = '0000_rq2djmn8j2rf_09221955249654775807_324845987'
+        msg = 'GDELT nearest search error'
+        self.assertEqual(received['center_point_match'][0][0], expected, msg)
+
+        # Clean up.
+        self._gdeltd.exit_event.clear()
+        self._ds.delete_table(self._gdelt_table_name)
+
+    def test_iter_points_no_points(self):
+        """Stream the GDELT spatial index table: no points.
+        """
+        received = list(self._gdelt.iter_points([]))
+        msg = 'GDELT iter points (no points) should be empty'
+        self.assertListEqual(received, [], msg)
+
     def tearDown(self):
         del self._gdelt
         del self._ds
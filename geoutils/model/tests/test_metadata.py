@@ -6,7 +6,11 @@ import unittest2
 import os
 
 import geoutils
+import geoutils.index
 import geolib_mock
+from geoutils.predicate import (Equals,
+                                NumericRange,
+                                DateRange)
 from geoutils.tests.files.ingest_data_01 import DATA as DATA_01
 from geoutils.tests.files.ingest_data_02 import DATA as DATA_02
 
@@ -80,6 +84,24 @@ class TestModelMetadata(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_query_metadata_pruned_columns(self):
+        """Query metadata from the datastore: pruned columns.
+        """
+        self._ds.init_table(self._meta_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        received = self._meta.query_metadata(key='i_3001a',
+                                             cols=['center',
+                                                   'metadata=NITF_IREP'])
+        expected = {'i_3001a': {'center': '32.9831944444,85.0001388889',
+                                'metadata': {'NITF_IREP': 'MONO'}}}
+        msg = 'Scan across table with pruned columns error'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_table_name)
+
     def test_query_metadata_with_data_missing_row_id(self):
         """Query metadata from the datastore: missing row_id.
         """
@@ -137,6 +159,67 @@ class TestModelMetadata(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_query_coords_cached(self):
+        """Query the image boundary coordinates cache.
+        """
+        self._ds.init_table(self._meta_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        self._meta.refresh_bbox_cache(full=True)
+        received = self._meta.query_coords(cached=True)
+        expected = self._meta.query_coords()
+        msg = 'Cached image coordinates should match the table scan'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._meta.query_coords_point((32.9831944444,
+                                                  85.0001388889))
+        expected = {'images': ['i_3001a']}
+        msg = 'Cached image point query error'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._meta.query_coords_bbox((12.0, 84.0, 14.0, 86.0))
+        expected = {'images': []}
+        msg = 'Cached image bbox query should return no results'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._meta.bbox_cache.reset()
+        self._ds.delete_table(self._meta_table_name)
+
+    def test_query_coords_cache_hit(self):
+        """Query the image boundary coordinates cache: no scan on a hit.
+        """
+        self._ds.init_table(self._meta_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        old_ttl = self._meta.bbox_cache_ttl
+        self._meta.bbox_cache_ttl = 3600
+        point = (32.9831944444, 85.0001388889)
+        received = self._meta.query_coords_point(point)
+        expected = {'images': ['i_3001a']}
+        msg = 'Cached image point query error'
+        self.assertDictEqual(received, expected, msg)
+
+        # A cache hit must not touch the datastore connection.
+        connection = self._meta.connection
+        self._meta.connection = None
+        received = self._meta.query_coords_point(point)
+        msg = 'Cached image point query (cache hit) error'
+        self.assertDictEqual(received, expected, msg)
+        self._meta.connection = connection
+
+        # In-process writes invalidate the cache.
+        self._ds.ingest(DATA_02)
+        msg = 'In-process ingest should invalidate the cache'
+        self.assertTrue(self._meta.bbox_cache.expired(3600), msg)
+
+        # Clean up.
+        self._meta.bbox_cache_ttl = old_ttl
+        self._meta.bbox_cache.reset()
+        self._ds.delete_table(self._meta_table_name)
+
     def test_query_coords_missing_geogcs(self):
         """Scan the metadata datastore table: missing GEOGCS.
         """
@@ -175,6 +258,76 @@ class TestModelMetadata(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_query_points_time_window(self):
+        """Scan the metadata spatial index table: time window.
+        """
+        self._ds.init_table(self._image_spatial_index_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        point = (32.9831944444, 85.0001388889)
+        received = self._meta.query_points(point,
+                                           start='19961217000000',
+                                           end='19961218000000')
+        expected = {'center_point_match': ['i_3001a']}
+        msg = 'Image points time window scan should return results'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._meta.query_points(point, start='19961218000000')
+        expected = {'center_point_match': []}
+        msg = 'Image points time window scan should not return results'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._image_spatial_index_table_name)
+
+    def test_query_points_regex_fallback(self):
+        """Scan the metadata spatial index table: no prefix ranges.
+        """
+        self._ds.init_table(self._image_spatial_index_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        old_spatial = self._meta.spatial
+        self._meta.spatial = geoutils.index.Spatial(order=['reverse_time',
+                                                           'geohash',
+                                                           'stripe'])
+        point = (32.9831944444, 85.0001388889)
+        received = self._meta.query_points(point)
+        expected = {'center_point_match': ['i_3001a']}
+        msg = 'Image points regex scan should return results'
+        self.assertDictEqual(received, expected, msg)
+        self._meta.spatial = old_spatial
+
+        # Clean up.
+        self._ds.delete_table(self._image_spatial_index_table_name)
+
+    def test_query_points_stripes(self):
+        """Scan the metadata spatial index table: multiple stripes.
+        """
+        self._ds.init_table(self._image_spatial_index_table_name)
+
+        spatial = geoutils.index.Spatial(stripes=4)
+        for source in ['i_3001a', 'i_6130e']:
+            schema = geoutils.Schema(source_id=source, spatial=spatial)
+            schema.build_spatial_index(self._image_spatial_index_table_name,
+                                       '32.9831944444,85.0001388889',
+                                       '19961217102630')
+            self._ds.ingest(schema())
+
+        old_spatial = self._ds.spatial
+        self._ds.spatial = spatial
+        point = (32.9831944444, 85.0001388889)
+        received = self._ds.meta.query_points(point)
+        received['center_point_match'].sort()
+        expected = {'center_point_match': ['i_3001a', 'i_6130e']}
+        msg = 'Image points scan should return results from all stripes'
+        self.assertDictEqual(received, expected, msg)
+        self._ds.spatial = old_spatial
+
+        # Clean up.
+        self._ds.delete_table(self._image_spatial_index_table_name)
+
     def test_query_bbox_points(self):
         """Scan the metadata spatial index table: bbox.
         """
@@ -198,6 +351,68 @@ class TestModelMetadata(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_query_bbox_points_antimeridian(self):
+        """Scan the metadata spatial index table: antimeridian bbox.
+        """
+        self._ds.init_table(self._image_spatial_index_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        point = (32.0, 84.0, 34.0, -170.0)
+        received = self._meta.query_bbox_points(point)
+        expected = {'center_point_match': ['i_3001a']}
+        msg = 'Antimeridian bbox points scan should return results'
+        self.assertDictEqual(received, expected, msg)
+
+        point = (32.0, 170.0, 34.0, 84.0)
+        received = self._meta.query_bbox_points(point)
+        expected = {'center_point_match': []}
+        msg = 'Antimeridian bbox points scan should not return results'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._image_spatial_index_table_name)
+
+    def test_query_bbox_points_inverted(self):
+        """Scan the metadata spatial index table: inverted bbox.
+        """
+        self._ds.init_table(self._image_spatial_index_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        point = (34.0, 84.0, 32.0, 86.0)
+        received = self._meta.query_bbox_points(point)
+        expected = {'center_point_match': []}
+        msg = 'Inverted bbox points scan should not return results'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._image_spatial_index_table_name)
+
+    def test_query_bbox_points_exact(self):
+        """Scan the metadata spatial index table: bbox edge matches.
+        """
+        self._ds.init_table(self._image_spatial_index_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        # Image center is close to the bottom left corner of the box.
+        bbox = (32.98, 85.0, 40.0, 100.0)
+        received = self._meta.query_bbox_points(bbox)
+        expected = {'center_point_match': ['i_3001a']}
+        msg = 'Image bbox corner scan should return results'
+        self.assertDictEqual(received, expected, msg)
+
+        # Image center is in a cover cell but just outside the box.
+        bbox = (32.9, 84.9, 32.98, 85.1)
+        received = self._meta.query_bbox_points(bbox)
+        expected = {'center_point_match': []}
+        msg = 'Image bbox scan should filter points outside the box'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._image_spatial_index_table_name)
+
     def test_scan_metadata_no_data(self):
         """Chained meta scans: no data.
         """
@@ -239,6 +454,44 @@ class TestModelMetadata(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_scan_metadata_typed_predicates(self):
+        """Chained meta scans: typed predicates.
+        """
+        self._ds.init_table(self._meta_table_name)
+
+        self._ds.ingest(DATA_01)
+        self._ds.ingest(DATA_02)
+
+        kwargs = {'metadata=NITF_IREP': [Equals('MONO')],
+                  'x_coord_size': [NumericRange(1000, 1100)]}
+        received = self._meta.scan_metadata(search_terms=kwargs)
+        expected = {'metas': ['i_3001a']}
+        msg = 'Typed meta scans should return single result'
+        self.assertDictEqual(received, expected, msg)
+
+        kwargs = {'metadata=NITF_IREP': [Equals('MON')]}
+        received = self._meta.scan_metadata(search_terms=kwargs)
+        expected = {'metas': []}
+        msg = 'Equality meta scan should not match a substring'
+        self.assertDictEqual(received, expected, msg)
+
+        # Concurrent scans over pooled connections.
+        self._meta.connection_pool = self._ds.connection_pool
+        kwargs = {'metadata=NITF_IREP': ['MONO'],
+                  'x_coord_size': [NumericRange(low=1000)],
+                  'metadata=NITF_IDATIM': [DateRange('1996', '1996')]}
+        received = self._meta.scan_metadata(search_terms=kwargs)
+        expected = {'metas': ['i_3001a']}
+        msg = 'Concurrent meta scans should return single result'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._ds.connection_pool.idle
+        msg = 'Concurrent scan connections should be returned to the pool'
+        self.assertTrue(0 < received <= 3, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_table_name)
+
     def tearDown(self):
         self._meta = None
         del self._meta
@@ -95,6 +95,207 @@ class TestModelMetasearch(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_search_name)
 
+    def test_query_metadata_cache_invalidation(self):
+        """Query the metadata: cached postings invalidated by ingest.
+        """
+        from geoutils.tests.files.ingest_data_03 import DATA
+
+        self._ds.init_table(self._meta_search_name)
+
+        search_terms = ['Airfield', 'checks']
+        received = self._search.query_metadata(search_terms)
+        expected = {'metas': []}
+        msg = 'Free text metadata should not return results'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._search.cache_get(('docs', ('airfield', 'checks')))
+        expected = []
+        msg = 'Posting cache should hold the normalised term set'
+        self.assertListEqual(received, expected, msg)
+
+        self._ds.ingest(DATA)
+        self._ds.flush()
+
+        received = self._search.query_metadata(search_terms)
+        expected = {'metas': ['i_3001a']}
+        msg = 'Ingest should invalidate the posting cache'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_search_name)
+
+    def test_cache_lru(self):
+        """Posting cache least recently used eviction.
+        """
+        search = geoutils.model.Metasearch(None, name='lru_search')
+        search.cache_size = 2
+        generation = search.generation
+
+        search.cache_put('a', ['doc_a'], generation)
+        search.cache_put('b', ['doc_b'], generation)
+        search.cache_get('a')
+        search.cache_put('c', ['doc_c'], generation)
+
+        received = [search.cache_get(k) for k in ('a', 'b', 'c')]
+        expected = [['doc_a'], None, ['doc_c']]
+        msg = 'Posting cache LRU eviction error'
+        self.assertListEqual(received, expected, msg)
+
+        search.bump_generation()
+        received = search.cache_get('a')
+        msg = 'Write generation should invalidate the posting cache'
+        self.assertIsNone(received, msg)
+
+    def test_cache_ttl(self):
+        """Posting cache entry expiry.
+        """
+        search = geoutils.model.Metasearch(None, name='ttl_search')
+        search.cache_put('a', ['doc_a'], search.generation)
+
+        received = search.cache_get('a')
+        expected = ['doc_a']
+        msg = 'Posting cache entry should be held within the TTL'
+        self.assertListEqual(received, expected, msg)
+
+        search.cache_ttl = -1
+        received = search.cache_get('a')
+        msg = 'Posting cache entry should expire after the TTL'
+        self.assertIsNone(received, msg)
+
+    def test_query_metadata_shared_generation(self):
+        """Query the metadata: cache invalidated by another process.
+        """
+        from geoutils.tests.files.ingest_data_03 import DATA
+
+        self._ds.init_table(self._meta_search_name)
+
+        # Simulate a query process that does not share the in-process
+        # write generation counter with the ingest datastore.
+        self._search._generations = {}
+        self._search.generation_interval = 0
+
+        search_terms = ['Airfield', 'checks']
+        received = self._search.query_metadata(search_terms)
+        expected = {'metas': []}
+        msg = 'Free text metadata should not return results'
+        self.assertDictEqual(received, expected, msg)
+
+        self._ds.ingest(DATA)
+        self._ds.flush()
+
+        received = self._search.query_metadata(search_terms)
+        expected = {'metas': ['i_3001a']}
+        msg = 'Shared write generation should invalidate the cache'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_search_name)
+
+    def test_shared_generation_interval(self):
+        """Shared write generation token reads are rate limited.
+        """
+        from geoutils.tests.files.ingest_data_03 import DATA
+
+        self._ds.init_table(self._meta_search_name)
+
+        self._search._shared_tokens = {}
+        token = self._search.shared_generation()
+
+        self._ds.ingest(DATA)
+        self._ds.flush()
+
+        received = self._search.shared_generation()
+        msg = 'Shared token should not be re-read within the interval'
+        self.assertEqual(received, token, msg)
+
+        self._search.generation_interval = 0
+        received = self._search.shared_generation()
+        msg = 'Shared token should be re-read after the interval'
+        self.assertNotEqual(received, token, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_search_name)
+
+    def test_parse_query(self):
+        """Parse a boolean metasearch query.
+        """
+        received = self._search.parse_query('+Airfield checks -banana fort')
+        expected = (set(['airfield']),
+                    set(['checks']),
+                    set(['banana']))
+        msg = 'Boolean metasearch query parse error'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_parse_query_tokenizer(self):
+        """Parse a boolean metasearch query: configured tokenizer.
+        """
+        search = geoutils.model.Metasearch(None)
+        search.tokenizer = geoutils.Tokenizer(length=4,
+                                              stop_words=['checks'],
+                                              filters=['numeric'])
+
+        received = search.parse_query('+Airfield checks -fort 19961217')
+        expected = (set(['airfield']), set(), set())
+        msg = 'Metasearch query should use the configured tokenizer'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_search(self):
+        """Boolean, ranked metasearch.
+        """
+        from geoutils.tests.files.ingest_data_03 import DATA
+
+        self._ds.init_table(self._meta_search_name)
+
+        self._ds.ingest(DATA)
+
+        received = self._search.search('banana airfield checks')
+        received_ids = [doc for doc, _ in received['metas']]
+        expected = ['i_3001a']
+        msg = 'OR metasearch should return results'
+        self.assertListEqual(received_ids, expected, msg)
+
+        received = self._search.search('+airfield -checks')
+        expected = {'metas': []}
+        msg = 'NOT metasearch should exclude results'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._search.search('+banana airfield')
+        expected = {'metas': []}
+        msg = 'AND metasearch (unmatched) should not return results'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._search.search('+airfield +checks')
+        expected = {'metas': [('i_3001a', 0.0)]}
+        msg = 'AND metasearch (server side intersection) error'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._search.search('airfield', limit=0)
+        expected = {'metas': []}
+        msg = 'Top-k metasearch limit error'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_search_name)
+
+    def test_search_all_shards(self):
+        """Boolean, ranked metasearch: shards beyond the default count.
+        """
+        self._ds.init_table(self._meta_search_name)
+
+        for (source_id, shard_id) in [('i_3001a', 's01'), ('i_6130e', 's09')]:
+            schema = geoutils.Schema(source_id=source_id, shard_id=shard_id)
+            schema.build_metasearch(set(['airfield']))
+            self._ds.ingest(schema())
+
+        received = self._search.search('airfield')
+        received_ids = sorted([doc for doc, _ in received['metas']])
+        expected = ['i_3001a', 'i_6130e']
+        msg = 'Metasearch should scan every meta_search shard'
+        self.assertListEqual(received_ids, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_search_name)
+
     @classmethod
     def tearDownClass(cls):
         """Shutdown the Accumulo mock proxy server (if enabled)
@@ -157,6 +157,46 @@ class TestModelThumb(unittest2.TestCase):
         thumb_fh.close()
         self._ds.delete_table(self._thumb_table_name)
 
+    def test_query_thumb_stored_format(self):
+        """Query a thumb that was encoded at ingest.
+        """
+        thumb_stream_file = os.path.join('geoutils',
+                                         'tests',
+                                         'files',
+                                         '300x300_stream.out')
+        thumb_fh = open(thumb_stream_file, 'rb')
+        encode = geoutils.GeoImage.encode_image(thumb_fh.read, (300, 300))
+        encoded = encode()
+
+        data = {'row_id': 'i_3001a'}
+        data['tables'] = {self._thumb_table_name: {
+                          'cf': {
+                              'cq': {
+                                  'x_coord_size': '300',
+                                  'y_coord_size': '300',
+                                  'format': 'JPEG'},
+                              'val': {
+                                  'thumb': encoded}}}}
+
+        self._ds.init_table(self._thumb_table_name)
+        self._ds.ingest(data)
+
+        image_stream = self._thumb.query_thumb(key='i_3001a')
+        received = image_stream.read()
+        msg = 'Stored JPEG thumb should be returned as is'
+        self.assertEqual(received, encoded, msg)
+
+        image_stream = self._thumb.query_thumb(key='i_3001a',
+                                               img_format='PNG')
+        received = image_stream.read(8)
+        expected = '\x89PNG\r\n\x1a\n'
+        msg = 'Stored JPEG thumb should be transcoded to PNG'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        thumb_fh.close()
+        self._ds.delete_table(self._thumb_table_name)
+
     @classmethod
     def tearDownClass(cls):
         """Shutdown the Accumulo mock proxy server (if enabled)
@@ -5,7 +5,7 @@ table schema.
 """
 __all__ = ["Thumb"]
 
-import tempfile
+import StringIO
 
 import geoutils
 from geosutils.log import log
@@ -36,17 +36,26 @@ class Thumb(geoutils.ModelBase):
             a variety of compression formats including ``JPEG`` (default)
             and ``PNG``
 
+        Thumbs that were encoded at ingest (see
+        :meth:`geoutils.Schema.build_image`) are returned as stored
+        when *img_format* matches the stored ``format``, without being
+        decoded.  Otherwise they are transcoded to *img_format*.
+
         **Returns:**
-            the thumb component of *key*
+            an in-memory file object (:class:`StringIO.StringIO`) of the
+            thumb component of *key*.  Unlike
+            :meth:`geoutils.model.Image.query_image`, there is no file
+            on disk, so the object has no ``name``
 
         """
         log.info('Retrieving thumb for row_id "%s" ...' % key)
 
         cells = self.query(self.name, key)
 
-        image_fh = tempfile.NamedTemporaryFile('w+b')
+        thumb = []
         x_coord = y_coord = None
         irep = 'MONO'
+        thumb_format = None
         for cell in cells:
             if cell.cf == 'x_coord_size':
                 x_coord = cell.cq
@@ -54,30 +63,42 @@ class Thumb(geoutils.ModelBase):
                 y_coord = cell.cq
             elif cell.cf == 'irep':
                 irep = cell.cq
+            elif cell.cf == 'format':
+                thumb_format = cell.cq
             elif cell.cf == 'thumb':
-                image_fh.write(cell.val)
+                thumb.append(cell.val)
 
         log.debug('X|Y: %s|%s' % (x_coord, y_coord))
         dimensions = (int(x_coord), int(y_coord))
 
-        suffix = 'jpg'
-        if img_format == 'PNG':
-            suffix = 'png'
-
-        temp_obj = tempfile.NamedTemporaryFile(mode='w+b',
-                                               suffix=suffix)
-        image_fh.seek(0)
-        log.debug('Reconstructing image to format "%s"' % img_format)
-        if irep == 'MONO':
+        # Hand the cell value straight to the reconstruction rather
+        # than spooling it through a temporary file.
+        image_stream = lambda: ''.join(thumb)
+
+        if thumb_format is not None and thumb_format == img_format:
+            log.debug('Streaming stored "%s" thumb' % thumb_format)
+            return StringIO.StringIO(image_stream())
+
+        # PIL 1.1.6 only falls back to writing a file object in memory
+        # when it has no fileno() method (unlike io.BytesIO).
+        image_obj = StringIO.StringIO()
+        if thumb_format is not None:
+            log.debug('Transcoding "%s" thumb to format "%s"' %
+                      (thumb_format, img_format))
+            image_method = geoutils.GeoImage.decode_image
+            image_method(image_stream).save(image_obj, img_format)
+        elif irep == 'MONO':
+            log.debug('Reconstructing image to format "%s"' % img_format)
             image_method = geoutils.GeoImage.reconstruct_image
-            image_method(image_fh.read, dimensions).save(temp_obj,
-                                                         img_format)
+            image_method(image_stream, dimensions).save(image_obj,
+                                                        img_format)
         else:
+            log.debug('Reconstructing image to format "%s"' % img_format)
             dimensions = (int(y_coord), int(x_coord), 3)
             image_method = geoutils.GeoImage.reconstruct_mb_image
-            image_method(image_fh.read, dimensions)().save(temp_obj,
-                                                            img_format)
+            image_method(image_stream, dimensions)().save(image_obj,
+                                                           img_format)
 
-        temp_obj.seek(0)
+        image_obj.seek(0)
 
-        return temp_obj
+        return image_obj
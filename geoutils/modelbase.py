@@ -6,9 +6,18 @@ Accumulo models.
 __all__ = ["ModelBase"]
 
 import collections
+import itertools
+import Queue
+import threading
 import pyaccumulo
 import pyaccumulo.iterators
+from pyaccumulo.proxy.ttypes import (ScanColumn,
+                                     ScanOptions)
 
+from geoutils.predicate import to_predicate
+from geoutils.writerpool import WRITER_ERRORS
+from geoutils.wholerow import (WholeRowIterator,
+                               decode_row)
 from geosutils.log import log
 
 
@@ -16,9 +25,21 @@ class ModelBase(object):
     """:class:`geoutils.ModelBase` is intended to be a generalisation
     of a Accumulo datastore table.
 
+    .. attribute:: *connection_pool*
+        :class:`geoutils.ConnectionPool` of independent Accumulo
+        connections (for example,
+        :attr:`geoutils.Datastore.connection_pool`).  Required for
+        concurrent scans as the Thrift client behind :attr:`connection`
+        is not thread safe
+
+    .. attribute:: *scan_workers*
+        maximum number of concurrent scans (default 4)
+
     """
     _name = str()
     _connection = None
+    _connection_pool = None
+    _scan_workers = 4
 
     def __init__(self, connection, name=None):
         self._connection = connection
@@ -33,6 +54,22 @@ class ModelBase(object):
     def connection(self, value):
         self._connection = value
 
+    @property
+    def connection_pool(self):
+        return self._connection_pool
+
+    @connection_pool.setter
+    def connection_pool(self, value):
+        self._connection_pool = value
+
+    @property
+    def scan_workers(self):
+        return self._scan_workers
+
+    @scan_workers.setter
+    def scan_workers(self, value):
+        self._scan_workers = value
+
     @property
     def name(self):
         return self._name
@@ -41,7 +78,7 @@ class ModelBase(object):
     def name(self, value):
         self._name = value
 
-    def query(self, table, key=None, cols=None):
+    def query(self, table, key=None, cols=None, resume=None):
         """Base method for a Accumulo table scan.
 
         **Args:**
@@ -67,6 +104,10 @@ class ModelBase(object):
                 Only the cell that matches the family/qualifier identifier
                 combination will be returned
 
+            *resume*: start the scan at the row after *resume* (as
+            per the resume token of :meth:`page`).  Ignored if *key* is
+            provided
+
         **Returns:**
             Generator object that can be iterated over to display
             the record's cell data
@@ -79,6 +120,10 @@ class ModelBase(object):
         if key is not None:
             log.info('Table "%s" scan ...' % table)
             scan_range = pyaccumulo.Range(srow=key, erow=key)
+        elif resume is not None:
+            log.info('Table "%s" scan resumed after row "%s" ...' %
+                     (table, resume))
+            scan_range = resume_range(resume)
         else:
             log.info('Querying table "%s" against key: "%s" ...' %
                      (table, key))
@@ -92,7 +137,119 @@ class ModelBase(object):
 
         return results
 
-    def doc_query(self, table, search_terms):
+    def query_rows(self, table, key=None, cols=None, resume=None):
+        """Row oriented version of :meth:`query`.
+
+        The cells of each row are grouped on the tablet server by the
+        :class:`geoutils.wholerow.WholeRowIterator` so each row crosses
+        the Thrift proxy as a single cell.  Only the *cols* columns are
+        fetched.
+
+        **Args:**
+            *table*: name of the table to scan
+
+        **Kwargs:**
+            *key*, *cols* and *resume* as per :meth:`query`
+
+        **Returns:**
+            Generator of ``(row_id, cells)`` tuples where *cells* is a
+            list of ``(family, qualifier, value)`` tuples
+
+        """
+        kwargs = {'table': table,
+                  'cols': cols or [],
+                  'iterators': [WholeRowIterator()]}
+        if key is not None:
+            kwargs['scanrange'] = pyaccumulo.Range(srow=key, erow=key)
+        elif resume is not None:
+            kwargs['scanrange'] = resume_range(resume)
+
+        log.info('Row scan of table "%s" (key: "%s", cols: %s) ...' %
+                 (table, key, cols))
+
+        for cell in self.connection.scan(**kwargs):
+            yield (cell.row, decode_row(cell.val))
+
+    def scan_rows(self, table, row_regex=None, resume=None, limit=None):
+        """Ordered scan of the distinct row IDs of *table*.
+
+        **Args:**
+            *table*: name of the table to scan
+
+        **Kwargs:**
+            *row_regex*: Java based regular expression that the whole
+            row ID must match
+
+            *resume*: start the scan at the row after *resume*
+
+            *limit*: stop after *limit* row IDs
+
+        **Returns:**
+            Generator of row IDs (as per :meth:`iter_rows`)
+
+        """
+        kwargs = {'table': table}
+        if resume is not None:
+            kwargs['scanrange'] = resume_range(resume)
+        if row_regex is not None:
+            regex = pyaccumulo.iterators.RegExFilter(row_regex=row_regex)
+            kwargs['iterators'] = [regex]
+
+        log.info('Scanning table "%s" rows: %s ...' % (table, kwargs))
+
+        return self.iter_rows(self.connection.scan(**kwargs), limit)
+
+    @staticmethod
+    def iter_rows(cells, limit=None):
+        """Generator of the distinct row IDs of *cells*.
+
+        Neither a batch scan nor a filtered scan returns all cells of a
+        row together, so every row ID yielded is held in a set to remove
+        duplicates.  The set holds at most *limit* row IDs.
+
+        **Args:**
+            *cells*: iterable of Accumulo cells
+
+        **Kwargs:**
+            *limit*: stop after *limit* row IDs
+
+        """
+        seen = set()
+        for cell in cells:
+            if limit is not None and len(seen) >= limit:
+                break
+
+            if cell.row not in seen:
+                seen.add(cell.row)
+                yield cell.row
+
+    @staticmethod
+    def page(items, page_size):
+        """Consume the next page of *items*.
+
+        **Args:**
+            *items*: iterable of row keys in scan order
+
+            *page_size*: maximum number of items in the page
+
+        **Returns:**
+            tuple of the page's list of items and the resume token.
+            The resume token is the last item of the page, or ``None``
+            if there are no further items
+
+        """
+        items = iter(items)
+        page_items = list(itertools.islice(items, page_size))
+
+        resume = None
+        if page_items:
+            for _ in items:
+                resume = page_items[-1]
+                break
+
+        return (page_items, resume)
+
+    def doc_query(self, table, search_terms, limit=None):
         """Base method for a Accumulo table document based batch scan.
 
         **Args:**
@@ -101,9 +258,10 @@ class ModelBase(object):
         **Kwargs:**
             *search_terms*: keys to use in the search
 
+            *limit*: stop after *limit* documents
+
         **Returns:**
-            Generator object that can be iterated over to display
-            the record's cell data
+            Generator object that yields the matching document IDs
 
         """
         # This range aligns with the shard code.
@@ -114,13 +272,102 @@ class ModelBase(object):
         log.info('Querying table "%s" against search terms: "%s" ...' %
                  (table, search_terms))
 
-        results = []
-        for record in self.connection.batch_scan(table=table,
-                                                 scanranges=scan_ranges,
-                                                 iterators=iterators):
-            results.append(record.cq)
+        results = self.connection.batch_scan(table=table,
+                                             scanranges=scan_ranges,
+                                             iterators=iterators)
 
-        return results
+        return (record.cq for record in itertools.islice(results, limit))
+
+    def range_query(self, table, row_ranges, cols=None):
+        """Batch scan *table* for all rows within any of the given
+        *row_ranges*.
+
+        Each row range is converted into a :class:`pyaccumulo.Range`
+        so the tablet servers only read the matching rows.  No
+        *row_ranges* returns no results without a scan.
+
+        **Args:**
+            *table*: the name of the table to search
+
+            *row_ranges*: list of ``(start_row, end_row)`` tuples where
+            *end_row* is exclusive.  For example::
+
+                [('0000_tvu7w', '0000_tvu7x'), ...]
+
+        **Kwargs:**
+            *cols*: limit the extract to the record's column family and
+            qualifier identifiers (as per :meth:`query`)
+
+        **Returns:**
+            Generator object that can be iterated over to display
+            the record's cell data
+
+        """
+        log.info('Querying table "%s" against row ranges: "%s" ...' %
+                 (table, row_ranges))
+
+        # A batch scan without ranges would read the whole table.
+        if not row_ranges:
+            return []
+
+        scan_ranges = [pyaccumulo.Range(srow=s, erow=e, einclude=False)
+                       for s, e in row_ranges]
+
+        return self.connection.batch_scan(table=table,
+                                          scanranges=scan_ranges,
+                                          cols=cols)
+
+    def spatial_query(self,
+                      table,
+                      spatial,
+                      geohashes,
+                      start=None,
+                      end=None,
+                      cols=None):
+        """Scan the spatial index *table* for rows within any of the
+        *geohashes* grids and the *start*/*end* time window.
+
+        All row ranges (see
+        :meth:`geoutils.index.Spatial.gen_row_ranges`) are sent as a
+        single batch scan.  A regular expression filter over the whole
+        table is only used if *spatial* cannot bound the rows at all.
+
+        **Args:**
+            *table*: the name of the spatial index table
+
+            *spatial*: the :class:`geoutils.index.Spatial` object that
+            defines the table's row key
+
+            *geohashes*: list of geohash grids to search
+
+        **Kwargs:**
+            *start*: earliest time of the window
+
+            *end*: latest time of the window
+
+            *cols*: limit the extract to the record's column family and
+            qualifier identifiers (as per :meth:`query`)
+
+        **Returns:**
+            Generator object of the matching cells
+
+        """
+        row_ranges = set()
+        for geohash in geohashes:
+            row_ranges.update(spatial.gen_row_ranges(geohash, start, end))
+
+        if not row_ranges:
+            results = []
+        elif (None, None) in row_ranges:
+            results = self.regex_query(table,
+                                       '.*_(%s).*' % '|'.join(geohashes),
+                                       cols=cols)
+        else:
+            results = self.range_query(table, sorted(row_ranges), cols=cols)
+
+        for cell in results:
+            if spatial.match_row(cell.row, geohashes, start, end):
+                yield cell
 
     def regex_query(self, table, regexs, cols=None):
         """A simple implementation of an Accumulo regular expression
@@ -196,10 +443,10 @@ class ModelBase(object):
             *qualifers*: list of row column qualifer identifiers to scan
 
         **Returns:**
-            lisf of Accumulo cells that match the search term criteria
+            Generator of Accumulo cells that match the search term
+            criteria
 
         """
-        results = []
         for qualifier in qualifiers:
             iterators = []
             kwargs = {'row_regex': '.*%s.*' % qualifier,
@@ -208,53 +455,263 @@ class ModelBase(object):
             iterators.append(pyaccumulo.iterators.RegExFilter(**kwargs))
             log.debug('RegExIterator kwargs: %s' % kwargs)
 
-            results.extend(self.connection.scan(table=table,
-                                                iterators=iterators))
+            for cell in self.connection.scan(table=table,
+                                             iterators=iterators):
+                yield cell
 
-        return results
+    def family_scan(self,
+                    table,
+                    family,
+                    predicates,
+                    connection=None,
+                    stop=None):
+        """Scan the *family* column of *table* for rows whose value
+        satisfies all of the *predicates*.
+
+        The :attr:`geoutils.predicate.Predicate.regex` of each
+        predicate is applied on the tablet servers and the exact typed
+        comparison is made on the client.
+
+        **Args:**
+            *table*: name of the table to scan
+
+            *family*: column family identifier to scan
+
+            *predicates*: list of :class:`geoutils.predicate.Predicate`
+            objects
+
+        **Kwargs:**
+            *connection*: Accumulo connection to scan with (defaults to
+            :attr:`connection`)
+
+            *stop*: :class:`threading.Event` that ends the scan early
+            when set
+
+        **Returns:**
+            set of matching row_id's
+
+        """
+        if connection is None:
+            connection = self.connection
+
+        iterators = []
+        for count, predicate in enumerate(predicates):
+            if predicate.regex is None:
+                continue
+            kwargs = {'priority': 21 + count,
+                      'cq_regex': predicate.regex,
+                      'match_substring': predicate.match_substring,
+                      'name': 'regex%d' % (count + 1)}
+            iterators.append(pyaccumulo.iterators.RegExFilter(**kwargs))
+            log.debug('RegExIterator kwargs: %s' % kwargs)
+
+        # pyaccumulo only closes the proxy scanner once the scan is
+        # exhausted, so the scanner is managed here to close it when
+        # the scan is stopped early.
+        scanner = open_scanner(connection,
+                               table,
+                               cols=[[family]],
+                               iterators=iterators)
+
+        rows = set()
+        exhausted = False
+        try:
+            for cell in connection.perform_scan(scanner, 10):
+                if stop is not None and stop.is_set():
+                    log.debug('Family "%s" scan stopped' % family)
+                    break
+
+                if all(predicate(cell.cq) for predicate in predicates):
+                    rows.add(cell.row)
+            else:
+                exhausted = True
+        finally:
+            if not exhausted:
+                close_scanner(connection, scanner)
+
+        return rows
 
     def batch_regex_scan(self, table, search_terms):
-        """Combine the results of multiple
-        :meth:`geoutils.ModelBase.regex_scan` calls into a single
-        list construct.
+        """Intersect the rows that match the search terms of each of
+        multiple column families.
 
-        .. note::
-            Given that potentially multiple scans are performed, ordering
-            cannot be guaranteed
+        Each family is scanned by :meth:`family_scan`.  If a
+        :attr:`connection_pool` is set, up to :attr:`scan_workers`
+        families are scanned concurrently (each over its own pooled
+        connection) so the search takes about as long as the slowest
+        scan.  Otherwise, the families are scanned in turn.  Either
+        way, the remaining scans are abandoned as soon as the running
+        intersection is empty.
 
         **Args:**
             *table*: the name of the table to search.
 
-            *search_terms*: dictionary structure of key value pairs
-            that represent the family/qualifier identifiers as
-            required by the :meth:`geoutils.ModelBase.regex_scan`
-            parameter list
+            *search_terms*: dictionary structure of family/search term
+            list pairs.  Search terms are
+            :class:`geoutils.predicate.Predicate` objects or plain
+            strings (as per :class:`geoutils.predicate.Contains`).  For
+            example::
+
+                {'metadata=NITF_IREP': ['MONO'],
+                 'metadata=NITF_IDATIM': [DateRange('1996', '1997')]}
 
         **Returns:**
-            list of unique
+            sorted list of the unique row_id's that match all families
 
         """
         log.info('Regex scanning table "%s" against search terms: "%s" ...' %
                  (table, search_terms))
 
-        batch_results = []
-        for family, qualifiers in search_terms.iteritems():
-            cells = collections.OrderedDict()
+        families = [(family, [to_predicate(t) for t in terms])
+                    for family, terms in search_terms.iteritems()]
 
-            results = self.regex_scan(table, family, qualifiers)
-            for result in results:
-                cells[result.row] = True
+        if (self.connection_pool is not None and
+                self.scan_workers > 1 and
+                len(families) > 1):
+            intersects = self._concurrent_family_scans(table, families)
+        else:
+            intersects = None
+            for family, predicates in families:
+                rows = self.family_scan(table, family, predicates)
+                if intersects is None:
+                    intersects = rows
+                else:
+                    intersects &= rows
+
+                # No need continuing scans if the intersection is empty.
+                if not intersects:
+                    log.debug('Sub-scan returned empty set: ending scans')
+                    break
+
+        log.debug('Regex scanning result count: %d' % len(intersects or []))
+
+        return sorted(intersects or [])
+
+    def _concurrent_family_scans(self, table, families):
+        tasks = Queue.Queue()
+        for family in families:
+            tasks.put(family)
+        results = Queue.Queue()
+        stop = threading.Event()
+
+        def worker():
+            connection = None
+            failed = False
+            try:
+                while not stop.is_set():
+                    try:
+                        (family, predicates) = tasks.get_nowait()
+                    except Queue.Empty:
+                        break
+                    if connection is None:
+                        connection = self.connection_pool.acquire()
+                    rows = self.family_scan(table,
+                                            family,
+                                            predicates,
+                                            connection=connection,
+                                            stop=stop)
+                    results.put((family, rows, None))
+            except Exception as err:  # pylint: disable=W0703
+                log.error('Family scan error: %s' % err)
+                failed = True
+                results.put((None, None, err))
+            finally:
+                if connection is not None:
+                    self.connection_pool.release(connection,
+                                                 discard=failed)
+                results.put(None)
+
+        workers = [threading.Thread(target=worker)
+                   for _ in range(min(self.scan_workers, len(families)))]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+
+        intersects = None
+        error = None
+        running = len(workers)
+        while running:
+            result = results.get()
+            if result is None:
+                running -= 1
+                continue
+
+            (family, rows, err) = result
+            if err is not None:
+                error = err
+                stop.set()
+            elif not stop.is_set():
+                if intersects is None:
+                    intersects = rows
+                else:
+                    intersects &= rows
+
+                if not intersects:
+                    log.debug('Family "%s" emptied the intersection: '
+                              'ending scans' % family)
+                    stop.set()
+
+        for thread in workers:
+            thread.join()
+
+        if error is not None:
+            raise error
+
+        return intersects
+
+
+def open_scanner(connection, table, cols=None, iterators=None):
+    """Create an Accumulo proxy scanner over *table* whose lifetime is
+    managed by the caller (unlike :meth:`pyaccumulo.Accumulo.scan`).
+    Read the scanner with :meth:`pyaccumulo.Accumulo.perform_scan` and
+    release it with :func:`close_scanner` if the scan is not read
+    through to the end.
+
+    **Args:**
+        *connection*: :class:`pyaccumulo.Accumulo` connection
+
+        *table*: name of the table to scan
+
+    **Kwargs:**
+        *cols*: list of ``[family]`` or ``[family, qualifier]`` column
+        lists to scan
+
+        *iterators*: list of :mod:`pyaccumulo.iterators` objects
+
+    **Returns:**
+        the proxy scanner identifier
 
-            batch_results.append(set(cells.keys()))
+    """
+    columns = None
+    if cols:
+        columns = [ScanColumn(colFamily=col[0],
+                              colQualifier=col[1] if len(col) > 1 else None)
+                   for col in cols]
 
-            # Provide some optimisation.  No need continuing scans if
-            # the most recent one returns no results.
-            if not cells.keys():
-                log.debug('Sub-scan returned empty set: ending scans')
-                break
+    settings = None
+    if iterators:
+        settings = [i.get_iterator_setting() for i in iterators]
 
-        intersects = set.intersection(*batch_results)
+    options = ScanOptions(columns=columns, iterators=settings)
 
-        log.debug('Regex scanning result count: %d' % len(intersects))
+    return connection.client.createScanner(connection.login, table, options)
 
-        return list(intersects)
+
+def close_scanner(connection, scanner):
+    """Release the proxy *scanner* created by :func:`open_scanner`.
+    Errors are logged and swallowed as the scanner may already be gone
+    (for example, after a failed read).
+
+    """
+    try:
+        connection.client.closeScanner(scanner)
+    except WRITER_ERRORS as err:
+        log.debug('Scanner close error: %s' % err)
+
+
+def resume_range(resume):
+    """Build a :class:`pyaccumulo.Range` that starts at the first
+    possible row after the *resume* row.
+
+    """
+    return pyaccumulo.Range(srow='%s\0' % resume)
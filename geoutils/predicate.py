@@ -0,0 +1,172 @@
+# pylint: disable=R0903,C0111,R0902
+"""Typed predicates over the column qualifier values of a metadata
+scan (see :meth:`geoutils.ModelBase.batch_regex_scan`).
+
+Each predicate provides a :attr:`regex` that is pushed down to the
+tablet servers as a ``RegExFilter`` to prune the obvious non-matches,
+and is called with the cell value to make the exact (typed) comparison
+on the client.
+
+"""
+__all__ = ['Predicate',
+           'Contains',
+           'Equals',
+           'Prefix',
+           'NumericRange',
+           'DateRange',
+           'to_predicate']
+
+import datetime
+import re
+
+
+NITF_DATE_FORMAT = '%Y%m%d%H%M%S'
+
+
+class Predicate(object):
+    """Base predicate that matches every value.
+
+    .. attribute:: *regex*
+        the column qualifier regular expression to filter on the tablet
+        servers (``None`` to not filter server side)
+
+    .. attribute:: *match_substring*
+        if ``True`` the :attr:`regex` may match any part of the value
+
+    """
+    regex = None
+    match_substring = False
+
+    def __call__(self, value):
+        return True
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join(repr(v) for v in self.args()))
+
+    def args(self):
+        return []
+
+
+class Contains(Predicate):
+    """Match values that contain the regular expression *pattern*.
+
+    This is the historic behaviour of the plain string search terms.
+
+    """
+    match_substring = True
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.regex = '.*%s.*' % pattern
+        self._compiled = re.compile(pattern)
+
+    def __call__(self, value):
+        return self._compiled.search(value) is not None
+
+    def args(self):
+        return [self.pattern]
+
+
+class Equals(Predicate):
+    """Match values equal to *value*.
+
+    """
+    def __init__(self, value):
+        self.value = value
+        self.regex = re.escape(value)
+
+    def __call__(self, value):
+        return value == self.value
+
+    def args(self):
+        return [self.value]
+
+
+class Prefix(Predicate):
+    """Match values that start with *prefix*.
+
+    """
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.regex = '%s.*' % re.escape(prefix)
+
+    def __call__(self, value):
+        return value.startswith(self.prefix)
+
+    def args(self):
+        return [self.prefix]
+
+
+class NumericRange(Predicate):
+    """Match numeric values between *low* and *high* (inclusive).
+
+    Either bound can be ``None`` for an open range.  Values that are
+    not numbers never match.
+
+    """
+    regex = r'[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?'
+
+    def __init__(self, low=None, high=None):
+        self.low = low
+        self.high = high
+
+    def __call__(self, value):
+        try:
+            number = float(value)
+        except ValueError:
+            return False
+
+        return ((self.low is None or number >= self.low) and
+                (self.high is None or number <= self.high))
+
+    def args(self):
+        return [self.low, self.high]
+
+
+class DateRange(Predicate):
+    """Match NITF ``CCYYMMDDhhmmss`` date/time values (for example,
+    ``NITF_IDATIM``) between *start* and *end* (inclusive).
+
+    Bounds can be :class:`datetime.datetime` objects or partial
+    ``CCYYMMDDhhmmss`` strings.  For example, ``DateRange('1996',
+    '1997')`` matches all of 1996 and 1997.  Either bound can be
+    ``None`` for an open range.  Unknown dates (``--------------``)
+    never match.
+
+    """
+    regex = '[0-9]{14}'
+
+    def __init__(self, start=None, end=None):
+        self.start = self.normalise(start, '0')
+        self.end = self.normalise(end, '9')
+
+    def __call__(self, value):
+        return (len(value) == 14 and value.isdigit() and
+                (self.start is None or value >= self.start) and
+                (self.end is None or value <= self.end))
+
+    def args(self):
+        return [self.start, self.end]
+
+    @staticmethod
+    def normalise(bound, fill):
+        if isinstance(bound, (datetime.datetime, datetime.date)):
+            bound = bound.strftime(NITF_DATE_FORMAT)
+        elif bound is not None:
+            bound = bound.ljust(14, fill)
+
+        return bound
+
+
+def to_predicate(term):
+    """Convert the search *term* into a :class:`Predicate`.
+
+    Plain strings are treated as :class:`Contains` regular expressions
+    for backwards compatibility.
+
+    """
+    if not isinstance(term, Predicate):
+        term = Contains(term)
+
+    return term
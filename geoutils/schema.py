@@ -6,8 +6,10 @@ consumed by an Accumulo ingest.
 """
 __all__ = ["Schema"]
 
-import re
+import copy
+import numpy
 
+import geoutils
 import geoutils.index
 from geosutils.log import log
 from geosutils.utils import get_reverse_timestamp
@@ -16,14 +18,32 @@ from geosutils.utils import get_reverse_timestamp
 class Schema(object):
     """:class:`geoutils.Standard`
 
+    .. attribute:: *spatial*
+        :class:`geoutils.index.Spatial` object that generates the
+        spatial index row keys
+
+    .. attribute:: *tokenizer*
+        :class:`geoutils.Tokenizer` object that splits the metadata
+        values into the ``meta_search`` document terms
+
     """
     _source_id = None
     _shard_id = None
     _data = {}
-
-    def __init__(self, source_id=None, shard_id=None):
+    _spatial = geoutils.index.Spatial()
+    _tokenizer = geoutils.Tokenizer()
+
+    def __init__(self,
+                 source_id=None,
+                 shard_id=None,
+                 spatial=None,
+                 tokenizer=None):
         self.source_id = source_id
         self.shard_id = shard_id
+        if spatial is not None:
+            self.spatial = spatial
+        if tokenizer is not None:
+            self.tokenizer = tokenizer
         self.data['tables'] = {}
 
     def __call__(self):
@@ -48,6 +68,22 @@ class Schema(object):
     def shard_id(self, value):
         self._shard_id = value
 
+    @property
+    def spatial(self):
+        return self._spatial
+
+    @spatial.setter
+    def spatial(self, value):
+        self._spatial = value
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, value):
+        self._tokenizer = value
+
     @property
     def data(self):
         return self._data
@@ -131,7 +167,8 @@ class Schema(object):
                     image_extract_ref,
                     downsample=None,
                     image_type='MONO',
-                    thumb=False):
+                    thumb=False,
+                    thumb_format=None):
         """Create a reference to an image extraction process that is
         associated with the image library's schema image/thumb component.
 
@@ -153,6 +190,11 @@ class Schema(object):
             as a reduced image thumb.  Importantly, this will set the
             column family value to ``thumb``
 
+            *thumb_format*: encode the thumb once at ingest to this
+            image format (for example, ``JPEG`` or ``PNG``) and record
+            the format in the ``format`` column.  If ``None``, the raw
+            pixel data is stored
+
         **Returns:**
             dictionary structure that represents an Accumulo
             family/value structure in the form::
@@ -169,6 +211,13 @@ class Schema(object):
         if thumb:
             key = 'thumb'
 
+        if thumb and thumb_format is not None:
+            image_extract_ref = geoutils.GeoImage.encode_image(
+                image_extract_ref,
+                downsample,
+                image_type=image_type,
+                img_format=thumb_format)
+
         self.data['tables'][image_table] = {}
         data = self.data['tables'][image_table]['cf'] = {}
         data['val'] = {key: image_extract_ref}
@@ -176,18 +225,23 @@ class Schema(object):
         data['cq'] = {'x_coord_size': str(downsample[0]),
                       'y_coord_size': str(downsample[1]),
                       'irep': image_type}
+        if thumb and thumb_format is not None:
+            data['cq']['format'] = thumb_format
 
         log.info('Ingest image structure build done')
 
     def build_document_map(self,
                            source_meta,
                            token='metadata=',
-                           length=3):
+                           length=None):
         """Extract the original metadata components and prepare a
         unique collection of words larger than *length* characters.
         Typically, these are the keys within the schema that start with
         ``metadata=*``.  However, token can be overriden with *token*.
 
+        Tokenization, stop word removal and the per-field rules are
+        delegated to :attr:`tokenizer`.
+
         As with all the ``geoutils.Schema.build*` methods, builds and
         persists the schema data structure within the object instance.
 
@@ -199,7 +253,7 @@ class Schema(object):
             created components)
 
             *length*: ignores document map elements less than or equal
-            to this number
+            to this number.  Overrides :attr:`geoutils.Tokenizer.length`
 
         **Returns:**
             a Python ``set`` of unique words extracted from the
@@ -209,20 +263,15 @@ class Schema(object):
         log.debug('Creating metadata document map ...')
 
         # Strip out all of the metdata specific keys.
-        meta_keys = [k for k in source_meta.keys() if k.startswith(token)]
-        meta = dict((re.sub('^%s' % token, '', k),
-                    source_meta[k]) for k in meta_keys)
-
-        # Strip out all short values and split on sequences of
-        # alphanumeric characters.
-        ok_content = {}
-        for meta_key, value in meta.iteritems():
-            if len(value) > length:
-                ok_content[meta_key] = re.split('[^\w]+', value.lower())
-
-        doc_set = None
-        content = ok_content.values()
-        doc_set = set([v for vals in content for v in vals if len(v) > length])
+        meta = dict((k[len(token):], v) for k, v in source_meta.iteritems()
+                    if k.startswith(token))
+
+        tokenizer = self.tokenizer
+        if length is not None and length != tokenizer.length:
+            tokenizer = copy.copy(tokenizer)
+            tokenizer.length = length
+
+        doc_set = tokenizer(meta)
         log.debug('Metadata document map done')
 
         return doc_set
@@ -293,9 +342,7 @@ class Schema(object):
 
         data = self.data['tables'][index_table]
 
-        index = geoutils.index.Spatial()
-
-        stripe_token = index.get_stripe_token(self.source_id)
+        index = self.spatial
 
         if point is None:
             log.error('Lat/long point not defined: spatial index skipped')
@@ -308,7 +355,7 @@ class Schema(object):
             timestamp = get_reverse_timestamp(source_date)
 
             # Override the row_id.
-            row_id = '%s_%s_%s' % (stripe_token, geohash, timestamp)
+            row_id = index.gen_row_key(self.source_id, geohash, timestamp)
 
             # Build the schema component.
             data['row_id'] = row_id
@@ -344,9 +391,7 @@ class Schema(object):
 
         data = self.data['tables'][index_table]
 
-        index = geoutils.index.Spatial()
-
-        stripe_token = index.get_stripe_token(self.source_id)
+        index = self.spatial
 
         log.debug('Generating geohash from lat/long: %s/%s' %
                   (str(gdelt.latitude), str(gdelt.longitude)))
@@ -357,10 +402,10 @@ class Schema(object):
 
         # Override the row_id.
         if geohash is not None:
-            self.source_id = ('%s_%s_%s_%s' % (stripe_token,
+            self.source_id = index.gen_row_key(gdelt.event_id,
                                                geohash,
                                                timestamp,
-                                               gdelt.event_id))
+                                               suffix=gdelt.event_id)
 
             data['cf'] = {
                 'cq': {
@@ -381,3 +426,74 @@ class Schema(object):
             log.error('')
 
         log.info('Ingest GDELT spatial index structure build done')
+
+    def build_gdelt_spatial_indexes(self, index_table, columns):
+        """Batch version of
+        :meth:`geoutils.Schema.build_gdelt_spatial_index` that builds
+        the GDELT spatial index schema of every event in *columns*.
+
+        Unlike the other ``geoutils.Schema.build*`` methods, each event
+        gets its own data structure so the results can be queued and
+        ingested without taking a copy.  Events without a valid geohash
+        are returned without a ``row_id`` so that the ingest reports
+        them as failed.
+
+        **Args:**
+            *index_table*: the name of the GDELT spatial index table
+
+            *columns*: the GDELT event columns as returned by
+            :meth:`geoutils.Gdelt.extract_gdelt_columns`
+
+        **Returns:**
+            list of ingest data structures (in *columns* order)
+
+        """
+        index = self.spatial
+
+        latitudes = columns['latitude']
+        longitudes = columns['longitude']
+        defined = ~(numpy.isnan(latitudes) | numpy.isnan(longitudes))
+        geohashes = index.gen_geohash_array(latitudes, longitudes).tolist()
+
+        values = dict((name, column.tolist())
+                      for name, column in columns.iteritems())
+
+        schemas = []
+        for i, event_id in enumerate(values['event_id']):
+            event_id = str(event_id)
+            data = {'row_id': None, 'shard_id': self.shard_id, 'tables': {}}
+            schemas.append(data)
+
+            if not defined[i]:
+                log.info('GlobalEventID %s lat/long undefined: skipped' %
+                         event_id)
+                continue
+
+            date_added = values['date_added'][i]
+            timestamp = get_reverse_timestamp(date_added.ljust(14, '0'))
+            data['row_id'] = index.gen_row_key(event_id,
+                                               geohashes[i],
+                                               timestamp,
+                                               suffix=event_id)
+            data['tables'][index_table] = {
+                'cf': {
+                    'cq': {
+                        'GlobalEventID': event_id,
+                        'Day': values['event_day'][i],
+                        'Actor1Geo_Type': values['type'][i],
+                        'Actor1Geo_Fullname': values['fullname'][i],
+                        'Actor1Geo_CountryCode': values['country_code'][i],
+                        'Actor1Geo_ADM1Code': values['adm1_code'][i],
+                        'Actor1Geo_Lat': repr(values['latitude'][i]),
+                        'Actor1Geo_Long': repr(values['longitude'][i]),
+                        'Actor1Geo_FeatureID': values['feature_id'][i],
+                        'DATEADDED': date_added,
+                        'SOURCEURL': values['source_url'][i]
+                    }
+                }
+            }
+
+        log.info('Ingest GDELT spatial index batch of %d built' %
+                 len(schemas))
+
+        return schemas
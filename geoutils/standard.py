@@ -11,6 +11,7 @@ import os
 from osgeo import gdal
 
 import geoutils
+import geoutils.index
 import geoutils.model
 from geosutils.log import log
 from geosutils.utils import hashcode
@@ -21,6 +22,12 @@ class Standard(object):
 
     .. attribute: filename
 
+    .. attribute: thumb_format
+        image format that the thumb is encoded to at ingest (default
+        ``JPEG``).  ``None`` stores the raw pixel data.  Formats that
+        the imaging library cannot encode (see
+        :meth:`geoutils.GeoImage.can_encode`) fall back to ``JPEG``
+
     """
     _filename = None
     _dataset = None
@@ -30,6 +37,9 @@ class Standard(object):
     _image_model = geoutils.model.Image(None)
     _thumb_model = geoutils.model.Thumb(None)
     _meta_shards = 4
+    _spatial = geoutils.index.Spatial()
+    _tokenizer = geoutils.Tokenizer()
+    _thumb_format = 'JPEG'
 
     def __init__(self, source_filename=None):
         self._filename = source_filename
@@ -66,7 +76,10 @@ class Standard(object):
 
         self.meta.extract_meta(self.dataset)
 
-        schema = geoutils.Schema(row_id, shard_id)
+        schema = geoutils.Schema(row_id,
+                                 shard_id,
+                                 spatial=self.spatial,
+                                 tokenizer=self.tokenizer)
 
         image_uri = self.image_model.hdfs_write(self.filename,
                                                 target_path,
@@ -76,17 +89,19 @@ class Standard(object):
         band = self.dataset.GetRasterBand(1)
         (x_size, y_size) = self.image.scale((band.XSize, band.YSize), 300)
         image_extract_ref = self.image.extract_image(self.dataset,
-                                                     (x_size, y_size))
+                                                     (x_size, y_size),
+                                                     tiled=True)
 
         image_type = 'MONO'
-        if self.dataset.RasterCount == 3:
+        if len(self.image.select_bands(self.dataset)) == 3:
             image_type = 'RGB'
 
         schema.build_image(self.thumb_model.name,
                            image_extract_ref,
                            downsample=(x_size, y_size),
                            image_type=image_type,
-                           thumb=True)
+                           thumb=True,
+                           thumb_format=self.thumb_format)
 
         log.info('Ingest data structure build done')
 
@@ -136,6 +151,34 @@ class Standard(object):
     def meta_shards(self, value):
         self._meta_shards = value
 
+    @property
+    def spatial(self):
+        return self._spatial
+
+    @spatial.setter
+    def spatial(self, value):
+        self._spatial = value
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, value):
+        self._tokenizer = value
+
+    @property
+    def thumb_format(self):
+        return self._thumb_format
+
+    @thumb_format.setter
+    def thumb_format(self, value):
+        if value is not None and not geoutils.GeoImage.can_encode(value):
+            log.error('Unsupported thumb format "%s": using "%s"' %
+                      (value, Standard._thumb_format))
+            value = Standard._thumb_format
+        self._thumb_format = value
+
     def get_shard(self, source):
         code = hashcode(source)
         shard = "s%02d" % ((code & 0x0ffffffff) % self.meta_shards)
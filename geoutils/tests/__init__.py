@@ -9,3 +9,10 @@ from test_modelbase import TestModelBase
 from test_schema import TestSchema
 from test_auditer import TestAuditer
 from test_gdelt import TestGdelt
+from test_writerpool import TestWriterPool
+from test_connectionpool import TestConnectionPool
+from test_gdeltpipeline import TestGdeltPipeline
+from test_wholerow import TestWholeRow
+from test_bboxcache import TestBBoxCache
+from test_tokenizer import TestTokenizer
+from test_predicate import TestPredicate
@@ -0,0 +1,115 @@
+# pylint: disable=R0904,C0103
+""":class:`geoutils.BBoxCache` tests.
+
+"""
+import unittest2
+import time
+
+import geoutils
+
+
+class TestBBoxCache(unittest2.TestCase):
+    """:class:`geoutils.BBoxCache` test cases.
+    """
+    def setUp(self):
+        self._cache = geoutils.BBoxCache()
+        self._corners = [
+            ('i_3001a', 0, 32.9830554198, 84.9999998642, 10),
+            ('i_3001a', 1, 32.9833334691, 84.9999998642, 10),
+            ('i_3001a', 2, 32.9830554198, 85.0002779135, 10),
+            ('i_3001a', 3, 32.9833334691, 85.0002779135, 10),
+            ('i_6130e', 0, -10.0, 140.0, 20),
+            ('i_6130e', 1, -8.0, 142.0, 20),
+        ]
+
+    def test_init(self):
+        """Initialise a :class:`geoutils.BBoxCache` object.
+        """
+        msg = 'Object is not a geoutils.BBoxCache'
+        self.assertIsInstance(self._cache, geoutils.BBoxCache, msg)
+
+    def test_update(self):
+        """Load image corners into the cache.
+        """
+        received = self._cache.update(self._corners)
+        expected = 2
+        msg = 'BBox cache update count error'
+        self.assertEqual(received, expected, msg)
+
+        received = self._cache.watermark
+        expected = 20
+        msg = 'BBox cache watermark error'
+        self.assertEqual(received, expected, msg)
+
+        received = self._cache.coords()['i_6130e']
+        expected = [[-10.0, 140.0], [-8.0, 142.0]]
+        msg = 'BBox cache coords error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_update_incremental(self):
+        """Incremental update of an existing image.
+        """
+        self._cache.update(self._corners)
+        self._cache.update([('i_6130e', 1, -6.0, 142.0, 30)])
+
+        msg = 'BBox cache should not grow on an existing image'
+        self.assertEqual(len(self._cache), 2, msg)
+
+        received = self._cache.contains_point(-7.0, 141.0)
+        expected = ['i_6130e']
+        msg = 'BBox cache extents should reflect the updated corner'
+        self.assertListEqual(received, expected, msg)
+
+    def test_contains_point(self):
+        """Point in bounding box cache query.
+        """
+        self._cache.update(self._corners)
+
+        received = self._cache.contains_point(32.9831944444, 85.0001388889)
+        expected = ['i_3001a']
+        msg = 'BBox cache point query error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._cache.contains_point(0.0, 0.0)
+        msg = 'BBox cache point query should not match'
+        self.assertListEqual(received, [], msg)
+
+    def test_intersects(self):
+        """Bounding box intersection cache query.
+        """
+        self._cache.update(self._corners)
+
+        received = self._cache.intersects(-90.0, 0.0, 90.0, 141.0)
+        expected = ['i_3001a', 'i_6130e']
+        msg = 'BBox cache intersection query error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._cache.intersects(-9.0, 141.5, 0.0, 150.0)
+        expected = ['i_6130e']
+        msg = 'BBox cache partial intersection query error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_expired(self):
+        """Check if the cache needs a refresh.
+        """
+        msg = 'BBox cache should be expired before the first refresh'
+        self.assertTrue(self._cache.expired(60), msg)
+
+        self._cache.refreshed = time.time()
+        msg = 'BBox cache should be current within the TTL'
+        self.assertFalse(self._cache.expired(60), msg)
+        msg = 'BBox cache without a TTL should never expire'
+        self.assertFalse(self._cache.expired(), msg)
+
+        self._cache.refreshed = time.time() - 120
+        msg = 'BBox cache should be expired after the TTL'
+        self.assertTrue(self._cache.expired(60), msg)
+
+        self._cache.refreshed = time.time()
+        self._cache.invalidate()
+        msg = 'Invalidated BBox cache should be expired'
+        self.assertTrue(self._cache.expired(60), msg)
+
+    def tearDown(self):
+        self._cache = None
+        del self._cache
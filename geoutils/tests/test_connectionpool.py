@@ -0,0 +1,141 @@
+# pylint: disable=R0904,C0103,W0212
+""":class:`geoutils.ConnectionPool` tests.
+
+"""
+import unittest2
+import socket
+
+import geoutils
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.closed = False
+        self.stale = False
+
+    def list_tables(self):
+        if self.stale:
+            raise socket.error('Connection reset by peer')
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest2.TestCase):
+    """:class:`geoutils.ConnectionPool` test cases.
+    """
+    def setUp(self):
+        self._opened = []
+
+        def factory():
+            connection = FakeConnection()
+            self._opened.append(connection)
+            return connection
+
+        self._pool = geoutils.ConnectionPool(factory)
+
+    def test_init(self):
+        """Initialise a :class:`geoutils.ConnectionPool` object.
+        """
+        msg = 'Object is not a geoutils.ConnectionPool'
+        self.assertIsInstance(self._pool, geoutils.ConnectionPool, msg)
+
+    def test_acquire_reuse(self):
+        """Acquire a connection: released connections are reused.
+        """
+        connection = self._pool.acquire()
+        self._pool.release(connection)
+
+        received = self._pool.acquire()
+        msg = 'Released connection should be reused'
+        self.assertIs(received, connection, msg)
+
+        received = len(self._opened)
+        expected = 1
+        msg = 'Pool should not open a connection while one is idle'
+        self.assertEqual(received, expected, msg)
+
+    def test_acquire_validate(self):
+        """Acquire a connection: idle connections are validated.
+        """
+        self._pool.validate_after = 0
+        connection = self._pool.acquire()
+        self._pool.release(connection)
+
+        received = self._pool.acquire()
+        msg = 'Valid idle connection should be reused'
+        self.assertIs(received, connection, msg)
+
+    def test_acquire_stale(self):
+        """Acquire a connection: stale idle connections are replaced.
+        """
+        self._pool.validate_after = 0
+        connection = self._pool.acquire()
+        self._pool.release(connection)
+        connection.stale = True
+
+        received = self._pool.acquire()
+        msg = 'Stale idle connection should not be reused'
+        self.assertIsNot(received, connection, msg)
+
+        msg = 'Stale idle connection should be closed'
+        self.assertTrue(connection.closed, msg)
+
+        received = len(self._opened)
+        expected = 2
+        msg = 'Pool should open a connection to replace a stale one'
+        self.assertEqual(received, expected, msg)
+
+    def test_acquire_not_validated(self):
+        """Acquire a connection: recently released connections.
+        """
+        connection = self._pool.acquire()
+        self._pool.release(connection)
+        connection.stale = True
+
+        received = self._pool.acquire()
+        msg = 'Recently released connection should not be validated'
+        self.assertIs(received, connection, msg)
+
+    def test_release_discard(self):
+        """Release a connection: discarded connections are closed.
+        """
+        connection = self._pool.acquire()
+        self._pool.release(connection, discard=True)
+
+        msg = 'Discarded connection should be closed'
+        self.assertTrue(connection.closed, msg)
+
+        received = self._pool.idle
+        expected = 0
+        msg = 'Discarded connection should not be held in the pool'
+        self.assertEqual(received, expected, msg)
+
+    def test_release_max_idle(self):
+        """Release connections: idle connections beyond max_idle.
+        """
+        self._pool.max_idle = 1
+        connections = [self._pool.acquire() for _ in range(2)]
+        for connection in connections:
+            self._pool.release(connection)
+
+        received = [c.closed for c in connections]
+        expected = [False, True]
+        msg = 'Connections beyond max_idle should be closed'
+        self.assertListEqual(received, expected, msg)
+
+    def test_close(self):
+        """Close the pool.
+        """
+        connection = self._pool.acquire()
+        self._pool.release(connection)
+        self._pool.close()
+
+        msg = 'Idle connection should be closed'
+        self.assertTrue(connection.closed, msg)
+
+        received = self._pool.idle
+        expected = 0
+        msg = 'Closed pool should not hold idle connections'
+        self.assertEqual(received, expected, msg)
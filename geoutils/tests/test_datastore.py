@@ -49,6 +49,49 @@ class TestDatastore(unittest2.TestCase):
         msg = 'geoutils.Datastore.connection attribute should be set'
         self.assertIsNotNone(received, msg)
 
+    def test_configure(self):
+        """Configure the datastore from the ingest configuration.
+        """
+        conf = geoutils.InitConfig(os.path.join('geoutils',
+                                                'config',
+                                                'tests',
+                                                'files',
+                                                'geoutils.conf'))
+        conf.parse_config()
+
+        old_spatial = self._ds.spatial
+        self._ds.configure(conf)
+
+        msg = 'Metadata model spatial stripes not configured'
+        self.assertEqual(self._ds.meta.spatial.stripes, 10, msg)
+        msg = 'GDELT model spatial stripes not configured'
+        self.assertEqual(self._ds.gdelt.spatial.stripes, 10, msg)
+
+        self._ds.spatial = old_spatial
+
+    def test_configure_tokenizer(self):
+        """Configure the datastore metasearch tokenizer.
+        """
+        conf = geoutils.IngestConfig(os.path.join('geoutils',
+                                                  'config',
+                                                  'tests',
+                                                  'files',
+                                                  'geoutils.conf'))
+        conf.parse_config()
+
+        old_spatial = self._ds.spatial
+        old_tokenizer = self._ds.tokenizer
+        self._ds.configure(conf)
+
+        received = self._ds.meta_search.tokenizer
+        msg = 'Metasearch model should share the datastore tokenizer'
+        self.assertIs(received, self._ds.tokenizer, msg)
+        msg = 'Metasearch model tokenizer length not configured'
+        self.assertEqual(received.length, 4, msg)
+
+        self._ds.spatial = old_spatial
+        self._ds.tokenizer = old_tokenizer
+
     def test_connect_bad_credentials(self):
         """Attempt a connection to an Accumulo datastore: bad creds.
         """
@@ -88,6 +131,25 @@ class TestDatastore(unittest2.TestCase):
         msg = 'Table deletion (missing table) should return False'
         self.assertFalse(received, msg)
 
+    def test_init_table_with_splits(self):
+        """Initialise a pre-split table.
+        """
+        self._ds.connect()
+        received = self._ds.init_table(self._image_table_name,
+                                       splits=['s01', 's02'])
+        msg = 'Pre-split table initialisation should return True'
+        self.assertTrue(received, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._image_table_name)
+
+    def test_add_splits_no_connection(self):
+        """Add table splits: no connection state.
+        """
+        received = self._ds.add_splits(self._image_table_name, ['s01'])
+        msg = 'Add splits (no connection) should return False'
+        self.assertFalse(received, msg)
+
     def test_create_write_no_connection(self):
         """Create an Accumulo writer object: no connection.
         """
@@ -357,6 +419,51 @@ class TestDatastore(unittest2.TestCase):
 #        self._ds.delete_table(self._image_table_name)
 #        self._ds.delete_table(self._thumb_table_name)
 
+    def test_ingest_many_no_connection(self):
+        """Accumulo bulk ingest: no connection.
+        """
+        from geoutils.tests.files.ingest_data_01 import DATA
+        received = self._ds.ingest_many([DATA])
+        expected = {'records': [('i_3001a', False)],
+                    'counters': {'records': 1,
+                                 'ingested': 0,
+                                 'failed': 1,
+                                 'skipped': 0,
+                                 'mutations': 0,
+                                 'batches': 1}}
+        msg = 'Accumulo bulk ingest (no connection) error'
+        self.assertDictEqual(received, expected, msg)
+
+    def test_ingest_many(self):
+        """Bulk ingest multiple records into the datastore.
+        """
+        from geoutils.tests.files.ingest_data_01 import DATA as DATA_01
+        from geoutils.tests.files.ingest_data_02 import DATA as DATA_02
+
+        self._ds.connect()
+        self._ds.init_table(self._meta_table_name)
+
+        received = self._ds.ingest_many(iter([DATA_01, DATA_02]),
+                                        batch_size=1)
+        expected = {'records': [(DATA_01['row_id'], True),
+                                (DATA_02['row_id'], True)],
+                    'counters': {'records': 2,
+                                 'ingested': 2,
+                                 'failed': 0,
+                                 'skipped': 0,
+                                 'mutations': 2,
+                                 'batches': 2}}
+        msg = 'Bulk ingest status error'
+        self.assertDictEqual(received, expected, msg)
+
+        received = self._ds.meta.query_metadata().keys()
+        expected = [DATA_01['row_id'], DATA_02['row_id']]
+        msg = 'Bulk ingest rows not written'
+        self.assertListEqual(sorted(received), sorted(expected), msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_table_name)
+
     def test_delete_table_no_connection(self):
         """Delete an Accumulo table: no connection.
         """
@@ -393,6 +500,68 @@ class TestDatastore(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_exists_table_cached_no_connection(self):
+        """Table exists cache check: no connection.
+        """
+        received = self._ds.exists_table_cached(name='dodge')
+        msg = 'Table exists cache check (no connection) is not False'
+        self.assertFalse(received, msg)
+
+    def test_exists_table_cached(self):
+        """Table exists cache check follows table management.
+        """
+        self._ds.connect()
+
+        received = self._ds.exists_table_cached(name=self._meta_table_name)
+        msg = 'Table exists cache check (no table) is not False'
+        self.assertFalse(received, msg)
+
+        self._ds.init_table(self._meta_table_name)
+        received = self._ds.exists_table_cached(name=self._meta_table_name)
+        msg = 'Table exists cache check (after init) is not True'
+        self.assertTrue(received, msg)
+
+        self._ds.delete_table(self._meta_table_name)
+        received = self._ds.exists_table_cached(name=self._meta_table_name)
+        msg = 'Table exists cache check (after delete) is not False'
+        self.assertFalse(received, msg)
+
+    def test_exists_table_cached_invalidate(self):
+        """Table exists cache check: invalidated cache is reloaded.
+        """
+        self._ds.connect()
+        self._ds.exists_table_cached(name=self._meta_table_name)
+
+        # Create the table outside of the Datastore cache management.
+        self._ds.connection.create_table(self._meta_table_name)
+        received = self._ds.exists_table_cached(name=self._meta_table_name)
+        msg = 'Table exists cache check (stale cache) is not False'
+        self.assertFalse(received, msg)
+
+        self._ds.invalidate_table_cache()
+        received = self._ds.exists_table_cached(name=self._meta_table_name)
+        msg = 'Table exists cache check (invalidated cache) is not True'
+        self.assertTrue(received, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_table_name)
+
+    def test_exists_table_cached_miss(self):
+        """Table exists cache check: a miss reloads the cache.
+        """
+        self._ds.connect()
+        self._ds.exists_table_cached(name=self._meta_table_name)
+
+        # Create the table outside of the Datastore cache management.
+        self._ds.connection.create_table(self._meta_table_name)
+        self._ds.table_cache_miss_interval = 0
+        received = self._ds.exists_table_cached(name=self._meta_table_name)
+        msg = 'Table exists cache check (miss reload) is not True'
+        self.assertTrue(received, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_table_name)
+
     def test_index(self):
         """Index creating mutation.
         """
@@ -3,6 +3,7 @@
 
 """
 import unittest2
+import numpy
 
 import geoutils
 from geoutils.tests.files.test_gdelt_data import DATA
@@ -403,6 +404,83 @@ class TestGdelt(unittest2.TestCase):
         msg = 'Callable geoutils.Gdelt return value error'
         self.assertDictEqual(received, expected, msg)
 
+    def test_extract_gdelt_columns(self):
+        """Extract Event Geography lines from GDELT into columns.
+        """
+        lines = [DATA['gdelt_001'], DATA['gdelt_002'], DATA['gdelt_004']]
+
+        received = geoutils.Gdelt.extract_gdelt_columns(lines)
+
+        # GlobalEventID.
+        expected = [324845984, 324845984, 324846008]
+        msg = 'Extracted GlobalEventID column error'
+        self.assertListEqual(received['event_id'].tolist(), expected, msg)
+
+        # Actor1Geo_CountryCode.
+        expected = ['US', 'US', '']
+        msg = 'Extracted Actor1Geo_CountryCode column error'
+        self.assertListEqual(received['country_code'].tolist(), expected, msg)
+
+        # Actor1Geo_Lat.
+        expected = [38.8951, 38.8951]
+        msg = 'Extracted Actor1Geo_Lat column error'
+        self.assertListEqual(received['latitude'][:2].tolist(), expected, msg)
+        msg = 'Extracted Actor1Geo_Lat column (empty) not NaN'
+        self.assertTrue(numpy.isnan(received['latitude'][2]), msg)
+
+        # Actor1Geo_Long.
+        expected = [-77.0364, -77.0364]
+        msg = 'Extracted Actor1Geo_Long column error'
+        self.assertListEqual(received['longitude'][:2].tolist(), expected, msg)
+
+        # DATEADDED.
+        expected = ['20141124', '20141124', '20141124']
+        msg = 'Extracted DATEADDED column error'
+        self.assertListEqual(received['date_added'].tolist(), expected, msg)
+
+        # SOURCEURL (pre April 2013 format is empty).
+        received = [url[:31] for url in received['source_url'].tolist()]
+        expected = ['http://www.news.com.au/national',
+                    '',
+                    'http://myrepublica.com/portal/i']
+        msg = 'Extracted SOURCEURL column error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_extract_gdelt_columns_no_lines(self):
+        """Extract Event Geography lines from GDELT into columns: no lines.
+        """
+        received = geoutils.Gdelt.extract_gdelt_columns([])
+
+        msg = 'Extracted columns (no lines) should be empty'
+        self.assertEqual(len(received['event_id']), 0, msg)
+        self.assertEqual(len(received['latitude']), 0, msg)
+
+    def test_extract_gdelt_columns_malformed_line(self):
+        """Extract Event Geography lines from GDELT: malformed line.
+        """
+        lines = [DATA['gdelt_001'], 'malformed\tline', DATA['gdelt_004']]
+
+        received = geoutils.Gdelt.extract_gdelt_columns(lines)
+        expected = [324845984, 324846008]
+        msg = 'Malformed GDELT line should be skipped'
+        self.assertListEqual(received['event_id'].tolist(), expected, msg)
+
+    def test_schemas(self):
+        """Build the GDELT ingest schemas of a batch of lines.
+        """
+        lines = [DATA['gdelt_001'], DATA['gdelt_004']]
+
+        received = geoutils.Gdelt.schemas(lines)
+        msg = 'Batch GDELT schema should match the callable schema'
+        self.assertDictEqual(received[0], GDELT_SCHEMA, msg)
+
+        expected = {'row_id': None, 'shard_id': None, 'tables': {}}
+        msg = 'Batch GDELT schema (undefined lat/long) error'
+        self.assertDictEqual(received[1], expected, msg)
+
+        msg = 'Batch GDELT schemas should not share data'
+        self.assertIsNot(received[0]['tables'], received[1]['tables'], msg)
+
     def tearDown(self):
         self._gdelt = None
         del self._gdelt
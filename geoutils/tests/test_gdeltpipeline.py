@@ -0,0 +1,135 @@
+# pylint: disable=R0904,C0103
+""":class:`geoutils.GdeltPipeline` tests.
+
+"""
+import unittest2
+import os
+import zipfile
+
+import geoutils
+import geolib_mock
+
+
+class TestGdeltPipeline(unittest2.TestCase):
+    """:class:`geoutils.GdeltPipeline` test cases.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Attempt to start the Accumulo mock proxy server.
+        """
+        conf = os.path.join('geoutils',
+                            'tests',
+                            'files',
+                            'proxy.properties')
+        cls._mock = geolib_mock.MockServer(conf)
+        cls._mock.start()
+
+        cls._gdelt_table_name = 'gdelt_spatial_index'
+        cls._audit_table_name = 'audit'
+        cls._gdelt_file = os.path.join('geoutils',
+                                       'daemon',
+                                       'tests',
+                                       'files',
+                                       '20141124.export.CSV.zip')
+
+    def setUp(self):
+        self._ds = geoutils.Datastore()
+        self._pipeline = geoutils.GdeltPipeline(self._connect)
+
+    @staticmethod
+    def _connect():
+        datastore = geoutils.Datastore()
+        datastore.connect()
+
+        return datastore
+
+    def test_init(self):
+        """Initialise a :class:`geoutils.GdeltPipeline` object.
+        """
+        msg = 'Object is not a geoutils.GdeltPipeline'
+        self.assertIsInstance(self._pipeline, geoutils.GdeltPipeline, msg)
+
+    def test_audits(self):
+        """Generate audit records for successful rows only.
+        """
+        records = [('row_01', True), ('row_02', False)]
+        received = [a['tables']['audit']['cf']['cq']['gdelt_daemon|row_id']
+                    for a in self._pipeline.audits(records, '1', '2')]
+        expected = ['row_01']
+        msg = 'GDELT pipeline audit records error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_audits_unique_row_ids(self):
+        """Audit records of rows in the same chunk have unique keys.
+        """
+        records = [('row_%02d' % i, True) for i in range(10)]
+        received = len(set([a['row_id']
+                            for a in self._pipeline.audits(records,
+                                                           '1',
+                                                           '2')]))
+        expected = 10
+        msg = 'GDELT pipeline audit row keys should be unique'
+        self.assertEqual(received, expected, msg)
+
+    def test_call(self):
+        """Stream a GDELT export file through the pipeline.
+        """
+        self._ds.connect()
+        self._ds.init_table(self._gdelt_table_name)
+        self._ds.init_table(self._audit_table_name)
+
+        self._pipeline.chunk_size = 10
+        self._pipeline.queue_size = 2
+
+        gdelt_zip = zipfile.ZipFile(self._gdelt_file, 'r')
+        file_h = gdelt_zip.open(gdelt_zip.namelist()[0], 'r')
+        received = self._pipeline(file_h)
+        expected = {'records': 100,
+                    'ingested': 99,
+                    'failed': 0,
+                    'skipped': 1,
+                    'mutations': 99,
+                    'batches': 10}
+        msg = 'GDELT pipeline counters error'
+        self.assertDictEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._gdelt_table_name)
+        self._ds.delete_table(self._audit_table_name)
+
+    def test_call_datastore_failure(self):
+        """Abort the pipeline when a write worker cannot connect.
+        """
+        def broken_connect():
+            raise IOError('Accumulo proxy unavailable')
+
+        pipeline = geoutils.GdeltPipeline(broken_connect)
+        pipeline.chunk_size = 10
+        pipeline.queue_size = 2
+        pipeline.poll_interval = 0.1
+
+        gdelt_zip = zipfile.ZipFile(self._gdelt_file, 'r')
+        file_h = gdelt_zip.open(gdelt_zip.namelist()[0], 'r')
+        with self.assertRaises(geoutils.GdeltPipelineError) as context:
+            pipeline(file_h)
+
+        msg = 'GDELT pipeline error should carry the worker error'
+        self.assertIn('Accumulo proxy unavailable',
+                      str(context.exception),
+                      msg)
+
+    def tearDown(self):
+        self._pipeline = None
+        del self._pipeline
+        self._ds = None
+        del self._ds
+
+    @classmethod
+    def tearDownClass(cls):
+        """Shutdown the Accumulo mock proxy server (if enabled)
+        """
+        cls._mock.stop()
+
+        del cls._gdelt_table_name
+        del cls._audit_table_name
+        del cls._gdelt_file
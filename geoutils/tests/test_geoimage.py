@@ -1,4 +1,4 @@
-# pylint: disable=R0904,C0103
+# pylint: disable=R0904,C0103,W0142
 """:class:`geoutils.Metadata` tests.
 
 """
@@ -6,6 +6,8 @@ import unittest2
 import os
 import tempfile
 import hashlib
+import numpy
+from osgeo import gdal
 
 import geoutils
 
@@ -86,6 +88,202 @@ class TestGeoImage(unittest2.TestCase):
         nitf = None
         del nitf
 
+    def test_extract_multiband_image_per_band(self):
+        """Extract a multiband image from the NITF file: per band reads.
+        """
+        nitf = geoutils.NITF(source_filename=self._mb_file)
+        nitf.open()
+
+        kwargs = {'dataset': nitf.dataset,
+                  'x_size': 512,
+                  'y_size': 512,
+                  'buf_x_size': 300,
+                  'buf_y_size': 300}
+        received = self._image.extract_multiband_image(interleaved=False,
+                                                       **kwargs)
+        msg = 'Per band multiband image extraction size error'
+        self.assertEqual(len(received), 300 * 300 * 3, msg)
+
+        if geoutils.geoimage.INTERLEAVED_READ:
+            expected = self._image.extract_multiband_image(**kwargs)
+            msg = 'Per band and interleaved reads should match'
+            self.assertEqual(received, expected, msg)
+
+        nitf = None
+        del nitf
+
+    def test_extract_tiled_image(self):
+        """Extract a downsampled image in block aligned windows.
+        """
+        nitf = geoutils.NITF(source_filename=self._file)
+        nitf.open()
+
+        self._image.tile_size = 256
+        handle = self._image.extract_image(dataset=nitf.dataset,
+                                           downsample=(300, 300),
+                                           tiled=True)
+        received = len(handle())
+        expected = 300 * 300
+        msg = 'Tiled image extraction size error'
+        self.assertEqual(received, expected, msg)
+
+        nitf = None
+        del nitf
+
+    def test_extract_tiled_image_multiband(self):
+        """Extract a downsampled multiband image in block aligned windows.
+        """
+        nitf = geoutils.NITF(source_filename=self._mb_file)
+        nitf.open()
+
+        received = len(self._image.extract_tiled_image(nitf.dataset,
+                                                       300,
+                                                       300))
+        expected = 300 * 300 * 3
+        msg = 'Tiled multiband image extraction size error'
+        self.assertEqual(received, expected, msg)
+
+        nitf = None
+        del nitf
+
+    def test_select_overview(self):
+        """Select the smallest overview at least the thumbnail size.
+        """
+        nitf = geoutils.NITF(source_filename=self._file)
+        nitf.open()
+
+        band = nitf.dataset.GetRasterBand(1)
+        received = self._image.select_overview(band, 300, 300)
+        msg = 'Image without overviews should not select an overview'
+        self.assertIsNone(received, msg)
+
+        tiff = tempfile.NamedTemporaryFile(suffix='.tif')
+        driver = gdal.GetDriverByName('GTiff')
+        dataset = driver.CreateCopy(tiff.name, nitf.dataset)
+        dataset.BuildOverviews('NEAREST', [2, 4, 8])
+
+        band = dataset.GetRasterBand(1)
+        received = [self._image.select_overview(band, 300, 300),
+                    self._image.select_overview(band, 100, 100)]
+        expected = [0, 2]
+        msg = 'Overview selection error'
+        self.assertListEqual(received, expected, msg)
+
+        handle = self._image.extract_image(dataset=dataset,
+                                           downsample=(300, 300),
+                                           tiled=True)
+        received = len(handle())
+        expected = 300 * 300
+        msg = 'Overview image extraction size error'
+        self.assertEqual(received, expected, msg)
+
+        dataset = None
+        tiff.close()
+        nitf = None
+        del nitf
+
+    def test_extract_image_multispectral_16bit(self):
+        """Extract a 4-band, 16-bit multispectral image.
+        """
+        driver = gdal.GetDriverByName('MEM')
+        dataset = driver.Create('', 600, 400, 4, gdal.GDT_UInt16)
+        interps = [gdal.GCI_BlueBand,
+                   gdal.GCI_GreenBand,
+                   gdal.GCI_RedBand,
+                   gdal.GCI_Undefined]
+        ramp = numpy.tile(numpy.arange(600, dtype=numpy.uint16) * 3,
+                          (400, 1))
+        for i, interp in enumerate(interps):
+            band = dataset.GetRasterBand(i + 1)
+            band.SetColorInterpretation(interp)
+            band.WriteArray(ramp)
+
+        received = self._image.select_bands(dataset)
+        expected = [3, 2, 1]
+        msg = 'RGB band selection by colour interpretation error'
+        self.assertListEqual(received, expected, msg)
+
+        handle = self._image.extract_image(dataset=dataset,
+                                           downsample=(300, 200))
+        stream = handle()
+        received = len(stream)
+        expected = 300 * 200 * 3
+        msg = 'Multispectral image extraction size error'
+        self.assertEqual(received, expected, msg)
+
+        pixels = numpy.frombuffer(stream, numpy.uint8)
+        received = (pixels.min(), pixels.max())
+        expected = (0, 255)
+        msg = '16-bit image should be stretched to the 8-bit range'
+        self.assertTupleEqual(received, expected, msg)
+
+        dataset = None
+
+    def test_select_bands(self):
+        """Select the bands to render.
+        """
+        nitf = geoutils.NITF(source_filename=self._file)
+        nitf.open()
+        received = self._image.select_bands(nitf.dataset)
+        expected = [1]
+        msg = 'Single band selection error'
+        self.assertListEqual(received, expected, msg)
+
+        nitf = geoutils.NITF(source_filename=self._mb_file)
+        nitf.open()
+        received = self._image.select_bands(nitf.dataset)
+        expected = [1, 2, 3]
+        msg = 'RGB band selection error'
+        self.assertListEqual(received, expected, msg)
+
+        nitf = None
+        del nitf
+
+    def test_stretch(self):
+        """Percentile stretch to 8-bit.
+        """
+        image_rect = numpy.arange(10000, dtype=numpy.float32)
+        image_rect = image_rect.reshape((100, 100, 1))
+
+        stretched = self._image.stretch(image_rect, (0, 100), 100)
+        received = (stretched.dtype,
+                    stretched[0, 0, 0],
+                    stretched[99, 99, 0])
+        expected = (numpy.uint8, 0, 255)
+        msg = 'Percentile stretch error'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_encode_image(self):
+        """Encode a raw multiband image stream to JPEG.
+        """
+        image_stream_file = os.path.join('geoutils',
+                                         'tests',
+                                         'files',
+                                         '300x300_bike-d-c-2.out')
+        image_stream_fh = open(image_stream_file, 'rb')
+        encode = self._image.encode_image(image_stream_fh.read,
+                                          (300, 300),
+                                          image_type='RGB')
+        encoded = encode()
+
+        image = self._image.decode_image(lambda: encoded)
+        received = (image.format, image.mode, image.size)
+        expected = ('JPEG', 'RGB', (300, 300))
+        msg = 'Encoded image error'
+        self.assertTupleEqual(received, expected, msg)
+
+        image_stream_fh.close()
+
+    def test_buffer_span(self):
+        """Map adjacent source windows onto the output buffer.
+        """
+        windows = [(0, 1024), (1024, 1024), (2048, 452)]
+        received = [self._image.buffer_span(o, s, 2500, 300)
+                    for o, s in windows]
+        expected = [(0, 122), (122, 245), (245, 300)]
+        msg = 'Buffer span mapping error'
+        self.assertListEqual(received, expected, msg)
+
     def test_scale(self):
         """Scale calulations.
         """
@@ -3,7 +3,9 @@
 
 """
 import unittest2
+import collections
 import os
+import threading
 
 from geoutils.tests.files.ingest_data_01 import DATA as DATA_01
 from geoutils.tests.files.ingest_data_02 import DATA as DATA_02
@@ -53,6 +55,20 @@ class TestModelBase(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._image_table_name)
 
+    def test_range_query_no_ranges(self):
+        """Range query: no row ranges.
+        """
+        self._ds.init_table(self._meta_table_name)
+        self._ds.ingest(DATA_01)
+
+        received = self._base.range_query(self._meta_table_name, [])
+        expected = []
+        msg = 'Range query without row ranges should not scan the table'
+        self.assertListEqual(list(received), expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_table_name)
+
     def test_query_with_cols(self):
         """Query: data exists.
         """
@@ -139,6 +155,46 @@ class TestModelBase(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_iter_rows(self):
+        """Distinct row IDs of a cell stream.
+        """
+        cells = [collections.namedtuple('Cell', 'row')(r)
+                 for r in ['a', 'a', 'b', 'c', 'c']]
+
+        received = list(self._base.iter_rows(cells))
+        expected = ['a', 'b', 'c']
+        msg = 'Distinct row IDs error'
+        self.assertListEqual(received, expected, msg)
+
+        received = list(self._base.iter_rows(cells, limit=2))
+        expected = ['a', 'b']
+        msg = 'Distinct row IDs (limit) error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_iter_rows_interleaved(self):
+        """Distinct row IDs of a cell stream: interleaved rows.
+        """
+        cells = [collections.namedtuple('Cell', 'row')(r)
+                 for r in ['a', 'b', 'a', 'c', 'b', 'a']]
+
+        received = list(self._base.iter_rows(cells))
+        expected = ['a', 'b', 'c']
+        msg = 'Distinct row IDs (interleaved) error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_page(self):
+        """Page through row keys.
+        """
+        received = self._base.page(iter(['a', 'b', 'c']), 2)
+        expected = (['a', 'b'], 'b')
+        msg = 'Page (more items) error'
+        self.assertTupleEqual(received, expected, msg)
+
+        received = self._base.page(iter(['c']), 2)
+        expected = (['c'], None)
+        msg = 'Page (last page) error'
+        self.assertTupleEqual(received, expected, msg)
+
     def test_regex_query(self):
         """RegEx query.
         """
@@ -287,6 +343,42 @@ class TestModelBase(unittest2.TestCase):
         # Clean up.
         self._ds.delete_table(self._meta_table_name)
 
+    def test_family_scan_stopped(self):
+        """Family scan: stopped scans close the proxy scanner.
+        """
+        self._ds.init_table(self._meta_table_name)
+
+        self._ds.ingest(DATA_01)
+
+        client = self._base.connection.client
+        closed = []
+        close_scanner = client.closeScanner
+
+        def closeScanner(scanner):
+            closed.append(scanner)
+            return close_scanner(scanner)
+
+        client.closeScanner = closeScanner
+        stop = threading.Event()
+        stop.set()
+        received = self._base.family_scan(self._meta_table_name,
+                                          'metadata=NITF_IREP',
+                                          [],
+                                          stop=stop)
+        del client.closeScanner
+
+        expected = set()
+        msg = 'Stopped family scan should not return row_ids'
+        self.assertSetEqual(received, expected, msg)
+
+        received = len(closed)
+        expected = 1
+        msg = 'Stopped family scan should close its proxy scanner'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        self._ds.delete_table(self._meta_table_name)
+
     @classmethod
     def tearDownClass(cls):
         """Shutdown the Accumulo mock proxy server (if enabled)
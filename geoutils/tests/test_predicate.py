@@ -0,0 +1,86 @@
+# pylint: disable=R0904,C0103
+""":mod:`geoutils.predicate` tests.
+
+"""
+import unittest2
+import datetime
+
+from geoutils.predicate import (Contains,
+                                Equals,
+                                Prefix,
+                                NumericRange,
+                                DateRange,
+                                to_predicate)
+
+
+class TestPredicate(unittest2.TestCase):
+    """:mod:`geoutils.predicate` test cases.
+    """
+    def test_to_predicate(self):
+        """Convert a plain search term to a predicate.
+        """
+        predicate = to_predicate('Airfield')
+        msg = 'Plain search term should convert to Contains'
+        self.assertIsInstance(predicate, Contains, msg)
+
+        received = predicate.regex
+        expected = '.*Airfield.*'
+        msg = 'Contains predicate regex error'
+        self.assertEqual(received, expected, msg)
+
+        equals = Equals('MONO')
+        msg = 'Predicate should not be converted'
+        self.assertIs(to_predicate(equals), equals, msg)
+
+    def test_equals(self):
+        """Equality predicate.
+        """
+        predicate = Equals('MONO')
+        received = [predicate(v) for v in ('MONO', 'MONOX', 'MON')]
+        expected = [True, False, False]
+        msg = 'Equals predicate error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_prefix(self):
+        """Prefix predicate.
+        """
+        predicate = Prefix('i_30')
+        received = [predicate(v) for v in ('i_3001a', 'i_6130e')]
+        expected = [True, False]
+        msg = 'Prefix predicate error'
+        self.assertListEqual(received, expected, msg)
+
+        received = Prefix('MON').regex
+        expected = 'MON.*'
+        msg = 'Prefix predicate regex error'
+        self.assertEqual(received, expected, msg)
+
+    def test_numeric_range(self):
+        """Numeric range predicate.
+        """
+        predicate = NumericRange(1000, 1100)
+        received = [predicate(v) for v in ('1024', '1152', '999', 'abc')]
+        expected = [True, False, False, False]
+        msg = 'Numeric range predicate error'
+        self.assertListEqual(received, expected, msg)
+
+        predicate = NumericRange(high=1100)
+        received = predicate('-5')
+        msg = 'Open numeric range predicate error'
+        self.assertTrue(received, msg)
+
+    def test_date_range(self):
+        """Date range predicate.
+        """
+        predicate = DateRange('1996', '1996')
+        values = ('19961217102630', '19971217102630', '--------------')
+        received = [predicate(v) for v in values]
+        expected = [True, False, False]
+        msg = 'Partial date range predicate error'
+        self.assertListEqual(received, expected, msg)
+
+        predicate = DateRange(start=datetime.datetime(1996, 12, 17, 10))
+        received = [predicate(v) for v in values]
+        expected = [True, True, False]
+        msg = 'Open datetime range predicate error'
+        self.assertListEqual(received, expected, msg)
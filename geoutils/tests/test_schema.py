@@ -142,6 +142,18 @@ class TestSchema(unittest2.TestCase):
         msg = 'Metadata document map error: empty source'
         self.assertFalse(len(received), msg)
 
+    def test_build_document_map_tokenizer(self):
+        """Build a document map: configured tokenizer.
+        """
+        meta_dict = SCHEMA_DATA_01['tables']['meta_library']['cf']['cq']
+
+        tokenizer = geoutils.Tokenizer(length=9, filters=['numeric'])
+        schema = geoutils.Schema(tokenizer=tokenizer)
+        received = schema.build_document_map(meta_dict)
+        expected = ['geocentric', 'uncompressed']
+        msg = 'Metadata document map error: configured tokenizer'
+        self.assertListEqual(sorted(list(received)), expected, msg)
+
     def test_build_metasearch(self):
         """Build the metasearch ingest data structure.
         """
@@ -226,6 +238,26 @@ class TestSchema(unittest2.TestCase):
         msg = 'Metadata data structure result error'
         self.assertDictEqual(received, expected, msg)
 
+    def test_build_image_thumb_format(self):
+        """Build the metadata ingest thumb component: encoded thumb.
+        """
+        self._schema.build_image('thumb_library',
+                                 image_extract_ref=None,
+                                 downsample=(300, 300),
+                                 thumb=True,
+                                 thumb_format='JPEG')
+        received = self._schema.data['tables']['thumb_library']['cf']
+
+        expected = {'x_coord_size': '300',
+                    'y_coord_size': '300',
+                    'irep': 'MONO',
+                    'format': 'JPEG'}
+        msg = 'Encoded thumb qualifiers error'
+        self.assertDictEqual(received['cq'], expected, msg)
+
+        msg = 'Encoded thumb value should be a callable'
+        self.assertTrue(callable(received['val']['thumb']), msg)
+
     def test_build_gdelt_spatial_index_current_time(self):
         """Build the meta spatial index ingest data structure.
         """
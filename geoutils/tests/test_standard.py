@@ -122,6 +122,20 @@ class TestStandard(unittest2.TestCase):
         msg = 'Generated shard (%s) incorrect' % source
         self.assertEqual(expected, received, msg)
 
+    def test_thumb_format_unsupported(self):
+        """Set a thumb format that cannot be encoded.
+        """
+        self._standard.thumb_format = 'BANANA'
+        received = self._standard.thumb_format
+        expected = 'JPEG'
+        msg = 'Unsupported thumb format should fall back to JPEG'
+        self.assertEqual(received, expected, msg)
+
+        self._standard.thumb_format = None
+        received = self._standard.thumb_format
+        msg = 'Raw thumb format (None) should be accepted'
+        self.assertIsNone(received, msg)
+
     @classmethod
     def tearDown(cls):
         cls._standard = None
@@ -0,0 +1,111 @@
+# pylint: disable=R0904,C0103
+""":class:`geoutils.Tokenizer` tests.
+
+"""
+import unittest2
+
+import geoutils
+
+
+class TestTokenizer(unittest2.TestCase):
+    """:class:`geoutils.Tokenizer` test cases.
+    """
+    def setUp(self):
+        self._tokenizer = geoutils.Tokenizer()
+        self._meta = {'NITF_FTITLE': 'Checks an uncompressed 1024x1024',
+                      'NITF_FDT': '19961217102630',
+                      'NITF_IID2': 'Fort Huachuca airfield',
+                      'NITF_OSTAID': 'deadbeef01 BF01',
+                      'TIFF_NOTE': 'Image file'}
+
+    def test_init(self):
+        """Initialise a :class:`geoutils.Tokenizer` object.
+        """
+        msg = 'Object is not a geoutils.Tokenizer'
+        self.assertIsInstance(self._tokenizer, geoutils.Tokenizer, msg)
+
+    def test_call_defaults(self):
+        """Tokenize metadata with the default settings.
+        """
+        received = sorted(self._tokenizer(self._meta))
+        expected = ['1024x1024',
+                    '19961217102630',
+                    'airfield',
+                    'bf01',
+                    'checks',
+                    'deadbeef01',
+                    'file',
+                    'fort',
+                    'huachuca',
+                    'image',
+                    'uncompressed']
+        msg = 'Default tokenizer error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_call_stop_words(self):
+        """Tokenize metadata: stop words.
+        """
+        self._tokenizer.stop_words = ['Image', 'FILE', 'checks']
+        received = sorted(self._tokenizer(self._meta))
+        expected = ['1024x1024',
+                    '19961217102630',
+                    'airfield',
+                    'bf01',
+                    'deadbeef01',
+                    'fort',
+                    'huachuca',
+                    'uncompressed']
+        msg = 'Stop word tokenizer error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_call_filters(self):
+        """Tokenize metadata: numeric and hex filters.
+        """
+        self._tokenizer.filters = ['numeric', 'hex', 'dummy']
+        received = sorted(self._tokenizer(self._meta))
+        expected = ['1024x1024',
+                    'airfield',
+                    'bf01',
+                    'checks',
+                    'file',
+                    'fort',
+                    'huachuca',
+                    'image',
+                    'uncompressed']
+        msg = 'Filter tokenizer error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._tokenizer.filters
+        expected = ['numeric', 'hex']
+        msg = 'Unsupported tokenizer filters should be dropped'
+        self.assertListEqual(received, expected, msg)
+
+    def test_call_field_rules(self):
+        """Tokenize metadata: include and exclude field rules.
+        """
+        self._tokenizer.include_fields = ['NITF_*']
+        self._tokenizer.exclude_fields = ['NITF_FDT', 'NITF_OST*']
+        received = sorted(self._tokenizer(self._meta))
+        expected = ['1024x1024',
+                    'airfield',
+                    'checks',
+                    'fort',
+                    'huachuca',
+                    'uncompressed']
+        msg = 'Field rule tokenizer error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_tokens_length(self):
+        """Tokenize a value: length.
+        """
+        self._tokenizer.length = 7
+        received = list(self._tokenizer.tokens('Fort Huachuca airfield'))
+        expected = ['huachuca', 'airfield']
+        msg = 'Tokenizer length error'
+        self.assertListEqual(received, expected, msg)
+
+    def tearDown(self):
+        self._tokenizer = None
+        del self._tokenizer
+        self._meta = None
+        del self._meta
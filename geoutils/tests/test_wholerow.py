@@ -0,0 +1,42 @@
+# pylint: disable=R0904,C0103
+""":mod:`geoutils.wholerow` tests.
+
+"""
+import unittest2
+
+import geoutils.wholerow
+
+
+class TestWholeRow(unittest2.TestCase):
+    """:mod:`geoutils.wholerow` test cases.
+    """
+    def test_iterator_setting(self):
+        """WholeRowIterator setting.
+        """
+        iterator = geoutils.wholerow.WholeRowIterator()
+        received = iterator.get_iterator_setting().iteratorClass
+        expected = 'org.apache.accumulo.core.iterators.user.WholeRowIterator'
+        msg = 'WholeRowIterator class name error'
+        self.assertEqual(received, expected, msg)
+
+    def test_decode_row(self):
+        """Decode an encoded whole row value.
+        """
+        cells = [('center', '32.9831944444,85.0001388889', '', 1, ''),
+                 ('metadata=NITF_IREP', 'MONO', 'public', 2, 'val')]
+        value = geoutils.wholerow.encode_row(cells)
+
+        received = geoutils.wholerow.decode_row(value)
+        expected = [('center', '32.9831944444,85.0001388889', ''),
+                    ('metadata=NITF_IREP', 'MONO', 'val')]
+        msg = 'Whole row decode error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_decode_empty_row(self):
+        """Decode an encoded whole row value: no cells.
+        """
+        value = geoutils.wholerow.encode_row([])
+
+        received = geoutils.wholerow.decode_row(value)
+        msg = 'Whole row decode (no cells) error'
+        self.assertListEqual(received, [], msg)
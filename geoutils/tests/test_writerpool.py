@@ -0,0 +1,161 @@
+# pylint: disable=R0904,C0103,W0212
+""":class:`geoutils.WriterPool` tests.
+
+"""
+import unittest2
+import os
+import pyaccumulo
+from thrift.transport.TTransport import TTransportException
+
+import geoutils
+import geolib_mock
+from geoutils.writerpool import mutation_size
+
+
+class TestWriterPool(unittest2.TestCase):
+    """:class:`geoutils.WriterPool` test cases.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Attempt to start the Accumulo mock proxy server.
+        """
+        conf = os.path.join('geoutils',
+                            'tests',
+                            'files',
+                            'proxy.properties')
+        cls._mock = geolib_mock.MockServer(conf)
+        cls._mock.start()
+
+        cls._table_name = 'audit'
+
+    def setUp(self):
+        self._ds = geoutils.Datastore()
+        self._pool = geoutils.WriterPool()
+
+    def test_init(self):
+        """Initialise a :class:`geoutils.WriterPool` object.
+        """
+        msg = 'Object is not a geoutils.WriterPool'
+        self.assertIsInstance(self._pool, geoutils.WriterPool, msg)
+
+    def test_add_mutation_no_connection(self):
+        """Add a mutation to the pool: no connection.
+        """
+        mutation = pyaccumulo.Mutation('row_01')
+        mutation.put(cf='cf', cq='cq')
+
+        received = self._pool.add_mutation(self._table_name, mutation)
+        msg = 'Pool add_mutation (no connection) not False'
+        self.assertFalse(received, msg)
+
+    def test_add_mutation_writer_error(self):
+        """Add a mutation to the pool: broken writer is discarded.
+        """
+        class BrokenWriter(object):
+            def add_mutations(self, mutations):
+                raise TTransportException(message='broken pipe')
+
+            def close(self):
+                raise TTransportException(message='broken pipe')
+
+        self._pool._writers[self._table_name] = {'writer': BrokenWriter(),
+                                                 'mutations': 0,
+                                                 'bytes': 0,
+                                                 'last_flush': 0}
+        mutation = pyaccumulo.Mutation('row_01')
+        mutation.put(cf='cf', cq='cq')
+
+        received = self._pool.add_mutation(self._table_name, mutation)
+        msg = 'Pool add_mutation (writer error) not False'
+        self.assertFalse(received, msg)
+
+        received = list(self._pool.tables)
+        msg = 'Broken writer should be removed from the pool'
+        self.assertListEqual(received, [], msg)
+
+        received = self._pool.failures.keys()
+        expected = [self._table_name]
+        msg = 'Broken writer failure not recorded'
+        self.assertListEqual(received, expected, msg)
+
+    def test_mutation_size(self):
+        """Approximate mutation size.
+        """
+        mutation = pyaccumulo.Mutation('row_01')
+        mutation.put(cf='cf', cq='cq')
+        mutation.put(cf='image', val='12345')
+
+        received = mutation_size(mutation)
+        expected = 6 + 2 + 2 + 5 + 5
+        msg = 'Mutation size error'
+        self.assertEqual(received, expected, msg)
+
+    def test_writer_reuse_and_flush(self):
+        """Pooled writer is reused across mutations and flushed.
+        """
+        self._pool.connection = self._ds.connect()
+        self._ds.init_table(self._table_name)
+
+        for count in range(3):
+            mutation = pyaccumulo.Mutation('row_%02d' % count)
+            mutation.put(cf='cf', cq='cq')
+            self._pool.add_mutation(self._table_name, mutation)
+
+        received = self._pool.tables
+        expected = [self._table_name]
+        msg = 'Pool should hold a single writer per table'
+        self.assertListEqual(list(received), expected, msg)
+
+        received = self._pool.flush()
+        msg = 'Pool flush should not report failures'
+        self.assertDictEqual(received, {}, msg)
+
+        received = [c.row for c in self._ds.connection.scan(self._table_name)]
+        expected = ['row_00', 'row_01', 'row_02']
+        msg = 'Flushed mutations not written'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._pool.close()
+        msg = 'Pool close should not report failures'
+        self.assertDictEqual(received, {}, msg)
+
+        received = self._pool.tables
+        msg = 'Pool should be empty after close'
+        self.assertListEqual(list(received), [], msg)
+
+        # Clean up.
+        self._ds.delete_table(self._table_name)
+
+    def test_flush_on_mutation_threshold(self):
+        """Pooled writer flushes on the mutation count threshold.
+        """
+        self._pool.connection = self._ds.connect()
+        self._ds.init_table(self._table_name)
+        self._pool.max_mutations = 2
+
+        for count in range(2):
+            mutation = pyaccumulo.Mutation('row_%02d' % count)
+            mutation.put(cf='cf', cq='cq')
+            self._pool.add_mutation(self._table_name, mutation)
+
+        received = self._pool._writers[self._table_name]['mutations']
+        msg = 'Mutation count should reset after threshold flush'
+        self.assertEqual(received, 0, msg)
+
+        # Clean up.
+        self._pool.close()
+        self._ds.delete_table(self._table_name)
+
+    def tearDown(self):
+        self._pool = None
+        del self._pool
+        self._ds = None
+        del self._ds
+
+    @classmethod
+    def tearDownClass(cls):
+        """Shutdown the Accumulo mock proxy server (if enabled)
+        """
+        cls._mock.stop()
+
+        del cls._table_name
@@ -0,0 +1,48 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.timestampfilter.TimestampFilter` limits an
+Accumulo scan to the cells written within a time range.
+
+"""
+__all__ = ['TimestampFilter']
+
+from pyaccumulo.proxy.ttypes import IteratorSetting
+
+
+class TimestampFilter(object):
+    """Accumulo ``TimestampFilter`` setting.
+
+    *start* and *end* are cell timestamps in milliseconds since epoch.
+    Either may be ``None`` for an open ended range.
+
+    """
+    _classname = 'org.apache.accumulo.core.iterators.user.TimestampFilter'
+
+    def __init__(self,
+                 start=None,
+                 end=None,
+                 start_inclusive=True,
+                 end_inclusive=True,
+                 name='TimestampFilter',
+                 priority=40):
+        self.start = start
+        self.end = end
+        self.start_inclusive = start_inclusive
+        self.end_inclusive = end_inclusive
+        self.name = name
+        self.priority = priority
+
+    def get_iterator_setting(self):
+        # The "LLL" prefix flags a millisecond timestamp rather than a
+        # formatted date.
+        properties = {}
+        if self.start is not None:
+            properties['start'] = 'LLL%d' % self.start
+            properties['startInclusive'] = str(self.start_inclusive).lower()
+        if self.end is not None:
+            properties['end'] = 'LLL%d' % self.end
+            properties['endInclusive'] = str(self.end_inclusive).lower()
+
+        return IteratorSetting(iteratorClass=self._classname,
+                               name=self.name,
+                               priority=self.priority,
+                               properties=properties)
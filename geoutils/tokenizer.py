@@ -0,0 +1,160 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.Tokenizer` splits metadata values into the
+terms of the ``meta_search`` document index.
+
+"""
+__all__ = ["Tokenizer"]
+
+import fnmatch
+import re
+
+from geosutils.log import log
+
+
+SPLIT_PATTERN = re.compile(r'[^\w]+')
+FILTERS = {
+    # Tokens made up of digits only (timestamps, sizes, counters).
+    'numeric': re.compile(r'^[\d_]+$'),
+    # Hexadecimal blobs of 8 or more characters that contain a digit.
+    'hex': re.compile(r'^(?=[a-f]*\d)[0-9a-f]{8,}$'),
+}
+
+
+class Tokenizer(object):
+    """:class:`geoutils.Tokenizer`
+
+    .. attribute:: *length*
+        tokens (and whole values) of this number of characters or less
+        are ignored (default 3)
+
+    .. attribute:: *stop_words*
+        set of lower case tokens that are never indexed
+
+    .. attribute:: *filters*
+        list of token filter names to apply.  Supported filters are
+        ``numeric`` (digit only tokens) and ``hex`` (hexadecimal blobs)
+
+    .. attribute:: *include_fields*
+        list of shell-style field name patterns to index.  All fields
+        are indexed if empty
+
+    .. attribute:: *exclude_fields*
+        list of shell-style field name patterns never to index.  Takes
+        precedence over :attr:`include_fields`
+
+    """
+    _length = 3
+    _stop_words = frozenset()
+    _filters = []
+    _include_fields = []
+    _exclude_fields = []
+
+    def __init__(self,
+                 length=None,
+                 stop_words=None,
+                 filters=None,
+                 include_fields=None,
+                 exclude_fields=None):
+        if length is not None:
+            self.length = length
+        if stop_words is not None:
+            self.stop_words = stop_words
+        if filters is not None:
+            self.filters = filters
+        if include_fields is not None:
+            self.include_fields = include_fields
+        if exclude_fields is not None:
+            self.exclude_fields = exclude_fields
+
+    def __call__(self, meta):
+        """Tokenize the *meta* field values.
+
+        **Args:**
+            *meta*: dictionary of metadata field/value pairs
+
+        **Returns:**
+            a Python ``set`` of unique tokens
+
+        """
+        tokens = set()
+        for field, value in meta.iteritems():
+            if self.accept_field(field) and len(value) > self.length:
+                tokens.update(self.tokens(value))
+
+        return tokens
+
+    @property
+    def length(self):
+        return self._length
+
+    @length.setter
+    def length(self, value):
+        self._length = value
+
+    @property
+    def stop_words(self):
+        return self._stop_words
+
+    @stop_words.setter
+    def stop_words(self, values):
+        self._stop_words = frozenset([v.lower() for v in values])
+
+    @property
+    def filters(self):
+        return self._filters
+
+    @filters.setter
+    def filters(self, values):
+        for value in values:
+            if value not in FILTERS:
+                log.warn('Unsupported tokenizer filter "%s"' % value)
+        self._filters = [v for v in values if v in FILTERS]
+
+    @property
+    def include_fields(self):
+        return self._include_fields
+
+    @include_fields.setter
+    def include_fields(self, values):
+        self._include_fields = values
+
+    @property
+    def exclude_fields(self):
+        return self._exclude_fields
+
+    @exclude_fields.setter
+    def exclude_fields(self, values):
+        self._exclude_fields = values
+
+    def accept_field(self, field):
+        """Check the per-field include/exclude rules for *field*.
+
+        **Returns:**
+            Boolean ``True`` if *field* is to be indexed.  Boolean
+            ``False`` otherwise
+
+        """
+        accept = True
+
+        if [p for p in self.exclude_fields if fnmatch.fnmatch(field, p)]:
+            accept = False
+        elif self.include_fields:
+            accept = bool([p for p in self.include_fields
+                           if fnmatch.fnmatch(field, p)])
+
+        return accept
+
+    def tokens(self, value):
+        """Generator of the lower case tokens of *value* that pass the
+        length, stop word and token filters.
+
+        """
+        patterns = [FILTERS[f] for f in self.filters]
+        for token in SPLIT_PATTERN.split(value.lower()):
+            if len(token) <= self.length or token in self.stop_words:
+                continue
+
+            if [p for p in patterns if p.match(token)]:
+                continue
+
+            yield token
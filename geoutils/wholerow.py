@@ -0,0 +1,91 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.wholerow.WholeRowIterator` groups all cells of
+an Accumulo row into a single cell on the tablet server.
+
+"""
+__all__ = ['WholeRowIterator',
+           'encode_row',
+           'decode_row']
+
+import struct
+
+from pyaccumulo.proxy.ttypes import IteratorSetting
+
+
+class WholeRowIterator(object):
+    """Accumulo ``WholeRowIterator`` setting.
+
+    Each row is returned as a single cell whose value holds the encoded
+    column family, qualifier, visibility, timestamp and value of every
+    cell in the row (see :func:`decode_row`).  This removes the per
+    cell overhead of the Thrift proxy.
+
+    """
+    _classname = 'org.apache.accumulo.core.iterators.user.WholeRowIterator'
+
+    def __init__(self, name='WholeRowIterator', priority=50):
+        self.name = name
+        self.priority = priority
+
+    def get_iterator_setting(self):
+        return IteratorSetting(iteratorClass=self._classname,
+                               name=self.name,
+                               priority=self.priority,
+                               properties={})
+
+
+def encode_row(cells):
+    """Encode *cells* in the ``WholeRowIterator`` value format.
+
+    **Args:**
+        *cells*: list of ``(family, qualifier, visibility, timestamp,
+        value)`` tuples
+
+    **Returns:**
+        the encoded row value string
+
+    """
+    parts = [struct.pack('>i', len(cells))]
+    for (family, qualifier, visibility, timestamp, value) in cells:
+        for item in (family, qualifier, visibility):
+            parts.append(struct.pack('>i', len(item)))
+            parts.append(item)
+        parts.append(struct.pack('>q', timestamp))
+        parts.append(struct.pack('>i', len(value)))
+        parts.append(value)
+
+    return ''.join(parts)
+
+
+def decode_row(value):
+    """Decode a ``WholeRowIterator`` row *value*.
+
+    **Args:**
+        *value*: the encoded row value string
+
+    **Returns:**
+        list of ``(family, qualifier, value)`` tuples.  The visibility
+        and timestamp of each cell are dropped
+
+    """
+    cells = []
+
+    (count,) = struct.unpack_from('>i', value, 0)
+    offset = 4
+    for _ in range(count):
+        items = []
+        for _ in range(3):
+            (size,) = struct.unpack_from('>i', value, offset)
+            offset += 4
+            items.append(value[offset:offset + size])
+            offset += size
+
+        # Skip the timestamp.
+        offset += 8
+
+        (size,) = struct.unpack_from('>i', value, offset)
+        offset += 4
+        cells.append((items[0], items[1], value[offset:offset + size]))
+        offset += size
+
+    return cells
@@ -0,0 +1,266 @@
+# pylint: disable=R0903,C0111,R0902
+"""The :class:`geoutils.WriterPool` manages long-lived Accumulo batch
+writers -- one per table.
+
+"""
+__all__ = ["WriterPool"]
+
+import socket
+import time
+from thrift.Thrift import TException
+
+from geosutils.log import log
+
+
+# Thrift (including transport and Accumulo proxy) and socket errors
+# that leave a batch writer unusable.
+WRITER_ERRORS = (TException, socket.error)
+
+
+class WriterPool(object):
+    """:class:`geoutils.WriterPool`
+
+    Mutations are buffered against a single batch writer for each table.
+    The buffered mutations are flushed to the Accumulo proxy when any of
+    the :attr:`max_mutations`, :attr:`max_bytes` or :attr:`max_latency`
+    thresholds are exceeded, or when the pool is explicitly flushed or
+    closed.
+
+    .. attribute:: *connection*
+        a :class:`pyaccumulo.Accumulo` object that the batch writers
+        are created against (``None`` if not connected)
+
+    .. attribute:: *max_mutations*
+        number of buffered mutations against a table that will trigger
+        a flush (default 1000)
+
+    .. attribute:: *max_bytes*
+        approximate size in bytes of the buffered mutations against a
+        table that will trigger a flush (default 5MB)
+
+    .. attribute:: *max_latency*
+        number of seconds since a table's last flush that will trigger
+        a flush on the next mutation (default 30.0)
+
+    .. attribute:: *failures*
+        dictionary of table/error message pairs of the most recent
+        flush failures
+
+    """
+    _connection = None
+    _max_mutations = 1000
+    _max_bytes = 5 * 1024 * 1024
+    _max_latency = 30.0
+
+    def __init__(self, connection=None):
+        self._connection = connection
+        self._writers = {}
+        self._failures = {}
+
+    @property
+    def connection(self):
+        return self._connection
+
+    @connection.setter
+    def connection(self, value):
+        self._connection = value
+
+    @property
+    def max_mutations(self):
+        return self._max_mutations
+
+    @max_mutations.setter
+    def max_mutations(self, value):
+        self._max_mutations = value
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._max_bytes = value
+
+    @property
+    def max_latency(self):
+        return self._max_latency
+
+    @max_latency.setter
+    def max_latency(self, value):
+        self._max_latency = value
+
+    @property
+    def failures(self):
+        return self._failures
+
+    @property
+    def tables(self):
+        return self._writers.keys()
+
+    def _get_writer(self, table):
+        state = self._writers.get(table)
+
+        if state is None:
+            if self.connection is None:
+                log.error('Writer error: Accumulo connection not detected.')
+            else:
+                log.debug('Creating pooled writer for table "%s"' % table)
+                state = {'writer': self.connection.create_batch_writer(table),
+                         'mutations': 0,
+                         'bytes': 0,
+                         'last_flush': time.time()}
+                self._writers[table] = state
+
+        return state
+
+    def add_mutation(self, table, mutation):
+        """Buffer *mutation* against the batch writer for *table*.
+
+        A flush of *table* is triggered if the buffered mutations
+        exceed any of the pool's thresholds.
+
+        **Args:**
+            *table*: name of the table to write to
+
+            *mutation*: a :class:`pyaccumulo.Mutation` object
+
+        **Returns:**
+            Boolean ``True`` if the mutation was accepted (and the
+            triggered flush, if any, succeeded).  Boolean ``False``
+            otherwise
+
+        """
+        return self.add_mutations(table, [mutation])
+
+    def add_mutations(self, table, mutations):
+        """Buffer a list of *mutations* against the batch writer for
+        *table* in a single proxy call.
+
+        A flush of *table* is triggered if the buffered mutations
+        exceed any of the pool's thresholds.
+
+        **Args:**
+            *table*: name of the table to write to
+
+            *mutations*: list of :class:`pyaccumulo.Mutation` objects
+
+        **Returns:**
+            Boolean ``True`` if the mutations were accepted (and the
+            triggered flush, if any, succeeded).  Boolean ``False``
+            otherwise
+
+        """
+        status = False
+
+        state = self._get_writer(table)
+        if state is not None:
+            try:
+                state['writer'].add_mutations(mutations)
+            except WRITER_ERRORS as err:
+                log.error('Writer add for table "%s": %s' % (table, err))
+                self._failures = {table: str(err)}
+                self._discard(table)
+                return status
+
+            state['mutations'] += len(mutations)
+            state['bytes'] += sum([mutation_size(m) for m in mutations])
+            status = True
+
+            if (state['mutations'] >= self.max_mutations or
+               state['bytes'] >= self.max_bytes or
+               time.time() - state['last_flush'] >= self.max_latency):
+                status = not self.flush(table)
+
+        return status
+
+    def flush(self, table=None):
+        """Flush the buffered mutations of *table* (or all tables if
+        *table* is ``None``) to the Accumulo proxy.
+
+        A writer that fails to flush is discarded so that a new writer
+        is created on the next mutation against that table.
+
+        **Kwargs:**
+            *table*: name of the table to flush
+
+        **Returns:**
+            dictionary of table/error message pairs for each table
+            that failed to flush.  An empty dictionary denotes success
+
+        """
+        return self._apply('flush', table)
+
+    def close(self, table=None):
+        """Flush and close the writer of *table* (or all writers if
+        *table* is ``None``) and remove it from the pool.
+
+        **Kwargs:**
+            *table*: name of the table writer to close
+
+        **Returns:**
+            dictionary of table/error message pairs for each table
+            that failed to close.  An empty dictionary denotes success
+
+        """
+        return self._apply('close', table)
+
+    def _apply(self, action, table=None):
+        tables = self._writers.keys()
+        if table is not None:
+            tables = [t for t in tables if t == table]
+
+        failures = {}
+        for name in tables:
+            state = self._writers[name]
+            log.debug('Writer %s for table "%s": %d mutations (%d bytes)' %
+                      (action, name, state['mutations'], state['bytes']))
+
+            try:
+                getattr(state['writer'], action)()
+                state['mutations'] = 0
+                state['bytes'] = 0
+                state['last_flush'] = time.time()
+                if action == 'close':
+                    self._writers.pop(name)
+            except WRITER_ERRORS as err:
+                log.error('Writer %s for table "%s": %s' % (action, name, err))
+                failures[name] = str(err)
+                self._discard(name)
+
+        self._failures = failures
+
+        return failures
+
+    def _discard(self, table):
+        """Remove the broken writer of *table* from the pool so that a
+        new writer is created on the next mutation.  Buffered mutations
+        of the broken writer are lost.
+
+        """
+        state = self._writers.pop(table, None)
+        if state is not None:
+            try:
+                state['writer'].close()
+            except WRITER_ERRORS as err:
+                log.debug('Discarded writer for table "%s": %s' %
+                          (table, err))
+
+
+def mutation_size(mutation):
+    """Approximate the size in bytes of *mutation*.
+
+    **Args:**
+        *mutation*: a :class:`pyaccumulo.Mutation` object
+
+    **Returns:**
+        the sum of the row, column family, column qualifier and value
+        lengths across all of the mutation's updates
+
+    """
+    size = len(mutation.row)
+    for update in mutation.updates:
+        for item in (update.colFamily, update.colQualifier, update.value):
+            if item is not None:
+                size += len(str(item))
+
+    return size